@@ -1,6 +1,5 @@
 """Cryptocurrency Python Service"""
 from typing import List, Optional, Dict, Any
-import pickle
 import os
 import logging
 
@@ -14,6 +13,7 @@ from exonum_runtime.runtime.transaction_context import TransactionContext
 from exonum_runtime.runtime.types import ArtifactProtobufSpec
 
 # Merkledb types
+from exonum_runtime.merkledb.codecs import ProtoCodec
 from exonum_runtime.merkledb.indices import MapIndex
 from exonum_runtime.merkledb.schema import Schema, WithSchema
 from exonum_runtime.merkledb.into_bytes import IntoBytes
@@ -44,23 +44,8 @@ class WalletKey(IntoBytes):
         return WalletKey(key=PublicKey(data))
 
 
-class Wallet(IntoBytes):
-    """TODO"""
-
-    def __init__(self, pub_key: PublicKey, name: str, balance: int) -> None:
-        self.pub_key = pub_key
-        self.name = name
-        self.balance = balance
-
-    def into_bytes(self) -> bytes:
-        data = {"pub_key": self.pub_key.value, "name": self.name, "balance": self.balance}
-        return pickle.dumps(data)
-
-    @classmethod
-    def from_bytes(cls, data: bytes) -> "Wallet":
-        wallet = pickle.loads(data)
-
-        return Wallet(PublicKey(wallet["pub_key"]), wallet["name"], wallet["balance"])
+# Wallets are stored as protobuf messages (see `proto/service.proto`).
+Wallet = ProtoCodec[service_pb2.Wallet]  # type: ignore
 
 
 class CryptocurrencyError(ServiceError):
@@ -114,7 +99,8 @@ class Cryptocurrency(Service, WithSchema):
         LOGGER.debug("TX create_wallet: author => %s, name => %s", caller.author, wallet_name)
 
         if wallets.get(wallet_key) is None:
-            wallet = Wallet(caller.author, wallet_name, INIT_BALANCE)
+            wallet = Wallet(name=wallet_name, balance=INIT_BALANCE)
+            wallet.pub_key.data = caller.author.value
 
             wallets[wallet_key] = wallet
             LOGGER.debug("TX create_wallet: created wallet")
@@ -205,7 +191,7 @@ class CryptocurrencyApi(ServiceApi):
             LOGGER.debug("API: Wallet %s not found", wallet_id)
             return {"error": "Wallet not found"}
 
-        result = {"pub_key": wallet.pub_key.hex(), "name": wallet.name, "balance": wallet.balance}
+        result = {"pub_key": wallet.pub_key.data.hex(), "name": wallet.name, "balance": wallet.balance}
         LOGGER.debug("API: Wallet %s found, returning %s", wallet_id, result)
         return result
 
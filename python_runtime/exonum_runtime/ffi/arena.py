@@ -0,0 +1,109 @@
+"""Per-thread arena allocator for the data returned by the MerkleDB bindings.
+
+Rust side of the bindings asks Python to allocate memory for every value it returns
+and then writes the value into the allocated buffer. Arena serves those requests by
+bumping an offset inside of a preallocated chunk, so an allocation is O(1) and does not
+require any per-byte work on the Python side.
+
+Memory is released in bulk: while the `Access` scope is open on the current thread,
+all the allocated buffers are kept alive, and once the outermost scope is closed,
+the arena is reset. Outside of any scope (e.g. API requests served via the always-valid
+snapshot), buffer is released as soon as its contents are consumed.
+
+Every thread has its own arena, so the API thread and the consensus thread can read
+the database simultaneously.
+"""
+from typing import Dict, List
+import ctypes as c
+import threading
+
+# Default size of the arena chunk (64 KB).
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class _Chunk:
+    """Continuous region of memory owned by the arena."""
+
+    __slots__ = ("buffer", "address", "view", "offset")
+
+    def __init__(self, size: int) -> None:
+        # `bytearray` is zero-initialized on the C side, there is no Python-level loop.
+        self.buffer = bytearray(size)
+        self.address = c.addressof((c.c_char * size).from_buffer(self.buffer))
+        self.view = memoryview(self.buffer)
+        self.offset = 0
+
+    def free_space(self) -> int:
+        """Returns the amount of bytes available for allocation."""
+        return len(self.buffer) - self.offset
+
+
+class Arena:
+    """Bump allocator for the buffers filled by the Rust side.
+
+    Buffers allocated by the arena can be accessed as `memoryview` objects via the `view` method.
+    Obtained views are valid until the arena is released, so if data is required to live longer,
+    it should be copied (e.g. via `bytes(view)`).
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self._chunk_size = chunk_size
+        self._chunks: List[_Chunk] = [_Chunk(chunk_size)]
+        self._views: Dict[int, memoryview] = dict()
+        self._depth = 0
+
+    def allocate(self, length: int) -> int:
+        """Allocates a buffer of provided length and returns its address."""
+        chunk = self._chunks[-1]
+
+        if chunk.free_space() < length:
+            # Values bigger than a chunk get a dedicated chunk.
+            chunk = _Chunk(max(length, self._chunk_size))
+            self._chunks.append(chunk)
+
+        start = chunk.offset
+        chunk.offset += length
+
+        address = chunk.address + start
+        self._views[address] = chunk.view[start : chunk.offset]
+
+        return address
+
+    def view(self, address: int, length: int) -> memoryview:
+        """Returns a view of the buffer previously allocated at the provided address."""
+        return self._views[address][:length]
+
+    def enter_scope(self) -> None:
+        """Marks the beginning of the scope in which allocated buffers should be kept alive."""
+        self._depth += 1
+
+    def exit_scope(self) -> None:
+        """Marks the end of the scope. Arena is released when the outermost scope is closed."""
+        self._depth -= 1
+
+        if self._depth == 0:
+            self.release()
+
+    def in_scope(self) -> bool:
+        """Returns True if there is an open scope on the arena."""
+        return self._depth > 0
+
+    def release(self) -> None:
+        """Releases all the allocated buffers at once."""
+        self._views.clear()
+
+        # Keep the first chunk for the further allocations, drop the others.
+        del self._chunks[1:]
+        self._chunks[0].offset = 0
+
+
+_THREAD_DATA = threading.local()
+
+
+def thread_arena() -> Arena:
+    """Returns the arena of the current thread (creating it if required)."""
+    try:
+        return _THREAD_DATA.arena
+    except AttributeError:
+        _THREAD_DATA.arena = Arena()
+        return _THREAD_DATA.arena
@@ -1,6 +1,6 @@
 """C callbacks to be provided to Rust"""
 
-from typing import List, Any, Dict
+from typing import Dict, Set
 import ctypes as c
 
 from exonum_runtime.runtime.types import PythonRuntimeResult
@@ -15,13 +15,20 @@ from .raw_types import (
     RawIndexAccess,
 )
 from .ffi_provider import RustFFIProvider
+from .arena import thread_arena
 
 # Dynamically allocated resources
 #
 # Resources are freed by the rust through a `free` method call.
 _RESOURCES: Dict[int, c.c_void_p] = dict()
-# Resources allocated by the merkledb.
-_MERKLEDB_ALLOCATED: List[Any] = list()
+
+# C representations of the artifact protobuf specs, keyed by the content hash of the spec.
+#
+# Specs are requested on every client connection, so they are converted once and kept alive:
+# `free_resource` ignores them (artifacts are never unloaded).
+_PROTOBUF_SPECS: Dict[bytes, c.c_void_p] = dict()
+# Addresses of the cached specs.
+_PROTOBUF_SPEC_ADDRESSES: Set[int] = set()
 
 
 @c.CFUNCTYPE(c.c_uint8, RawArtifactId, c.POINTER(c.c_ubyte), c.c_uint64)
@@ -86,7 +93,8 @@ def execute(raw_context, raw_call_info, parameters, parameters_len):  # type: ig
     """Execute a transaction."""
     call_info = raw_call_info.into_call_info()
 
-    parameters_bytes = bytes(parameters[:parameters_len])
+    # Unlike slicing the pointer, `string_at` doesn't create an intermediate list of ints.
+    parameters_bytes = c.string_at(parameters, parameters_len)
 
     context = raw_context.into_execution_context()
 
@@ -124,15 +132,20 @@ def artifact_protobuf_spec(raw_artifact_id, spec_ptr):  # type: ignore # Signatu
 
     ffi = RustFFIProvider.instance()
 
-    spec = ffi.runtime().artifact_protobuf_spec(artifact_id)
+    cached_spec = ffi.runtime().artifact_protobuf_spec(artifact_id)
+
+    if cached_spec is not None:
+        spec, content_hash = cached_spec
+        void_p = _PROTOBUF_SPECS.get(content_hash)
 
-    if spec is not None:
-        raw_spec = RawArtifactProtobufSpec.from_artifact_protobuf_spec(spec)
-        raw_spec_ptr = c.pointer(raw_spec)
+        if void_p is None:
+            raw_spec = RawArtifactProtobufSpec.from_artifact_protobuf_spec(spec)
+            void_p = c.cast(c.pointer(raw_spec), c.c_void_p)
 
-        void_p = c.cast(raw_spec_ptr, c.c_void_p)
+            _PROTOBUF_SPECS[content_hash] = void_p
+            _PROTOBUF_SPEC_ADDRESSES.add(void_p.value)
 
-        _RESOURCES[void_p.value] = void_p
+        raw_spec_ptr = c.cast(void_p, c.POINTER(RawArtifactProtobufSpec))
     else:
         raw_spec_ptr = None
 
@@ -149,12 +162,10 @@ def before_commit(access):  # type: ignore # Signature is one line above.
 
 @c.CFUNCTYPE(c.c_void_p, c.c_uint64)
 def merkledb_allocate(length: int):  # type: ignore # Signature is one line above.
-    """Request for memory allocation."""
-    data = (c.c_uint8 * length)(*([0] * length))
+    """Request for memory allocation.
 
-    _MERKLEDB_ALLOCATED.append(data)
-
-    return c.addressof(data)
+    Memory is allocated in the arena of the calling thread."""
+    return thread_arena().allocate(length)
 
 
 @c.CFUNCTYPE(None, c.c_void_p)
@@ -169,12 +180,11 @@ def after_commit(access):  # type: ignore # Signature is one line above.
 def free_resource(resource):  # type: ignore # Signature is one line above.
     """Callback called when resource is consumed and can be freed."""
 
-    del _RESOURCES[resource]
-
+    # Cached protobuf specs are not registered and are kept alive.
+    if resource in _PROTOBUF_SPEC_ADDRESSES:
+        return
 
-def free_merkledb_allocated() -> None:
-    """Free memory allocated by merkledb bindings."""
-    _MERKLEDB_ALLOCATED.pop()
+    del _RESOURCES[resource]
 
 
 def build_callbacks() -> RawPythonMethods:
@@ -1,8 +1,76 @@
 """TODO"""
-from typing import Optional
+from typing import Optional, Iterable, List, Tuple, Any
 import ctypes as c
+import struct
 
-from exonum_runtime.ffi.c_callbacks import free_merkledb_allocated
+from exonum_runtime.ffi.arena import thread_arena
+from exonum_runtime.ffi.c_callbacks import merkledb_allocate
+
+# Pointer to the allocation callback passed to every method returning data.
+ALLOCATE = c.cast(merkledb_allocate, c.c_void_p)
+
+# Length prefix of the items in packed buffers.
+_ITEM_LEN = struct.Struct("<Q")
+
+# Bounds of the map scan: (start, end, prefix).
+KeyBounds = Tuple[Optional[bytes], Optional[bytes], Optional[bytes]]
+
+
+def pack_items(items: Iterable[bytes]) -> bytes:
+    """Packs byte sequences into one buffer of length-prefixed items
+    (`u64` LE length followed by the item bytes)."""
+    return b"".join([part for item in items for part in (_ITEM_LEN.pack(len(item)), item)])
+
+
+def unpack_items(data: memoryview) -> List[bytes]:
+    """Splits a buffer of length-prefixed items created by `pack_items` (or by Rust)."""
+    items = []
+    pos = 0
+    while pos < len(data):
+        (length,) = _ITEM_LEN.unpack_from(data, pos)
+        pos += _ITEM_LEN.size
+        items.append(bytes(data[pos : pos + length]))
+        pos += length
+
+    return items
+
+
+def _release_if_unscoped() -> None:
+    # BinaryData objects are allocated in the arena. If there is no open scope which
+    # will release it in bulk, the memory should be released right away.
+    arena = thread_arena()
+    if not arena.in_scope():
+        arena.release()
+
+
+def _closed_index(*_args: Any) -> Any:
+    raise RuntimeError("Index handle is closed, access to the index expired")
+
+
+class FreedMethods:
+    """Stand-in for the methods of the raw index after its handle is closed,
+    so the closed handle is never passed to Rust."""
+
+    def __getattr__(self, name: str) -> Any:
+        return _closed_index
+
+
+FREED_METHODS = FreedMethods()
+
+
+class BinaryArg(c.Structure):
+    """Data passed to Rust. Layout is the same as of `BinaryData`, but `bytes`
+    can be set without a cast: `data` points right into the `bytes` object."""
+
+    _fields_ = [("data", c.c_char_p), ("data_len", c.c_uint64)]
+
+    @classmethod
+    def from_optional(cls, data: Optional[bytes]) -> "BinaryArg":
+        """Creates a BinaryArg pointing to the provided bytes, or with a null pointer if data is None."""
+        if data is None:
+            return cls()
+
+        return cls(data, len(data))
 
 
 class BinaryData(c.Structure):
@@ -10,15 +78,66 @@ class BinaryData(c.Structure):
 
     _fields_ = [("data", c.POINTER(c.c_uint8)), ("data_len", c.c_uint64)]
 
+    def into_memoryview(self) -> Optional[memoryview]:
+        """Returns a view of the data written by Rust into the thread arena.
+
+        View is valid until the end of the current `Access` scope."""
+        if not self.data:
+            return None
+
+        address = c.cast(self.data, c.c_void_p).value
+        assert address is not None
+
+        return thread_arena().view(address, self.data_len)
+
     def into_bytes(self) -> Optional[bytes]:
         """Casts BinaryData obtained from Rust to bytes."""
+        view = self.into_memoryview()
+        if view is None:
+            return None
+
+        result = bytes(view)
+
+        _release_if_unscoped()
+
+        return result
+
+    def into_buffer(self) -> bytearray:
+        """Copies the data obtained from Rust into a writable buffer (empty if there is no data)."""
+        view = self.into_memoryview()
+        if view is None:
+            return bytearray()
 
-        if self.data:
-            result: Optional[bytes] = bytes(self.data[: self.data_len])
-            # BinaryData objects are allocated dynamically by mekledb, so we have to
-            # free allocated memory.
-            free_merkledb_allocated()
-        else:
-            result = None
+        result = bytearray(view)
+
+        _release_if_unscoped()
 
         return result
+
+    def into_values(self, offsets: Any, found: Any) -> List[Optional[bytes]]:
+        """Splits a contiguous buffer of values obtained from Rust.
+
+        `offsets` and `found` are the arrays filled by Rust alongside with the buffer:
+        value `i` occupies `offsets[i]..offsets[i + 1]` bytes and is absent if `found[i]` is 0."""
+        view = self.into_memoryview()
+        if view is None:
+            return [None] * len(found)
+
+        bounds = offsets[:]
+        values = [bytes(view[bounds[i] : bounds[i + 1]]) if is_found else None for i, is_found in enumerate(found)]
+
+        _release_if_unscoped()
+
+        return values
+
+    def into_items(self) -> List[bytes]:
+        """Splits a buffer of length-prefixed items obtained from Rust."""
+        view = self.into_memoryview()
+        if view is None:
+            return []
+
+        items = unpack_items(view)
+
+        _release_if_unscoped()
+
+        return items
@@ -1,9 +1,8 @@
 """TODO"""
-from typing import Optional
+from typing import Optional, List, Any
 import ctypes as c
 
-from exonum_runtime.ffi.c_callbacks import merkledb_allocate
-from .common import BinaryData
+from .common import BinaryData, BinaryArg, pack_items, ALLOCATE, FREED_METHODS
 
 # When working with C, it's always a compromise.
 # pylint: disable=protected-access
@@ -18,15 +17,18 @@ class RawListIndexMethods(c.Structure):
 
     _fields_ = [
         ("get", c.CFUNCTYPE(BinaryData, c.POINTER(RawListIndex), c.c_uint64, c.c_void_p)),
-        ("push", c.CFUNCTYPE(None, c.POINTER(RawListIndex), BinaryData)),
+        ("get_range", c.CFUNCTYPE(BinaryData, c.POINTER(RawListIndex), c.c_uint64, c.c_uint64, c.c_void_p)),
+        ("push", c.CFUNCTYPE(None, c.POINTER(RawListIndex), BinaryArg)),
+        ("extend", c.CFUNCTYPE(None, c.POINTER(RawListIndex), BinaryArg)),
         ("pop", c.CFUNCTYPE(BinaryData, c.POINTER(RawListIndex), c.c_void_p)),
         ("len", c.CFUNCTYPE(c.c_uint64, c.POINTER(RawListIndex))),
-        ("set_item", c.CFUNCTYPE(None, c.POINTER(RawListIndex), c.c_uint64, BinaryData)),
+        ("set_item", c.CFUNCTYPE(None, c.POINTER(RawListIndex), c.c_uint64, BinaryArg)),
         ("clear", c.CFUNCTYPE(None, c.POINTER(RawListIndex))),
+        ("free", c.CFUNCTYPE(None, c.POINTER(RawListIndex))),
     ]
 
 
-RawListIndex._fields_ = [("fork", c.c_void_p), ("index_name", c.c_char_p), ("methods", RawListIndexMethods)]
+RawListIndex._fields_ = [("handle", c.c_void_p), ("methods", RawListIndexMethods)]
 
 
 class ListIndexWrapper:
@@ -34,38 +36,66 @@ class ListIndexWrapper:
 
     def __init__(self, inner: RawListIndex) -> None:
         self._inner = inner
+        self._pointer = c.pointer(inner)
+        self._bind(inner.methods)
+
+    def __del__(self) -> None:
+        self.free()
+
+    def _bind(self, methods: Any) -> None:
+        # Every access to a field of `RawListIndexMethods` creates a new function object,
+        # so the functions are resolved once.
+        self._get = methods.get
+        self._get_range = methods.get_range
+        self._push = methods.push
+        self._extend = methods.extend
+        self._pop = methods.pop
+        self._len = methods.len
+        self._set_item = methods.set_item
+        self._clear = methods.clear
+        self._free = methods.free
+
+    def free(self) -> None:
+        """Closes the native index. Wrapper can't be used after this call, repeated calls do nothing."""
+        if self._inner.handle:
+            self._free(self._pointer)
+        self._bind(FREED_METHODS)
 
     def get(self, idx: int) -> Optional[bytes]:
         """TODO"""
-        result = self._inner.methods.get(self._inner, c.c_uint64(idx), c.cast(merkledb_allocate, c.c_void_p))
+        return self._get(self._pointer, idx, ALLOCATE).into_bytes()
 
-        return result.into_bytes()
+    def get_range(self, start: int, end: int) -> List[bytes]:
+        """Returns the values with indices in the `[start, end)` range in one call.
+        Range is truncated to the length of the list."""
+        return self._get_range(self._pointer, start, end, ALLOCATE).into_items()
+
+    def get_range_buffer(self, start: int, end: int) -> bytearray:
+        """Same as `get_range`, but returns the buffer of length-prefixed items as is."""
+        return self._get_range(self._pointer, start, end, ALLOCATE).into_buffer()
 
     def push(self, value: bytes) -> None:
         """TODO"""
-        # mypy isn't a friend of ctypes
-        data = BinaryData(c.cast(value, c.POINTER(c.c_uint8)), c.c_uint64(len(value)))  # type: ignore
+        self._push(self._pointer, BinaryArg(value, len(value)))
+
+    def extend(self, values: List[bytes]) -> None:
+        """Appends all the provided values in one call."""
+        packed = pack_items(values)
 
-        self._inner.methods.push(self._inner, data)
+        self._extend(self._pointer, BinaryArg(packed, len(packed)))
 
     def pop(self) -> Optional[bytes]:
         """TODO"""
-        result = self._inner.methods.pop(self._inner, c.cast(merkledb_allocate, c.c_void_p))
-
-        return result.into_bytes()
+        return self._pop(self._pointer, ALLOCATE).into_bytes()
 
     def len(self) -> int:
         """TODO"""
-        result = self._inner.methods.len(self._inner)
-
-        return int(result)
+        return int(self._len(self._pointer))
 
     def set_item(self, idx: int, value: bytes) -> None:
         """TODO"""
-        data = BinaryData(c.cast(value, c.POINTER(c.c_uint8)), c.c_uint64(len(value)))  # type: ignore
-
-        self._inner.methods.set(self._inner, c.c_uint64(idx), data)
+        self._set_item(self._pointer, idx, BinaryArg(value, len(value)))
 
     def clear(self) -> None:
         """TODO"""
-        self._inner.methods.clear(self._inner)
+        self._clear(self._pointer)
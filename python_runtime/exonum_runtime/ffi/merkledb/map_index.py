@@ -1,9 +1,8 @@
 """TODO"""
-from typing import Optional
+from typing import Optional, List, Tuple, Any
 import ctypes as c
 
-from exonum_runtime.ffi.c_callbacks import merkledb_allocate
-from .common import BinaryData
+from .common import BinaryData, BinaryArg, KeyBounds, pack_items, ALLOCATE, FREED_METHODS
 
 # When working with C, it's always a compromise.
 # pylint: disable=protected-access
@@ -17,14 +16,42 @@ class RawMapIndexMethods(c.Structure):
     """TODO"""
 
     _fields_ = [
-        ("get", c.CFUNCTYPE(BinaryData, c.POINTER(RawMapIndex), BinaryData, c.c_void_p)),
-        ("put", c.CFUNCTYPE(None, c.POINTER(RawMapIndex), BinaryData, BinaryData)),
-        ("remove", c.CFUNCTYPE(None, c.POINTER(RawMapIndex), BinaryData)),
-        ("clear", c.CFUNCTYPE(c.c_uint64, c.POINTER(RawMapIndex))),
+        ("get", c.CFUNCTYPE(BinaryData, c.POINTER(RawMapIndex), BinaryArg, c.c_void_p)),
+        (
+            "get_many",
+            c.CFUNCTYPE(
+                BinaryData,
+                c.POINTER(RawMapIndex),
+                BinaryArg,
+                c.POINTER(c.c_uint64),
+                c.POINTER(c.c_uint8),
+                c.c_void_p,
+            ),
+        ),
+        (
+            "iter_chunk",
+            c.CFUNCTYPE(
+                BinaryData,
+                c.POINTER(RawMapIndex),
+                BinaryArg,
+                BinaryArg,
+                BinaryArg,
+                BinaryArg,
+                c.c_uint64,
+                c.c_uint8,
+                c.c_void_p,
+            ),
+        ),
+        ("put", c.CFUNCTYPE(None, c.POINTER(RawMapIndex), BinaryArg, BinaryArg)),
+        ("put_many", c.CFUNCTYPE(None, c.POINTER(RawMapIndex), BinaryArg)),
+        ("remove", c.CFUNCTYPE(None, c.POINTER(RawMapIndex), BinaryArg)),
+        ("remove_many", c.CFUNCTYPE(None, c.POINTER(RawMapIndex), BinaryArg)),
+        ("clear", c.CFUNCTYPE(None, c.POINTER(RawMapIndex))),
+        ("free", c.CFUNCTYPE(None, c.POINTER(RawMapIndex))),
     ]
 
 
-RawMapIndex._fields_ = [("fork", c.c_void_p), ("index_name", c.c_char_p), ("methods", RawMapIndexMethods)]
+RawMapIndex._fields_ = [("handle", c.c_void_p), ("methods", RawMapIndexMethods)]
 
 
 class MapIndexWrapper:
@@ -32,29 +59,107 @@ class MapIndexWrapper:
 
     def __init__(self, inner: RawMapIndex) -> None:
         self._inner = inner
+        self._pointer = c.pointer(inner)
+        self._bind(inner.methods)
+
+    def __del__(self) -> None:
+        self.free()
+
+    def _bind(self, methods: Any) -> None:
+        # Every access to a field of `RawMapIndexMethods` creates a new function object,
+        # so the functions are resolved once.
+        self._get = methods.get
+        self._get_many = methods.get_many
+        self._iter_chunk = methods.iter_chunk
+        self._put = methods.put
+        self._put_many = methods.put_many
+        self._remove = methods.remove
+        self._remove_many = methods.remove_many
+        self._clear = methods.clear
+        self._free = methods.free
+
+    def free(self) -> None:
+        """Closes the native index. Wrapper can't be used after this call, repeated calls do nothing."""
+        if self._inner.handle:
+            self._free(self._pointer)
+        self._bind(FREED_METHODS)
 
     def get(self, key: bytes) -> Optional[bytes]:
         """TODO"""
-        # mypy isn't a friend of ctypes
-        key = BinaryData(c.cast(key, c.POINTER(c.c_uint8)), c.c_uint64(len(key)))  # type: ignore
-        result = self._inner.methods.get(self._inner, key, c.cast(merkledb_allocate, c.c_void_p))
+        return self._get(self._pointer, BinaryArg(key, len(key)), ALLOCATE).into_bytes()
 
-        return result.into_bytes()
+    def get_many(self, keys: List[bytes]) -> List[Optional[bytes]]:
+        """Gets values for all the provided keys in one call.
+        Values for absent keys are None."""
+        amount = len(keys)
+        if amount == 0:
+            return []
+
+        packed = pack_items(keys)
+        offsets = (c.c_uint64 * (amount + 1))()
+        found = (c.c_uint8 * amount)()
+
+        result = self._get_many(self._pointer, BinaryArg(packed, len(packed)), offsets, found, ALLOCATE)
+
+        return result.into_values(offsets, found)
+
+    def get_many_buffer(self, keys: List[bytes]) -> Tuple[bytearray, Any, Any]:
+        """Same as `get_many`, but returns the contiguous buffer of the found values as is,
+        alongside with the `offsets` and `found` arrays (see `BinaryData.into_values`)."""
+        amount = len(keys)
+        packed = pack_items(keys)
+        offsets = (c.c_uint64 * (amount + 1))()
+        found = (c.c_uint8 * amount)()
+
+        if amount == 0:
+            return bytearray(), offsets, found
+
+        result = self._get_many(self._pointer, BinaryArg(packed, len(packed)), offsets, found, ALLOCATE)
+
+        return result.into_buffer(), offsets, found
+
+    def iter_chunk(
+        self, from_key: Optional[bytes], limit: int, with_values: bool, bounds: KeyBounds = (None, None, None)
+    ) -> List[bytes]:
+        """Reads up to `limit` entries following the `from_key` (or the first entries of the map
+        if `from_key` is None) which satisfy `bounds`: (start, end, prefix), every bound is optional.
+
+        Returns keys if `with_values` is False, and keys interleaved with values otherwise."""
+        start, end, prefix = bounds
+
+        result = self._iter_chunk(
+            self._pointer,
+            BinaryArg.from_optional(from_key),
+            BinaryArg.from_optional(start),
+            BinaryArg.from_optional(end),
+            BinaryArg.from_optional(prefix),
+            limit,
+            with_values,
+            ALLOCATE,
+        )
+
+        return result.into_items()
 
     def put(self, key: bytes, value: bytes) -> None:
         """TODO"""
-        # mypy isn't a friend of ctypes
-        key = BinaryData(c.cast(key, c.POINTER(c.c_uint8)), c.c_uint64(len(key)))  # type: ignore
-        value = BinaryData(c.cast(value, c.POINTER(c.c_uint8)), c.c_uint64(len(value)))  # type: ignore
+        self._put(self._pointer, BinaryArg(key, len(key)), BinaryArg(value, len(value)))
 
-        self._inner.methods.put(self._inner, key, value)
+    def put_many(self, entries: List[Tuple[bytes, bytes]]) -> None:
+        """Puts all the provided (key, value) pairs in one call."""
+        packed = pack_items([item for entry in entries for item in entry])
+
+        self._put_many(self._pointer, BinaryArg(packed, len(packed)))
 
     def remove(self, key: bytes) -> None:
         """TODO"""
-        # mypy isn't a friend of ctypes
-        key = BinaryData(c.cast(key, c.POINTER(c.c_uint8)), c.c_uint64(len(key)))  # type: ignore
-        self._inner.methods.remove(self._inner, key)
+        self._remove(self._pointer, BinaryArg(key, len(key)))
+
+    def remove_many(self, keys: List[bytes]) -> None:
+        """Removes all the provided keys in one call."""
+        packed = pack_items(keys)
+
+        self._remove_many(self._pointer, BinaryArg(packed, len(packed)))
 
     def clear(self) -> None:
         """TODO"""
-        self._inner.methods.clear(self._inner)
+        self._clear(self._pointer)
@@ -1,10 +1,9 @@
 """TODO"""
-from typing import Optional
+from typing import Optional, List, Any
 import ctypes as c
 
-from exonum_runtime.ffi.c_callbacks import merkledb_allocate
 from exonum_runtime.crypto import Hash
-from .common import BinaryData
+from .common import BinaryData, BinaryArg, pack_items, ALLOCATE, FREED_METHODS
 
 # When working with C, it's always a compromise.
 # pylint: disable=protected-access
@@ -19,16 +18,23 @@ class RawProofListIndexMethods(c.Structure):
 
     _fields_ = [
         ("get", c.CFUNCTYPE(BinaryData, c.POINTER(RawProofListIndex), c.c_uint64, c.c_void_p)),
-        ("push", c.CFUNCTYPE(None, c.POINTER(RawProofListIndex), BinaryData)),
+        ("get_range", c.CFUNCTYPE(BinaryData, c.POINTER(RawProofListIndex), c.c_uint64, c.c_uint64, c.c_void_p)),
+        ("push", c.CFUNCTYPE(None, c.POINTER(RawProofListIndex), BinaryArg)),
+        ("extend", c.CFUNCTYPE(None, c.POINTER(RawProofListIndex), BinaryArg)),
         # ("pop", c.CFUNCTYPE(BinaryData, c.POINTER(RawProofListIndex), c.c_void_p)),
         ("len", c.CFUNCTYPE(c.c_uint64, c.POINTER(RawProofListIndex))),
-        ("set_item", c.CFUNCTYPE(None, c.POINTER(RawProofListIndex), c.c_uint64, BinaryData)),
+        ("set_item", c.CFUNCTYPE(None, c.POINTER(RawProofListIndex), c.c_uint64, BinaryArg)),
         ("clear", c.CFUNCTYPE(None, c.POINTER(RawProofListIndex))),
         ("object_hash", c.CFUNCTYPE(BinaryData, c.POINTER(RawProofListIndex), c.c_void_p)),
+        (
+            "get_range_proof",
+            c.CFUNCTYPE(BinaryData, c.POINTER(RawProofListIndex), c.c_uint64, c.c_uint64, c.c_void_p),
+        ),
+        ("free", c.CFUNCTYPE(None, c.POINTER(RawProofListIndex))),
     ]
 
 
-RawProofListIndex._fields_ = [("fork", c.c_void_p), ("index_name", c.c_char_p), ("methods", RawProofListIndexMethods)]
+RawProofListIndex._fields_ = [("handle", c.c_void_p), ("methods", RawProofListIndexMethods)]
 
 
 class ProofListIndexWrapper:
@@ -36,45 +42,71 @@ class ProofListIndexWrapper:
 
     def __init__(self, inner: RawProofListIndex) -> None:
         self._inner = inner
+        self._pointer = c.pointer(inner)
+        self._bind(inner.methods)
+
+    def __del__(self) -> None:
+        self.free()
+
+    def _bind(self, methods: Any) -> None:
+        # Every access to a field of `RawProofListIndexMethods` creates a new function object,
+        # so the functions are resolved once.
+        self._get = methods.get
+        self._get_range = methods.get_range
+        self._push = methods.push
+        self._extend = methods.extend
+        self._len = methods.len
+        self._set_item = methods.set_item
+        self._clear = methods.clear
+        self._object_hash = methods.object_hash
+        self._get_range_proof = methods.get_range_proof
+        self._free = methods.free
+
+    def free(self) -> None:
+        """Closes the native index. Wrapper can't be used after this call, repeated calls do nothing."""
+        if self._inner.handle:
+            self._free(self._pointer)
+        self._bind(FREED_METHODS)
 
     def get(self, idx: int) -> Optional[bytes]:
         """TODO"""
-        result = self._inner.methods.get(self._inner, c.c_uint64(idx), c.cast(merkledb_allocate, c.c_void_p))
+        return self._get(self._pointer, idx, ALLOCATE).into_bytes()
 
-        return result.into_bytes()
+    def get_range(self, start: int, end: int) -> List[bytes]:
+        """Returns the values with indices in the `[start, end)` range in one call.
+        Range is truncated to the length of the list."""
+        return self._get_range(self._pointer, start, end, ALLOCATE).into_items()
 
     def push(self, value: bytes) -> None:
         """TODO"""
-        # mypy isn't a friend of ctypes
-        data = BinaryData(c.cast(value, c.POINTER(c.c_uint8)), c.c_uint64(len(value)))  # type: ignore
+        self._push(self._pointer, BinaryArg(value, len(value)))
 
-        self._inner.methods.push(self._inner, data)
+    def extend(self, values: List[bytes]) -> None:
+        """Appends all the provided values in one call."""
+        packed = pack_items(values)
+
+        self._extend(self._pointer, BinaryArg(packed, len(packed)))
 
     # def pop(self) -> Optional[bytes]:
     #     """TODO"""
-    #     result = self._inner.methods.pop(self._inner, c.cast(merkledb_allocate, c.c_void_p))
-
-    #     return result.into_bytes()
+    #     return self._pop(self._pointer, ALLOCATE).into_bytes()
 
     def len(self) -> int:
         """TODO"""
-        result = self._inner.methods.len(self._inner)
-
-        return result.value
+        return int(self._len(self._pointer))
 
     def set_item(self, idx: int, value: bytes) -> None:
         """TODO"""
-        data = BinaryData(c.cast(value, c.POINTER(c.c_uint8)), c.c_uint64(len(value)))  # type: ignore
-
-        self._inner.methods.set(self._inner, c.c_uint64(idx), data)
+        self._set_item(self._pointer, idx, BinaryArg(value, len(value)))
 
     def clear(self) -> None:
         """TODO"""
-        self._inner.clear()
+        self._clear(self._pointer)
 
     def object_hash(self) -> Hash:
         """TODO"""
+        return Hash(self._object_hash(self._pointer, ALLOCATE).into_bytes())
 
-        result = self._inner.methods.object_hash(self._inner, c.cast(merkledb_allocate, c.c_void_p))
-
-        return Hash(result.into_bytes())
+    def get_range_proof(self, start: int, end: int) -> Optional[bytes]:
+        """Returns the serialized proof for the elements in the `[start, end)` range."""
+        return self._get_range_proof(self._pointer, start, end, ALLOCATE).into_bytes()
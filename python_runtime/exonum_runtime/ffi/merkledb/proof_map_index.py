@@ -1,10 +1,9 @@
 """TODO"""
-from typing import Optional
+from typing import Optional, List, Tuple, Any
 import ctypes as c
 
-from exonum_runtime.ffi.c_callbacks import merkledb_allocate
 from exonum_runtime.crypto import Hash
-from .common import BinaryData
+from .common import BinaryData, BinaryArg, KeyBounds, pack_items, ALLOCATE, FREED_METHODS
 
 # When working with C, it's always a compromise.
 # pylint: disable=protected-access
@@ -18,15 +17,44 @@ class RawProofMapIndexMethods(c.Structure):
     """TODO"""
 
     _fields_ = [
-        ("get", c.CFUNCTYPE(BinaryData, c.POINTER(RawProofMapIndex), BinaryData, c.c_void_p)),
-        ("put", c.CFUNCTYPE(None, c.POINTER(RawProofMapIndex), BinaryData, BinaryData)),
-        ("remove", c.CFUNCTYPE(None, c.POINTER(RawProofMapIndex), BinaryData)),
-        ("clear", c.CFUNCTYPE(c.c_uint64, c.POINTER(RawProofMapIndex))),
+        ("get", c.CFUNCTYPE(BinaryData, c.POINTER(RawProofMapIndex), BinaryArg, c.c_void_p)),
+        (
+            "get_many",
+            c.CFUNCTYPE(
+                BinaryData,
+                c.POINTER(RawProofMapIndex),
+                BinaryArg,
+                c.POINTER(c.c_uint64),
+                c.POINTER(c.c_uint8),
+                c.c_void_p,
+            ),
+        ),
+        (
+            "iter_chunk",
+            c.CFUNCTYPE(
+                BinaryData,
+                c.POINTER(RawProofMapIndex),
+                BinaryArg,
+                BinaryArg,
+                BinaryArg,
+                BinaryArg,
+                c.c_uint64,
+                c.c_uint8,
+                c.c_void_p,
+            ),
+        ),
+        ("put", c.CFUNCTYPE(None, c.POINTER(RawProofMapIndex), BinaryArg, BinaryArg)),
+        ("put_many", c.CFUNCTYPE(None, c.POINTER(RawProofMapIndex), BinaryArg)),
+        ("remove", c.CFUNCTYPE(None, c.POINTER(RawProofMapIndex), BinaryArg)),
+        ("remove_many", c.CFUNCTYPE(None, c.POINTER(RawProofMapIndex), BinaryArg)),
+        ("clear", c.CFUNCTYPE(None, c.POINTER(RawProofMapIndex))),
         ("object_hash", c.CFUNCTYPE(BinaryData, c.POINTER(RawProofMapIndex), c.c_void_p)),
+        ("get_multiproof", c.CFUNCTYPE(BinaryData, c.POINTER(RawProofMapIndex), BinaryArg, c.c_void_p)),
+        ("free", c.CFUNCTYPE(None, c.POINTER(RawProofMapIndex))),
     ]
 
 
-RawProofMapIndex._fields_ = [("fork", c.c_void_p), ("index_name", c.c_char_p), ("methods", RawProofMapIndexMethods)]
+RawProofMapIndex._fields_ = [("handle", c.c_void_p), ("methods", RawProofMapIndexMethods)]
 
 
 class ProofMapIndexWrapper:
@@ -34,36 +62,104 @@ class ProofMapIndexWrapper:
 
     def __init__(self, inner: RawProofMapIndex) -> None:
         self._inner = inner
+        self._pointer = c.pointer(inner)
+        self._bind(inner.methods)
+
+    def __del__(self) -> None:
+        self.free()
+
+    def _bind(self, methods: Any) -> None:
+        # Every access to a field of `RawProofMapIndexMethods` creates a new function object,
+        # so the functions are resolved once.
+        self._get = methods.get
+        self._get_many = methods.get_many
+        self._iter_chunk = methods.iter_chunk
+        self._put = methods.put
+        self._put_many = methods.put_many
+        self._remove = methods.remove
+        self._remove_many = methods.remove_many
+        self._clear = methods.clear
+        self._object_hash = methods.object_hash
+        self._get_multiproof = methods.get_multiproof
+        self._free = methods.free
+
+    def free(self) -> None:
+        """Closes the native index. Wrapper can't be used after this call, repeated calls do nothing."""
+        if self._inner.handle:
+            self._free(self._pointer)
+        self._bind(FREED_METHODS)
 
     def get(self, key: bytes) -> Optional[bytes]:
         """TODO"""
-        # mypy isn't a friend of ctypes
-        key = BinaryData(c.cast(key, c.POINTER(c.c_uint8)), c.c_uint64(len(key)))  # type: ignore
-        result = self._inner.methods.get(self._inner, key, c.cast(merkledb_allocate, c.c_void_p))
+        return self._get(self._pointer, BinaryArg(key, len(key)), ALLOCATE).into_bytes()
 
-        return result.into_bytes()
+    def get_many(self, keys: List[bytes]) -> List[Optional[bytes]]:
+        """Gets values for all the provided keys in one call.
+        Values for absent keys are None."""
+        amount = len(keys)
+        if amount == 0:
+            return []
+
+        packed = pack_items(keys)
+        offsets = (c.c_uint64 * (amount + 1))()
+        found = (c.c_uint8 * amount)()
+
+        result = self._get_many(self._pointer, BinaryArg(packed, len(packed)), offsets, found, ALLOCATE)
+
+        return result.into_values(offsets, found)
+
+    def iter_chunk(
+        self, from_key: Optional[bytes], limit: int, with_values: bool, bounds: KeyBounds = (None, None, None)
+    ) -> List[bytes]:
+        """Reads up to `limit` entries following the `from_key` (or the first entries of the map
+        if `from_key` is None) which satisfy `bounds`: (start, end, prefix), every bound is optional.
+
+        Returns keys if `with_values` is False, and keys interleaved with values otherwise."""
+        start, end, prefix = bounds
+
+        result = self._iter_chunk(
+            self._pointer,
+            BinaryArg.from_optional(from_key),
+            BinaryArg.from_optional(start),
+            BinaryArg.from_optional(end),
+            BinaryArg.from_optional(prefix),
+            limit,
+            with_values,
+            ALLOCATE,
+        )
+
+        return result.into_items()
 
     def put(self, key: bytes, value: bytes) -> None:
         """TODO"""
-        # mypy isn't a friend of ctypes
-        key = BinaryData(c.cast(key, c.POINTER(c.c_uint8)), c.c_uint64(len(key)))  # type: ignore
-        value = BinaryData(c.cast(value, c.POINTER(c.c_uint8)), c.c_uint64(len(value)))  # type: ignore
+        self._put(self._pointer, BinaryArg(key, len(key)), BinaryArg(value, len(value)))
+
+    def put_many(self, entries: List[Tuple[bytes, bytes]]) -> None:
+        """Puts all the provided (key, value) pairs in one call."""
+        packed = pack_items([item for entry in entries for item in entry])
 
-        self._inner.methods.put(self._inner, key, value)
+        self._put_many(self._pointer, BinaryArg(packed, len(packed)))
 
     def remove(self, key: bytes) -> None:
         """TODO"""
-        # mypy isn't a friend of ctypes
-        key = BinaryData(c.cast(key, c.POINTER(c.c_uint8)), c.c_uint64(len(key)))  # type: ignore
-        self._inner.methods.remove(self._inner, key)
+        self._remove(self._pointer, BinaryArg(key, len(key)))
+
+    def remove_many(self, keys: List[bytes]) -> None:
+        """Removes all the provided keys in one call."""
+        packed = pack_items(keys)
+
+        self._remove_many(self._pointer, BinaryArg(packed, len(packed)))
 
     def clear(self) -> None:
         """TODO"""
-        self._inner.methods.clear(self._inner)
+        self._clear(self._pointer)
 
     def object_hash(self) -> Hash:
         """TODO"""
+        return Hash(self._object_hash(self._pointer, ALLOCATE).into_bytes())
 
-        result = self._inner.methods.object_hash(self._inner, c.cast(merkledb_allocate, c.c_void_p))
+    def get_multiproof(self, keys: List[bytes]) -> Optional[bytes]:
+        """Returns the serialized proof for the provided keys."""
+        packed = pack_items(keys)
 
-        return Hash(result.into_bytes())
+        return self._get_multiproof(self._pointer, BinaryArg(packed, len(packed)), ALLOCATE).into_bytes()
@@ -1,7 +1,8 @@
 """C representation of Python types."""
 
-from typing import List, Tuple, Any
+from typing import Any
 import ctypes as c
+import itertools
 
 from exonum_runtime.runtime.types import (
     ArtifactId,
@@ -86,36 +87,25 @@ class RawCallInfo(c.Structure):
         return CallInfo(instance_id=self.instance_id, method_id=self.method_id)
 
 
-class RawHash(c.Structure):
-    """C representation of the hash."""
-
-    _fields_ = [("data", c.POINTER(c.c_uint8))]
-
-    @classmethod
-    def from_hash(cls, value: Hash) -> "RawHash":
-        """Converts Hash to RawHash."""
-        hash_data = (c.c_uint8 * 32)(*value.value)
-
-        return cls(data=hash_data)
-
-
 class RawStateHashAggregator(c.Structure):
     """C representation of StateHashAggregator.
 
-    This structure contain an array of pointers, and every single one of those
-    points to an array of `RawHash` data.
-    The second field is a pointer to an array of arrays lengths.
-    The third field is a pointer to an array of `InstanceId`s denoting the ownership of hashes
-    in the first argument.
-    The fourth field is amount of items in the second field.
+    All the hashes are packed into the first field one after another (32 bytes each).
+    The second field is an array of `length + 1` offsets: hashes of the group `i` are
+    in the `[offsets[i], offsets[i + 1])` range (in hashes, not bytes).
+    The third field is an array of `InstanceId`s denoting the ownership of groups.
+    The fourth field is the amount of groups.
 
-    Amount of items in the third field is (fourth field) - 1, because first array from the first
-    field is the runtime hashes.
+    Amount of items in the third field is (fourth field) - 1, because the first group
+    is the runtime hashes.
+
+    Buffers are reused for every aggregator, so created structure is valid only until
+    the next `from_state_hash_aggregator` call.
     """
 
     _fields_ = [
-        ("hashes", c.POINTER(c.POINTER(RawHash))),
-        ("hashes_length", c.POINTER(c.c_uint32)),
+        ("hashes", c.POINTER(c.c_uint8)),
+        ("offsets", c.POINTER(c.c_uint32)),
         ("instance_ids", c.POINTER(c.c_uint32)),
         ("length", c.c_uint32),
     ]
@@ -123,44 +113,47 @@ class RawStateHashAggregator(c.Structure):
     @classmethod
     def from_state_hash_aggregator(cls, aggregator: StateHashAggregator) -> "RawStateHashAggregator":
         """Creates RawStateHashAggregator from python type."""
+        groups = [aggregator.runtime] + [hashes for _, hashes in aggregator.instances]
+        offsets = list(itertools.accumulate([0] + [len(hashes) for hashes in groups]))
+        instance_ids = [instance_id for instance_id, _ in aggregator.instances]
+
+        # All the hashes are written at once.
+        data = b"".join([state_hash.value for hashes in groups for state_hash in hashes])
 
-        def to_raw_hashes(hashes: List[Hash]) -> Tuple[Any, c.c_uint32]:
-            length = len(hashes)
+        buffers = _STATE_HASH_BUFFERS
+        buffers.hashes = _reserve(buffers.hashes, len(data))
+        c.memmove(buffers.hashes, data, len(data))
 
-            raw_hashes = (RawHash * length)(*list(map(RawHash.from_hash, hashes)))
+        buffers.offsets = _reserve(buffers.offsets, len(offsets))
+        buffers.offsets[: len(offsets)] = offsets
 
-            return (raw_hashes, c.c_uint32(length))
+        buffers.instance_ids = _reserve(buffers.instance_ids, len(instance_ids))
+        buffers.instance_ids[: len(instance_ids)] = instance_ids
 
-        instances_amount = len(aggregator.instances)
-        overall_amount = instances_amount + 1
+        return cls(
+            hashes=buffers.hashes, offsets=buffers.offsets, instance_ids=buffers.instance_ids, length=len(groups)
+        )
 
-        hashes_array = []
-        length_array = []
-        instance_ids_array = []
 
-        runtime_hashes, runtime_length = to_raw_hashes(aggregator.runtime)
+class _StateHashBuffers:
+    """Buffers of RawStateHashAggregator reused across blocks."""
 
-        hashes_array.append(runtime_hashes)
-        length_array.append(runtime_length)
+    def __init__(self) -> None:
+        # Buffers are never empty, so pointers passed to Rust are never null.
+        self.hashes: Any = (c.c_uint8 * 1)()
+        self.offsets: Any = (c.c_uint32 * 1)()
+        self.instance_ids: Any = (c.c_uint32 * 1)()
 
-        for instance_id, hashes in aggregator.instances:
-            instance_hashes, instance_length = to_raw_hashes(hashes)
 
-            hashes_array.append(instance_hashes)
-            length_array.append(instance_length)
+_STATE_HASH_BUFFERS = _StateHashBuffers()
 
-            instance_ids_array.append(instance_id)
 
-        raw_hashes_array = (c.POINTER(RawHash) * overall_amount)(*hashes_array)
-        raw_length_array = (c.c_uint32 * overall_amount)(*length_array)
-        raw_instance_ids_array = (c.c_uint32 * instances_amount)(*instance_ids_array)
+def _reserve(buffer: Any, size: int) -> Any:
+    """Returns the buffer if it has at least `size` elements, or a new (at least twice bigger) buffer otherwise."""
+    if len(buffer) >= size:
+        return buffer
 
-        return cls(
-            hashes=raw_hashes_array,
-            hashes_length=raw_length_array,
-            instance_ids=raw_instance_ids_array,
-            length=overall_amount,
-        )
+    return (buffer._type_ * max(size, 2 * len(buffer)))()
 
 
 class RawProtoSourceFile(c.Structure):
@@ -0,0 +1,102 @@
+"""Cache of the decoded values read through the block snapshot."""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+from collections import OrderedDict
+import threading
+
+from .into_bytes import IntoBytes
+
+
+class CacheStats(NamedTuple):
+    """Counters of the index cache."""
+
+    hits: int
+    misses: int
+    size: int
+    limit: int
+
+
+class _IndexCache:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.entries: "OrderedDict[bytes, Optional[IntoBytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+class ValueCache:
+    """Bounded LRU cache of the decoded map values, separate for every index.
+
+    Cached values are valid for the current block only: `invalidate` must be called once
+    the next block is committed. Every invalidation starts a new generation, and values read
+    within the previous generation are not cached anymore (see `generation` and `put`).
+
+    Please note that cached values are shared by all the readers, so they must not be modified.
+    """
+
+    def __init__(self, default_limit: int, limits: Optional[Dict[bytes, int]] = None):
+        self._default_limit = default_limit
+        self._limits = dict(limits) if limits is not None else dict()
+        self._indices: Dict[bytes, _IndexCache] = dict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def generation(self) -> int:
+        """Returns the current generation. It should be obtained before reading the value from the database."""
+        return self._generation
+
+    def get(self, index_id: bytes, key: bytes) -> Tuple[bool, Optional[IntoBytes]]:
+        """Returns (True, value) if the value of the key is cached, and (False, None) otherwise.
+        Cached value is None if there is no such key in the index."""
+        with self._lock:
+            cache = self._index_cache(index_id)
+
+            if key in cache.entries:
+                cache.entries.move_to_end(key)
+                cache.hits += 1
+                return True, cache.entries[key]
+
+            cache.misses += 1
+            return False, None
+
+    def put(self, index_id: bytes, key: bytes, value: Optional[IntoBytes], generation: int) -> None:
+        """Caches the value read from the database within the provided generation."""
+        with self._lock:
+            if generation != self._generation:
+                # Value may be read from the previous block.
+                return
+
+            cache = self._index_cache(index_id)
+            if cache.limit <= 0:
+                return
+
+            cache.entries[key] = value
+            cache.entries.move_to_end(key)
+
+            if len(cache.entries) > cache.limit:
+                cache.entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drops all the cached values and starts a new generation."""
+        with self._lock:
+            self._generation += 1
+
+            for cache in self._indices.values():
+                cache.entries.clear()
+
+    def stats(self) -> Dict[bytes, CacheStats]:
+        """Returns counters for every index id."""
+        with self._lock:
+            return {
+                index_id: CacheStats(cache.hits, cache.misses, len(cache.entries), cache.limit)
+                for index_id, cache in self._indices.items()
+            }
+
+    def _index_cache(self, index_id: bytes) -> _IndexCache:
+        cache = self._indices.get(index_id)
+
+        if cache is None:
+            cache = _IndexCache(self._limits.get(index_id, self._default_limit))
+            self._indices[index_id] = cache
+
+        return cache
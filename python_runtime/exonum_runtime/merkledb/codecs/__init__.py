@@ -0,0 +1,5 @@
+"""Ready-to-use key and value types for MerkleDB indices."""
+from .keys import U8, U16, U32, U64, I8, I16, I32, I64, Bytes, Str, TimestampIdKey, TupleKey, prefix
+from .proto import ProtoCodec
+from .records import fixed_record, u8, u16, u32, u64, i8, i16, i32, i64, bytes32
+from .compressed import Compressed, train_dictionary
@@ -0,0 +1,140 @@
+"""NumPy structured arrays of fixed-layout records (see `fixed_record`).
+
+Bulk reads of indices can return records as one structured array decoded right from the buffer
+obtained from the database, without creating an object per record:
+
+>>> balances, found = schema.accounts().get_many_array(keys)
+>>> total_supply = balances["balance"][found].sum()
+
+NumPy is an optional dependency, it's imported on the first use.
+"""
+from typing import Any, Dict, Tuple
+import struct
+
+from .records import u8, u16, u32, u64, i8, i16, i32, i64
+
+_NUMPY: Any = None
+
+# `struct` format => NumPy type. Byte strings are stored as raw bytes, since NumPy strings
+# drop trailing zero bytes.
+_NUMPY_TYPES = {
+    "B": "u1",
+    "H": "<u2",
+    "I": "<u4",
+    "Q": "<u8",
+    "b": "i1",
+    "h": "<i2",
+    "i": "<i4",
+    "q": "<i8",
+    "?": "?",
+}
+
+# Scalar types of `fixed_record` => NumPy type.
+_SCALAR_TYPES = {
+    u8: "u1",
+    u16: "<u2",
+    u32: "<u4",
+    u64: "<u8",
+    i8: "i1",
+    i16: "<i2",
+    i32: "<i4",
+    i64: "<i8",
+    bool: "?",
+}
+
+# Length prefix of the items in the buffers of length-prefixed items, the same as in `pack_items`
+# (FFI modules can't be imported by the codecs without an import cycle).
+_ITEM_LEN = struct.Struct("<Q")
+_ITEM_PREFIX_SIZE = _ITEM_LEN.size
+
+_dtypes: Dict[Tuple[type, int], Any] = dict()
+
+
+def numpy() -> Any:
+    """Returns the `numpy` module, raises RuntimeError if it is not installed."""
+    global _NUMPY  # pylint: disable=global-statement
+    if _NUMPY is None:
+        try:
+            import numpy as np  # pylint: disable=import-outside-toplevel
+        except (ModuleNotFoundError, ImportError):
+            raise RuntimeError("numpy library is required for the array access to indices")
+
+        _NUMPY = np
+
+    return _NUMPY
+
+
+def record_dtype(record_type: type, prefix: int = 0) -> Any:
+    """Returns the NumPy dtype of the `fixed_record` type. If `prefix` is provided,
+    every record is preceded by the `prefix` bytes which are not a part of the dtype fields."""
+    dtype = _dtypes.get((record_type, prefix))
+    if dtype is not None:
+        return dtype
+
+    fields = getattr(record_type, "_record_fields_", None)
+    if fields is None:
+        raise TypeError(f"{record_type.__name__} is not a fixed-layout record, see `fixed_record`")
+
+    names, formats, offsets = [], [], []
+    offset = prefix
+    for name, field_format in fields:
+        if field_format.endswith("s"):
+            numpy_type = f"V{field_format[:-1]}"
+        else:
+            numpy_type = _NUMPY_TYPES[field_format]
+
+        names.append(name)
+        formats.append(numpy_type)
+        offsets.append(offset)
+        offset += numpy().dtype(numpy_type).itemsize
+
+    dtype = numpy().dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": offset})
+    _dtypes[(record_type, prefix)] = dtype
+
+    return dtype
+
+
+def scalar_dtype(scalar_type: Any) -> Any:
+    """Returns the little-endian NumPy dtype of the fixed-width scalar type: either one of
+    the `fixed_record` scalar types (`u8`..`i64`, `bool`), or anything accepted by `numpy.dtype`
+    (e.g. `"f8"` or `numpy.float64`)."""
+    dtype = numpy().dtype(_SCALAR_TYPES.get(scalar_type, scalar_type))
+    if dtype.hasobject or dtype.itemsize == 0:
+        raise TypeError(f"{scalar_type} is not a fixed-width type")
+
+    return dtype.newbyteorder("<")
+
+
+def records_from_values(record_type: type, buffer: bytearray, offsets: Any, found: Any) -> Tuple[Any, Any]:
+    """Decodes the values returned by `get_many` of a map (see `MapIndexWrapper.get_many_buffer`).
+
+    Returns the array of records and the boolean mask of found values, records of absent values are zeroed."""
+    np = numpy()
+    dtype = record_dtype(record_type)
+
+    found_mask = np.frombuffer(found, dtype=np.uint8).astype(bool)
+    lengths = np.diff(np.frombuffer(offsets, dtype=np.uint64))[found_mask]
+    if np.any(lengths != dtype.itemsize) or len(buffer) != len(lengths) * dtype.itemsize:
+        raise ValueError(f"Values don't match the layout of {record_type.__name__}")
+
+    records = np.zeros(len(found_mask), dtype=dtype)
+    records[found_mask] = np.frombuffer(buffer, dtype=dtype)
+
+    return records, found_mask
+
+
+def records_from_items(record_type: type, buffer: bytearray) -> Any:
+    """Decodes the buffer of length-prefixed items (e.g. returned by `get_range` of a list).
+
+    Resulting array is a view of the buffer: length prefixes are skipped by the dtype offsets."""
+    np = numpy()
+    dtype = record_dtype(record_type, _ITEM_PREFIX_SIZE)
+
+    if len(buffer) % dtype.itemsize != 0:
+        raise ValueError(f"Items don't match the layout of {record_type.__name__}")
+
+    prefix_dtype = np.dtype({"names": ["length"], "formats": ["<u8"], "offsets": [0], "itemsize": dtype.itemsize})
+    if np.any(np.frombuffer(buffer, dtype=prefix_dtype)["length"] != dtype.itemsize - _ITEM_PREFIX_SIZE):
+        raise ValueError(f"Items don't match the layout of {record_type.__name__}")
+
+    return np.frombuffer(buffer, dtype=dtype)
@@ -0,0 +1,178 @@
+"""Compression of large index values.
+
+>>> Document = Compressed[JsonDocument, 6, 1024]
+>>>
+>>> class DocumentsSchema(Schema):
+...     documents: MapIndex[Str, Document]
+>>>
+>>> schema.documents()[Str("readme")] = Document(JsonDocument(...))
+>>> document = schema.documents()[Str("readme")].value
+
+Values with encoding longer than the threshold are compressed by zlib. Values of the similar
+structure compress much better with a shared dictionary, see `train_dictionary`:
+
+>>> DOCUMENTS_DICTIONARY = train_dictionary(sample_documents)
+>>> Document = Compressed[JsonDocument, 6, 256, DOCUMENTS_DICTIONARY]
+
+Note that the dictionary is a part of the storage format: values compressed with a dictionary
+can be decoded only with the same dictionary (which is checked by its CRC32).
+Compressed encoding doesn't preserve the order, so it's meant for values, not keys.
+
+zlib output is not guaranteed to be the same for different zlib builds (e.g. zlib and zlib-ng),
+so nodes may encode the same value differently. Compressed values must not be stored in the
+indices which are a part of the state hash (`ProofMapIndex`, `ProofListIndex` and the indices
+listed in `_state_hash_`), otherwise nodes may disagree on the state hash.
+"""
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+import struct
+import zlib
+
+from ..into_bytes import IntoBytes
+
+# First byte of the encoded value.
+_RAW = 0
+_ZLIB = 1
+_ZLIB_WITH_DICTIONARY = 2
+
+# CRC32 of the dictionary follows the header byte of values compressed with a dictionary.
+_DICTIONARY_ID = struct.Struct("<I")
+
+DEFAULT_LEVEL = 6
+DEFAULT_THRESHOLD = 512
+# zlib can't refer further than 32 KB back, so a bigger dictionary is useless.
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+class Compressed(IntoBytes):
+    """Wrapper of the value of another `IntoBytes` type which is compressed when stored.
+
+    Concrete types are declared as `Compressed[Codec, level, threshold, dictionary]`, where all
+    the parameters except for `Codec` are optional. Wrapped value is available as `value`.
+
+    Encoding depends on the zlib build, so it must not be used in the hashed indices (see above)."""
+
+    __slots__ = ("value",)
+
+    _codec: Optional[Type[IntoBytes]] = None
+    _level = DEFAULT_LEVEL
+    _threshold = DEFAULT_THRESHOLD
+    _dictionary: Optional[bytes] = None
+    _dictionary_id = b""
+    _pool: Dict[Tuple[Any, ...], Type["Compressed"]] = dict()
+
+    def __init__(self, value: IntoBytes) -> None:
+        if self._codec is None:
+            raise RuntimeError("You must specify value type, e.g. Compressed[Codec]")
+
+        self.value = value
+
+    def __class_getitem__(cls, params: Any) -> Type["Compressed"]:  # type: ignore
+        if not isinstance(params, tuple):
+            params = (params,)
+
+        if not 1 <= len(params) <= 4:
+            raise ValueError("Compressed parameters are the value type, level, threshold and dictionary")
+
+        codec, level, threshold, dictionary = params + (DEFAULT_LEVEL, DEFAULT_THRESHOLD, None)[len(params) - 1 :]
+        if not (isinstance(codec, type) and issubclass(codec, IntoBytes)):
+            raise ValueError("Compressed value type must be a subclass of IntoBytes")
+
+        if not (isinstance(level, int) and -1 <= level <= 9):
+            raise ValueError("Compression level must be an integer from -1 to 9")
+
+        if not (isinstance(threshold, int) and threshold >= 0):
+            raise ValueError("Compression threshold must be a non-negative integer")
+
+        if dictionary is not None and not (isinstance(dictionary, bytes) and len(dictionary) <= MAX_DICTIONARY_SIZE):
+            raise ValueError(f"Dictionary must be a byte string up to {MAX_DICTIONARY_SIZE} bytes long")
+
+        params = (codec, level, threshold, dictionary)
+        if params not in cls._pool:
+            dct: Dict[str, Any] = {
+                "__module__": cls.__module__,
+                "__slots__": (),
+                "_codec": codec,
+                "_level": level,
+                "_threshold": threshold,
+                "_dictionary": dictionary,
+            }
+            if dictionary is not None:
+                dct["_dictionary_id"] = _DICTIONARY_ID.pack(zlib.crc32(dictionary))
+
+            cls._pool[params] = type(cls)(f"Compressed[{codec.__name__}]", (Compressed,), dct)
+
+        return cls._pool[params]
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and self.value == other.value  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.value!r})"
+
+    def into_bytes(self) -> bytes:
+        data = self.value.into_bytes()
+        if len(data) > self._threshold:
+            if self._dictionary is None:
+                compressor = zlib.compressobj(self._level)
+                header = bytes([_ZLIB])
+            else:
+                compressor = zlib.compressobj(self._level, zdict=self._dictionary)
+                header = bytes([_ZLIB_WITH_DICTIONARY]) + self._dictionary_id
+
+            compressed = compressor.compress(data) + compressor.flush()
+            # Incompressible data is stored as is.
+            if len(header) + len(compressed) < len(data):
+                return header + compressed
+
+        return bytes([_RAW]) + data
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Compressed":
+        if not data:
+            raise ValueError("Compressed value must have a header")
+
+        assert cls._codec is not None
+        header = data[0]
+        if header == _RAW:
+            raw = data[1:]
+        elif header == _ZLIB:
+            raw = zlib.decompress(data[1:])
+        elif header == _ZLIB_WITH_DICTIONARY:
+            payload_start = 1 + _DICTIONARY_ID.size
+            if cls._dictionary is None or data[1:payload_start] != cls._dictionary_id:
+                raise ValueError("Value is compressed with an unknown dictionary")
+
+            decompressor = zlib.decompressobj(zdict=cls._dictionary)
+            raw = decompressor.decompress(data[payload_start:]) + decompressor.flush()
+        else:
+            raise ValueError(f"Unknown compression header {header}")
+
+        return cls(cls._codec.from_bytes(raw))
+
+
+def train_dictionary(samples: Iterable[bytes], size: int = MAX_DICTIONARY_SIZE, segment: int = 16) -> bytes:
+    """Builds a zlib dictionary from the sample values (e.g. encodings of typical documents).
+
+    Dictionary consists of the `segment`-long substrings most frequently occurring in the samples.
+    Most frequent substrings are placed at the end of the dictionary, since zlib encodes closer
+    references with fewer bits."""
+    if not 0 < size <= MAX_DICTIONARY_SIZE:
+        raise ValueError(f"Dictionary size must be from 1 to {MAX_DICTIONARY_SIZE} bytes")
+
+    step = max(segment // 2, 1)
+    counter: Counter = Counter()
+    for sample in samples:
+        # Every substring is counted once per sample, so a single repetitive sample doesn't dominate.
+        counter.update({sample[pos : pos + segment] for pos in range(0, max(len(sample) - segment, 0) + 1, step)})
+
+    chosen = []
+    total = 0
+    for substring, count in counter.most_common():
+        if count < 2 or total + len(substring) > size:
+            break
+
+        chosen.append(substring)
+        total += len(substring)
+
+    return b"".join(reversed(chosen))
@@ -0,0 +1,299 @@
+"""Order-preserving key types.
+
+MapIndex stores keys ordered by their binary representation, so range and prefix scans
+(`MapIndex.items(start=..., end=..., prefix=...)`) are meaningful only if the encoding
+of the key preserves the order of the encoded values. Types in this module guarantee that:
+for any two keys `a < b` it holds that `a.into_bytes() < b.into_bytes()`.
+
+>>> class OrdersSchema(Schema):
+...     orders: MapIndex[TupleKey[Bytes, TimestampIdKey], Order]
+>>>
+>>> # All the orders of the account within the time window:
+>>> start = TupleKey[Bytes, TimestampIdKey](account, TimestampIdKey(since, 0))
+>>> end = TupleKey[Bytes, TimestampIdKey](account, TimestampIdKey(until, 0))
+>>> schema.orders().items(start=start, end=end)
+"""
+from typing import Any, Dict, Tuple, Type
+import struct
+
+from ..into_bytes import IntoBytes
+
+
+class _OrderedKey(IntoBytes):
+    """Base class for the keys comparable by their value."""
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and self.value == other.value  # type: ignore
+
+    def __lt__(self, other: "_OrderedKey") -> bool:
+        return self.value < other.value  # type: ignore
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.value))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.value!r})"
+
+
+class _BigEndianInt(_OrderedKey):
+    """Integer encoded in the big-endian byte order.
+
+    Signed integers have the sign bit flipped, so negative values precede positive ones."""
+
+    _size = 8
+    _signed = False
+
+    def into_bytes(self) -> bytes:
+        value = self.value
+        if self._signed:
+            value += 1 << (self._size * 8 - 1)
+
+        return value.to_bytes(self._size, "big")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "_BigEndianInt":
+        if len(data) != cls._size:
+            raise ValueError(f"{cls.__name__} must be exactly {cls._size} bytes long")
+
+        value = int.from_bytes(data, "big")
+        if cls._signed:
+            value -= 1 << (cls._size * 8 - 1)
+
+        return cls(value)
+
+
+class U8(_BigEndianInt):
+    """Unsigned 8-bit integer key."""
+
+    _size = 1
+
+
+class U16(_BigEndianInt):
+    """Unsigned 16-bit integer key."""
+
+    _size = 2
+
+
+class U32(_BigEndianInt):
+    """Unsigned 32-bit integer key."""
+
+    _size = 4
+
+
+class U64(_BigEndianInt):
+    """Unsigned 64-bit integer key (e.g. block height)."""
+
+    _size = 8
+
+
+class I8(_BigEndianInt):
+    """Signed 8-bit integer key."""
+
+    _size = 1
+    _signed = True
+
+
+class I16(_BigEndianInt):
+    """Signed 16-bit integer key."""
+
+    _size = 2
+    _signed = True
+
+
+class I32(_BigEndianInt):
+    """Signed 32-bit integer key."""
+
+    _size = 4
+    _signed = True
+
+
+class I64(_BigEndianInt):
+    """Signed 64-bit integer key."""
+
+    _size = 8
+    _signed = True
+
+
+class Bytes(_OrderedKey):
+    """Raw bytes key."""
+
+    def into_bytes(self) -> bytes:
+        return bytes(self.value)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Bytes":
+        return cls(bytes(data))
+
+
+class Str(_OrderedKey):
+    """String key. UTF-8 preserves the order of code points."""
+
+    def into_bytes(self) -> bytes:
+        return self.value.encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Str":
+        return cls(bytes(data).decode("utf-8"))
+
+
+class TimestampIdKey(_OrderedKey):
+    """Composite key of a timestamp (e.g. microseconds since epoch) and an id
+    disambiguating entries with the same timestamp. Both are unsigned 64-bit integers.
+
+    Entries are ordered by timestamp and then by id, so a time window is one range scan."""
+
+    _format = struct.Struct(">QQ")
+
+    def __init__(self, timestamp: int, entry_id: int) -> None:
+        super().__init__((timestamp, entry_id))
+
+    @property
+    def timestamp(self) -> int:
+        """Timestamp part of the key."""
+        return self.value[0]
+
+    @property
+    def entry_id(self) -> int:
+        """Id part of the key."""
+        return self.value[1]
+
+    def __repr__(self) -> str:
+        return f"TimestampIdKey({self.timestamp}, {self.entry_id})"
+
+    def into_bytes(self) -> bytes:
+        return self._format.pack(*self.value)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TimestampIdKey":
+        return cls(*cls._format.unpack(data))
+
+    @classmethod
+    def prefix(cls, timestamp: int) -> bytes:
+        """Returns the prefix shared by all the keys with the provided timestamp."""
+        return U64(timestamp).into_bytes()
+
+
+# Escaping of the tuple components: zero bytes inside of the component are escaped,
+# and every component is followed by the terminator which is less than any escaped byte.
+_ESCAPED_ZERO = b"\x00\xff"
+_TERMINATOR = b"\x00\x01"
+
+
+def _escape(component: bytes) -> bytes:
+    return component.replace(b"\x00", _ESCAPED_ZERO) + _TERMINATOR
+
+
+def _unescape_all(data: bytes) -> Tuple[bytes, ...]:
+    components = []
+    current = bytearray()
+    pos = 0
+    while pos < len(data):
+        byte = data[pos]
+        if byte != 0:
+            current.append(byte)
+            pos += 1
+            continue
+
+        marker = data[pos : pos + 2]
+        if marker == _ESCAPED_ZERO:
+            current.append(0)
+        elif marker == _TERMINATOR:
+            components.append(bytes(current))
+            current = bytearray()
+        else:
+            raise ValueError("Incorrect tuple key encoding")
+        pos += 2
+
+    if current:
+        raise ValueError("Tuple key is not terminated")
+
+    return tuple(components)
+
+
+class TupleKey(_OrderedKey):
+    """Key composed of several ordered keys, compared component by component.
+
+    Concrete tuple types are declared the same way as the index types:
+
+    >>> AccountOrder = TupleKey[Bytes, U64]
+    >>> key = AccountOrder(b"account", 42)
+
+    Components are not length-prefixed, since length prefix breaks the order of
+    variable-length components (b"b" would precede b"ab"). Instead, every component is
+    escaped and terminated, which keeps the encoding order-preserving and allows
+    prefix scans by leading components (see `prefix`)."""
+
+    _components: Tuple[Type[IntoBytes], ...] = ()
+    _pool: Dict[Tuple[Type[IntoBytes], ...], Type["TupleKey"]] = dict()
+
+    def __init__(self, *values: Any) -> None:
+        if len(values) != len(self._components):
+            raise ValueError(f"Expected {len(self._components)} components, got {len(values)}")
+
+        # Components are stored the same way as `from_bytes` creates them, so equal keys compare equal
+        # no matter if components were provided as the key objects or as the raw values.
+        super().__init__(tuple(_component_value(value) if isinstance(value, IntoBytes) else value for value in values))
+
+    def __class_getitem__(cls, components: Any) -> Type["TupleKey"]:  # type: ignore
+        if not isinstance(components, tuple):
+            components = (components,)
+
+        if not all(isinstance(component, type) and issubclass(component, IntoBytes) for component in components):
+            raise ValueError("Tuple key components must be subclasses of IntoBytes")
+
+        if components not in cls._pool:
+            names = ", ".join(component.__name__ for component in components)
+            cls._pool[components] = type(cls)(f"TupleKey[{names}]", (TupleKey,), {"_components": components})
+
+        return cls._pool[components]
+
+    def into_bytes(self) -> bytes:
+        return self.prefix(*self.value)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TupleKey":
+        parts = _unescape_all(data)
+        if len(parts) != len(cls._components):
+            raise ValueError(f"Expected {len(cls._components)} components, got {len(parts)}")
+
+        return cls(*(_component_value(component.from_bytes(part)) for component, part in zip(cls._components, parts)))
+
+    @classmethod
+    def prefix(cls, *values: Any) -> bytes:
+        """Returns the prefix shared by all the keys starting with provided components."""
+        if len(values) > len(cls._components):
+            raise ValueError(f"Expected at most {len(cls._components)} components, got {len(values)}")
+
+        return b"".join(_escape(_into_component(component, value)) for component, value in zip(cls._components, values))
+
+
+def _into_component(component: Type[IntoBytes], value: Any) -> bytes:
+    # Components can be provided either as the key objects or as the raw values.
+    if not isinstance(value, IntoBytes):
+        value = component(value)  # type: ignore
+
+    return value.into_bytes()
+
+
+def _component_value(key: IntoBytes) -> Any:
+    # Single-value keys are unwrapped to the raw values, so `TupleKey[U64, Str](1, "a").value == (1, "a")`.
+    if isinstance(key, (_BigEndianInt, Bytes, Str)):
+        return key.value
+
+    return key
+
+
+def prefix(key_type: Type[IntoBytes], *values: Any) -> bytes:
+    """Returns the binary prefix of keys of `key_type` for the prefix scan.
+
+    For tuple keys, values are the leading components; for `TimestampIdKey`, the timestamp;
+    for other keys, the value itself (e.g. a byte string prefix for `Bytes`)."""
+    prefix_method = getattr(key_type, "prefix", None)
+    if prefix_method is not None:
+        return prefix_method(*values)
+
+    (value,) = values
+    return _into_component(key_type, value)
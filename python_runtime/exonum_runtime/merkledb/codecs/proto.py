@@ -0,0 +1,147 @@
+"""Protobuf messages as index keys and values.
+
+>>> Wallet = ProtoCodec[service_pb2.Wallet]
+>>>
+>>> class CryptocurrencySchema(Schema):
+...     wallets: MapIndex[WalletKey, Wallet]
+>>>
+>>> wallet = Wallet(name="Alice", balance=100)
+>>> wallet.balance -= 10
+>>> schema.wallets()[key] = wallet
+
+Values read from the database are decoded lazily: the message is parsed on the first access
+to its fields, and values which are only moved between indices are never parsed at all.
+"""
+from typing import Any, Dict, List, Optional, Type
+import threading
+
+from ..into_bytes import IntoBytes
+
+# Maximum amount of the released messages kept for reuse (per message type).
+_POOL_LIMIT = 64
+# Guards the pools of the released messages and publication of the decoded ones.
+_LOCK = threading.Lock()
+
+
+class ProtoCodec(IntoBytes):
+    """Wrapper of the protobuf message of a concrete type. Fields of the message are accessible
+    as the attributes of the wrapper, and the message itself is available as `message`.
+
+    Concrete codec types are declared the same way as the index types: `ProtoCodec[MessageType]`.
+
+    Decoded messages are taken from the pool of the released ones. Values which are not needed
+    anymore can be returned to the pool with `release`, which is useful in loops over many entries.
+    Values can be shared between threads (e.g. through the value cache of the index): concurrent
+    decoding of one value publishes a single message.
+    """
+
+    __slots__ = ("_data", "_message")
+
+    _message_type: Any = None
+    _free: List[Any] = []
+    _pool: Dict[Any, Type["ProtoCodec"]] = dict()
+
+    def __init__(self, message: Any = None, **fields: Any) -> None:
+        if self._message_type is None:
+            raise RuntimeError("You must specify message type, e.g. ProtoCodec[MessageType]")
+
+        if message is None:
+            message = self._message_type(**fields)
+        elif fields:
+            raise ValueError("Either message or its fields should be provided")
+
+        object.__setattr__(self, "_data", None)
+        object.__setattr__(self, "_message", message)
+
+    def __class_getitem__(cls, message_type: Any) -> Type["ProtoCodec"]:  # type: ignore
+        if not (isinstance(message_type, type) and hasattr(message_type, "ParseFromString")):
+            raise ValueError("ProtoCodec type must be a protobuf message type")
+
+        if message_type not in cls._pool:
+            dct = {"__module__": cls.__module__, "__slots__": (), "_message_type": message_type, "_free": []}
+            cls._pool[message_type] = type(cls)(f"ProtoCodec[{message_type.__name__}]", (ProtoCodec,), dct)
+
+        return cls._pool[message_type]
+
+    @property
+    def message(self) -> Any:
+        """Decoded protobuf message."""
+        message = self._message
+        if message is not None:
+            return message
+
+        with _LOCK:
+            decoded = self._free.pop() if self._free else self._message_type()
+
+        # Encoded data is never changed, so the message can be parsed outside of the lock.
+        decoded.ParseFromString(self._data)
+
+        with _LOCK:
+            message = self._message
+            if message is None:
+                # Message can be changed from now on, so it's serialized again in `into_bytes`.
+                object.__setattr__(self, "_message", decoded)
+                return decoded
+
+            # Value was decoded by another thread in the meantime.
+            if len(self._free) < _POOL_LIMIT:
+                decoded.Clear()
+                self._free.append(decoded)
+
+        return message
+
+    def __getattr__(self, name: str) -> Any:
+        # Private attributes are never proxied, so the wrapper without the slots set
+        # (e.g. being copied or unpickled) doesn't recurse into `message`.
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return getattr(self.message, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in ProtoCodec.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.message, name, value)
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and self.into_bytes() == other.into_bytes()  # type: ignore
+
+    def __hash__(self) -> int:
+        # Hash depends on the content, so values must not be changed while used as keys of a dict.
+        return hash(self.into_bytes())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.message!r})"
+
+    def release(self) -> None:
+        """Returns the decoded message to the pool. The value is decoded again from the data it was
+        read from on the next access, so changes of the message are dropped. Values created from
+        a message (rather than read from the database) have nothing to restore, so they are not
+        released."""
+        if self._data is None:
+            return
+
+        with _LOCK:
+            message: Optional[Any] = self._message
+            object.__setattr__(self, "_message", None)
+
+            if message is not None and len(self._free) < _POOL_LIMIT:
+                message.Clear()
+                self._free.append(message)
+
+    def into_bytes(self) -> bytes:
+        message = self._message
+        if message is None:
+            return self._data
+
+        # Deterministic serialization keeps map fields ordered, so equal messages are equal in bytes.
+        return message.SerializeToString(deterministic=True)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ProtoCodec":
+        value = cls.__new__(cls)
+        object.__setattr__(value, "_data", bytes(data))
+        object.__setattr__(value, "_message", None)
+
+        return value
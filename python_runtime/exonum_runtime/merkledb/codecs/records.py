@@ -0,0 +1,144 @@
+"""Fixed-layout records.
+
+`fixed_record` turns a dataclass with fixed-width fields into an `IntoBytes` type which
+is encoded and decoded with a single precompiled `struct.Struct`:
+
+>>> @fixed_record
+... @dataclass
+... class Account:
+...     owner: PublicKey
+...     balance: u64
+...     history_hash: Hash
+...     frozen: bool = False
+>>>
+>>> class AccountsSchema(Schema):
+...     accounts: MapIndex[U64, Account]
+
+Integer fields are annotated with the `u8`..`i64` types, which are plain `int`s at runtime.
+"""
+from typing import Any, Callable, Dict, List, NewType, Tuple, Type, TypeVar, get_type_hints
+import dataclasses
+import operator
+import struct
+
+from exonum_runtime.crypto import Hash, PublicKey, HASH_BYTES_LEN, PUBLIC_KEY_BYTES_LEN
+
+from ..into_bytes import IntoBytes
+
+# pylint: disable=invalid-name
+u8 = NewType("u8", int)
+u16 = NewType("u16", int)
+u32 = NewType("u32", int)
+u64 = NewType("u64", int)
+i8 = NewType("i8", int)
+i16 = NewType("i16", int)
+i32 = NewType("i32", int)
+i64 = NewType("i64", int)
+bytes32 = NewType("bytes32", bytes)
+# pylint: enable=invalid-name
+
+# Field type => `struct` format of the field.
+_FORMATS: Dict[Any, str] = {
+    u8: "B",
+    u16: "H",
+    u32: "I",
+    u64: "Q",
+    i8: "b",
+    i16: "h",
+    i32: "i",
+    i64: "q",
+    bool: "?",
+    bytes32: "32s",
+    Hash: f"{HASH_BYTES_LEN}s",
+    PublicKey: f"{PUBLIC_KEY_BYTES_LEN}s",
+}
+
+T = TypeVar("T")
+
+
+def _check_bytes32(value: bytes) -> bytes:
+    # `struct` silently pads and truncates byte strings.
+    if len(value) != 32:
+        raise ValueError(f"Expected 32 bytes, got {len(value)}")
+
+    return value
+
+
+# Field type => (encoder, decoder) of the field value, for the types which are not stored as is.
+_CONVERTERS: Dict[Any, Tuple[Callable[[Any], Any], Callable[[Any], Any]]] = {
+    bytes32: (_check_bytes32, bytes),
+    Hash: (operator.attrgetter("value"), Hash),
+    PublicKey: (operator.attrgetter("value"), PublicKey),
+}
+
+
+def fixed_record(cls: Type[T]) -> Type[T]:
+    """Class decorator generating `into_bytes`/`from_bytes` for a dataclass with fixed-width fields.
+
+    The resulting class is a subclass of `IntoBytes` with `__slots__`, so it can be used in the index
+    types directly (e.g. `ListIndex[Account]`). Fields are packed in the order of declaration,
+    little-endian and without padding. Field layout is available as `_record_fields_`
+    (a tuple of `(name, struct format)` pairs)."""
+    if not dataclasses.is_dataclass(cls):
+        raise TypeError("fixed_record must be applied to a dataclass")
+
+    hints = get_type_hints(cls)
+    names = [field.name for field in dataclasses.fields(cls)]
+    if not names:
+        raise TypeError("Record must have at least one field")
+
+    layout = []
+    encoders: List[Tuple[int, Callable[[Any], Any]]] = []
+    decoders: List[Tuple[int, Callable[[Any], Any]]] = []
+    for position, name in enumerate(names):
+        field_type = hints[name]
+        if field_type not in _FORMATS:
+            raise TypeError(f"Field '{name}' of {cls.__name__} has type {field_type} which is not fixed-width")
+
+        layout.append((name, _FORMATS[field_type]))
+        if field_type in _CONVERTERS:
+            encoder, decoder = _CONVERTERS[field_type]
+            encoders.append((position, encoder))
+            decoders.append((position, decoder))
+
+    packer = struct.Struct("<" + "".join(field_format for _, field_format in layout))
+    getter = operator.attrgetter(*names)
+    single_field = len(names) == 1
+
+    def into_bytes(self: Any) -> bytes:
+        values = [getter(self)] if single_field else list(getter(self))
+        for position, encoder in encoders:
+            values[position] = encoder(values[position])
+
+        return packer.pack(*values)
+
+    def from_bytes(record_cls: Any, data: bytes) -> Any:
+        values = packer.unpack(data)
+        if not decoders:
+            return record_cls(*values)
+
+        fields = list(values)
+        for position, decoder in decoders:
+            fields[position] = decoder(fields[position])
+
+        return record_cls(*fields)
+
+    dct = dict(cls.__dict__)
+    # Slots replace the instance dict, and class-level defaults would conflict with them
+    # (dataclass `__init__` keeps the defaults by itself).
+    dct.pop("__dict__", None)
+    dct.pop("__weakref__", None)
+    for name in names:
+        dct.pop(name, None)
+
+    dct["__slots__"] = tuple(names)
+    dct["into_bytes"] = into_bytes
+    dct["from_bytes"] = classmethod(from_bytes)
+    dct["_struct_"] = packer
+    dct["_record_fields_"] = tuple(layout)
+
+    bases = cls.__bases__
+    if not issubclass(cls, IntoBytes):
+        bases = tuple(base for base in bases if base is not object) + (IntoBytes,)
+
+    return type(IntoBytes)(cls.__name__, bases, dct)  # type: ignore
@@ -0,0 +1,144 @@
+"""Cache of the index values which survives across blocks."""
+
+from typing import Dict, Optional, Set, Tuple
+from collections import OrderedDict
+
+# Values of a single index: key => encoded value (None for removed keys).
+_Layer = Dict[bytes, Optional[bytes]]
+
+
+class HotCache:
+    """Cache of the values of the indices listed in the `_hot_cache_` attribute of schemas.
+
+    Values are kept encoded and decoded by the index on every read, so objects returned to
+    the services are never shared with the cache (and may be modified in place).
+
+    Cache relies on the fact that such indices are changed only by the Python services
+    through the index objects, so every change is known to the cache. Values are kept in three layers:
+
+    - committed: values from the last committed block (bounded LRU, separate for every index);
+    - block: changes made by the transactions of the block being executed;
+    - transaction: changes made by the transaction being executed.
+
+    Runtime notifies the cache about transactions and blocks being finished. If more than one block
+    is executed before the commit, it is not known which of them was committed, so the whole cache is dropped.
+    """
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._committed: Dict[bytes, "OrderedDict[bytes, Optional[bytes]]"] = dict()
+        self._block: Dict[bytes, _Layer] = dict()
+        self._transaction: Dict[bytes, _Layer] = dict()
+        # Changes of the executed blocks which are not committed yet.
+        self._finished_block: Dict[bytes, _Layer] = dict()
+        self._finished_blocks = 0
+        # Indices changed outside of the block execution since the last commit.
+        self._untracked: Set[bytes] = set()
+
+    def index(self, index_id: bytes, tracked: bool) -> "HotIndexCache":
+        """Returns the cache of the index. Changes made through the `tracked=False` cache
+        (e.g. by the access which doesn't belong to the block execution) invalidate the index."""
+        return HotIndexCache(self, index_id, tracked)
+
+    def get(self, index_id: bytes, key: bytes) -> Tuple[bool, Optional[bytes]]:
+        """Returns (True, value) if the value of the key is known, and (False, None) otherwise."""
+        for layers in (self._transaction, self._block):
+            layer = layers.get(index_id)
+            if layer is not None and key in layer:
+                return True, layer[key]
+
+        committed = self._committed.get(index_id)
+        if committed is not None and key in committed:
+            committed.move_to_end(key)
+            return True, committed[key]
+
+        return False, None
+
+    def read(self, index_id: bytes, key: bytes, value: Optional[bytes]) -> None:
+        """Caches the value read from the database. The key must not be changed within the current block."""
+        if index_id in self._untracked:
+            # Database may contain changes which are not known to the cache.
+            return
+
+        committed = self._committed.setdefault(index_id, OrderedDict())
+        committed[key] = value
+
+        if len(committed) > self._limit:
+            committed.popitem(last=False)
+
+    def write(self, index_id: bytes, key: bytes, value: Optional[bytes]) -> None:
+        """Records the change made by the current transaction."""
+        self._transaction.setdefault(index_id, dict())[key] = value
+
+    def invalidate(self, index_id: bytes, untracked: bool = False) -> None:
+        """Drops all the cached values of the index. If the index is changed outside of the block execution
+        (`untracked=True`), values are not cached until the next commit."""
+        if untracked:
+            self._untracked.add(index_id)
+
+        for layers in (self._committed, self._block, self._transaction, self._finished_block):
+            layers.pop(index_id, None)
+
+    def commit_transaction(self) -> None:
+        """Moves the changes of the succeeded transaction to the block layer."""
+        for index_id, changes in self._transaction.items():
+            self._block.setdefault(index_id, dict()).update(changes)
+        self._transaction.clear()
+
+    def rollback_transaction(self) -> None:
+        """Drops the changes of the failed transaction."""
+        self._transaction.clear()
+
+    def finish_block(self) -> None:
+        """Marks the block as executed. Next transactions are executed in the new block."""
+        self.commit_transaction()
+
+        self._finished_block = self._block
+        self._block = dict()
+        self._finished_blocks += 1
+
+    def commit_block(self) -> None:
+        """Applies the changes of the committed block."""
+        if self._finished_blocks == 1:
+            for index_id, changes in self._finished_block.items():
+                for key, value in changes.items():
+                    self.read(index_id, key, value)
+        else:
+            self._committed.clear()
+
+        self._untracked.clear()
+        self._finished_block = dict()
+        self._finished_blocks = 0
+
+
+class HotIndexCache:
+    """Cache of the single index, see `HotCache`."""
+
+    def __init__(self, cache: HotCache, index_id: bytes, tracked: bool):
+        self._cache = cache
+        self._index_id = index_id
+        self._tracked = tracked
+
+    def get(self, key: bytes) -> Tuple[bool, Optional[bytes]]:
+        """Returns (True, value) if the value of the key is known, and (False, None) otherwise."""
+        if not self._tracked:
+            return False, None
+
+        return self._cache.get(self._index_id, key)
+
+    def read(self, key: bytes, value: Optional[bytes]) -> None:
+        """Caches the value read from the database."""
+        if self._tracked:
+            self._cache.read(self._index_id, key, value)
+
+    def write(self, key: bytes, value: Optional[bytes]) -> None:
+        """Records the change of the value (None for removed keys)."""
+        if self._tracked:
+            self._cache.write(self._index_id, key, value)
+        else:
+            self._cache.invalidate(self._index_id, untracked=True)
+
+    def clear(self) -> None:
+        """Records the removal of all the values."""
+        # Removed keys are not known, so the index is not cached until the next commit.
+        self._cache.invalidate(self._index_id, untracked=True)
@@ -1,4 +1,6 @@
 """TODO"""
+from .base_index import IndexAccessError, set_access_checks
+from .column_list_index import ColumnListIndex
 from .list_index import ListIndex
 from .map_index import MapIndex
 from .proof_list_index import ProofListIndex
@@ -1,5 +1,5 @@
 """TODO"""
-from typing import Any, no_type_check, Tuple, Dict, Optional, Union, Type
+from typing import Any, no_type_check, cast, Tuple, Dict, List, Optional, Union, Type, Callable
 import functools
 
 from ..types import Access, Fork
@@ -13,32 +13,106 @@ class IndexAccessError(Exception):
 IndexDataTypes = Union[Type[IntoBytes], Tuple[Type[IntoBytes], Type[IntoBytes]]]
 # Pool of generated typed classes to avoid re-creation.
 _descriptor_pool: Dict[Tuple[type, IndexDataTypes], "_BaseIndexMeta"] = dict()
+# Index classes which methods are rebound by `set_access_checks`.
+_index_classes: List["_BaseIndexMeta"] = []
+# Pool of index classes without mutable methods, used for indices created with a Snapshot.
+_read_only_pool: Dict["_BaseIndexMeta", "_BaseIndexMeta"] = dict()
+_access_checks = True
+
+
+def set_access_checks(enabled: bool) -> None:
+    """Enables or disables the checks performed on every call of an index method.
+
+    With checks disabled (production mode), access is checked once when the index is created,
+    and indices created with a Snapshot lose their mutable methods."""
+    global _access_checks  # pylint: disable=global-statement
+    _access_checks = enabled
+
+    for index_class in _index_classes:
+        index_class._bind_methods()
+
+
+def _read_only_method(name: str) -> Callable[..., Any]:
+    def read_only(*_args: Any, **_kwargs: Any) -> Any:
+        raise IndexAccessError("Attemt to get mutable access with a Snapshot")
+
+    read_only.__name__ = name
+    return read_only
 
 
 class _BaseIndexMeta(type):
     def __new__(cls, name: str, bases: Tuple[type, ...], dct: Dict[str, Any]) -> type:  # type: ignore
-        if name == "BaseIndex":
-            # Proxy class, skip it.
+        if name == "BaseIndex" or dct.get("_read_only_", False):
+            # Proxy class or read-only variant of an index, skip it.
             return super().__new__(cls, name, bases, dct)
 
-        if BaseIndex not in bases:
+        if not any(issubclass(base, BaseIndex) for base in bases):
             raise TypeError("Index classes should be derived from BaseIndex")
 
         # Methods that don't need an `ensure` check
         skip_methods = ["initialize", "ensure_access", "mutable"]
 
         # Containter methods should be wrapped.
-        contaiter_methods = ["__len__", "__getitem__", "__setitem__", "__delitem__", "__contains__", "__iter__"]
-
-        # Wrap all the public methods into `_ensure`.
-        for key in dct:
+        contaiter_methods = [
+            "__len__",
+            "__getitem__",
+            "__setitem__",
+            "__delitem__",
+            "__contains__",
+            "__iter__",
+            "__reversed__",
+        ]
+
+        # Keep both checked and unchecked versions of all the public methods,
+        # `_bind_methods` decides which one is used.
+        checked_methods = dict()
+        raw_methods = dict()
+        # Mutable methods inherited from the base index class are replaced in the read-only variant as well.
+        mutable_methods = [key for base in bases for key in getattr(base, "_mutable_methods_", []) if key not in dct]
+        for key, method in dct.items():
             if key in skip_methods:
                 continue
 
-            if key in contaiter_methods or (not key.startswith("_") and callable(dct[key])):
-                dct[key] = BaseIndex._ensure(dct[key])
+            if key in contaiter_methods or (not key.startswith("_") and callable(method)):
+                checked_methods[key] = BaseIndex._ensure(method)
+
+                if getattr(method, "_mutable_", False):
+                    mutable_methods.append(key)
+                    # Mutability is checked once on index creation in production mode.
+                    method = _track_changes(method.__wrapped__)
+                raw_methods[key] = method
+
+        dct["_checked_methods_"] = checked_methods
+        dct["_raw_methods_"] = raw_methods
+        dct["_mutable_methods_"] = mutable_methods
+
+        new_class = super().__new__(cls, name, bases, dct)
+        new_class._bind_methods()
+        _index_classes.append(new_class)
+
+        return new_class
+
+    def _bind_methods(cls) -> None:
+        """Sets either checked or unchecked methods depending on the `set_access_checks` setting."""
+        methods = getattr(cls, "_checked_methods_") if _access_checks else getattr(cls, "_raw_methods_")
+
+        for key, method in methods.items():
+            setattr(cls, key, method)
+
+    def _read_only(cls) -> "_BaseIndexMeta":
+        """Returns the subclass of the index with mutable methods raising `IndexAccessError`."""
+        read_only = _read_only_pool.get(cls)
+
+        if read_only is None:
+            dct: Dict[str, Any] = {key: _read_only_method(key) for key in getattr(cls, "_mutable_methods_")}
+            dct["_read_only_"] = True
+            dct["__module__"] = cls.__module__
+            dct["__qualname__"] = cls.__qualname__
+
+            read_only = cast("_BaseIndexMeta", type(cls)(cls.__name__, (cls,), dct))
+            _read_only_pool[cls] = read_only
 
-        return super().__new__(cls, name, bases, dct)
+        return read_only
 
     def __getitem__(cls, item: IndexDataTypes) -> type:
         """Instatiation of generic types of stored types.
@@ -58,16 +132,21 @@ class _BaseIndexMeta(type):
         if (cls, item) in _descriptor_pool:
             return _descriptor_pool[(cls, item)]
 
-        one_generic = isinstance(item, type)
-        two_generics = (
-            isinstance(item, tuple)
-            and len(item) == 2
-            and issubclass(item[0], IntoBytes)
-            and issubclass(item[1], IntoBytes)
-        )
+        validate_generic = getattr(cls, "_validate_generic_", None)
+        if validate_generic is not None:
+            # Index stores something other than `IntoBytes` objects and checks the type by itself.
+            validate_generic(item)
+        else:
+            one_generic = isinstance(item, type)
+            two_generics = (
+                isinstance(item, tuple)
+                and len(item) == 2
+                and issubclass(item[0], IntoBytes)
+                and issubclass(item[1], IntoBytes)
+            )
 
-        if not (one_generic or two_generics):
-            raise ValueError("Key/value types in indices must be subclasses of IntoBytes")
+            if not (one_generic or two_generics):
+                raise ValueError("Key/value types in indices must be subclasses of IntoBytes")
 
         dct = dict(cls.__dict__)
         bases = cls.__bases__
@@ -80,6 +159,7 @@ class _BaseIndexMeta(type):
 
         # Store it into descriptor cache
         _descriptor_pool[(cls, item)] = new_class  # type: ignore
+        _index_classes.append(new_class)  # type: ignore
 
         return new_class
 
@@ -126,6 +206,29 @@ class _BaseIndexMeta(type):
         return getattr(cls, "_generic")
 
 
+@no_type_check
+def _track_changes(method):
+    """Marks the index as changed in the Fork before calling the method."""
+
+    @functools.wraps(method)
+    def track_changes(obj: "BaseIndex", *args: Any, **kwargs: Any) -> Any:
+        # pylint: disable=protected-access
+        obj._access.mark_changed(obj._index_id)
+
+        return method(obj, *args, **kwargs)
+
+    return track_changes
+
+
+@functools.lru_cache(maxsize=4096)
+def _index_id(instance_name: str, index_name: str, family: Optional[str]) -> bytes:
+    """Builds the full name of the index in the database."""
+    if family is None:
+        return bytes(f"{instance_name}.{index_name}", "utf-8")
+
+    return bytes(f"{instance_name}.{index_name}.{family}", "utf-8")
+
+
 class BaseIndex(metaclass=_BaseIndexMeta):
     """Base interface to the database for indices.
 
@@ -144,15 +247,22 @@ class BaseIndex(metaclass=_BaseIndexMeta):
         self._instance_name = instance_name
         self._index_name = index_name
         self._index_id = b""
+        # Set by the schema for the indices listed in its `_hot_cache_` attribute.
+        self._hot_cache_enabled = False
 
         self._initialized = False
 
     def __call__(self, family: Optional[str] = None) -> "BaseIndex":
         """Initializes the index and sets the index family if provided."""
-        if family is None:
-            self._index_id = bytes(f"{self._instance_name}.{self._index_name}", "utf-8")
-        else:
-            self._index_id = bytes(f"{self._instance_name}.{self._index_name}.{family}", "utf-8")
+        self._index_id = _index_id(self._instance_name, self._index_name, family)
+
+        if not _access_checks:
+            # Methods don't check anything in production mode, so everything is checked here.
+            if not self._access.valid():
+                raise IndexAccessError("Access to index expired")
+
+            if not isinstance(self._access, Fork):
+                self.__class__ = type(self)._read_only()  # type: ignore
 
         self.initialize()
 
@@ -185,8 +295,11 @@ class BaseIndex(metaclass=_BaseIndexMeta):
             if not isinstance(obj._access, Fork):
                 raise IndexAccessError("Attemt to get mutable access with a Snapshot")
 
+            obj._access.mark_changed(obj._index_id)
+
             return method(obj, *args, **kwargs)
 
+        ensure_fork._mutable_ = True
         return ensure_fork
 
     @no_type_check
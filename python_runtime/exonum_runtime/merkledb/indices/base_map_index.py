@@ -0,0 +1,292 @@
+"""Common implementation of the map indices."""
+
+from typing import Optional, Iterable, List, Mapping, Tuple, Union, Dict
+
+from exonum_runtime.ffi.merkledb import MerkledbFFI
+from exonum_runtime.ffi.merkledb.common import KeyBounds
+from .base_index import BaseIndex
+from .iterators import MapIter, DEFAULT_CHUNK_SIZE
+from ..into_bytes import IntoBytes
+
+
+class BaseMapIndex(BaseIndex):
+    """Base class of MapIndex and ProofMapIndex.
+
+    Implements reading and writing of the entries through the write-back overlay and the caches.
+    Subclasses set `_index_type_` (name of the index constructor of `MerkledbFFI`) and add
+    the methods specific to the index type."""
+
+    _index_type_ = ""
+
+    def initialize(self) -> None:
+        """Initializes the map index internal structure."""
+        # pylint: disable=attribute-defined-outside-init
+        concrete_key, concrete_value = type(self)._two_index_types()
+        self._concrete_key = concrete_key
+        self._concrete_value = concrete_value
+
+        ffi = MerkledbFFI.instance()
+        index_type = self._index_type_
+        self._index = self._access.index_handle(index_type, self._index_id, getattr(ffi, index_type))
+        self._overlay = self._access.overlay(index_type, self._index_id, self._index)
+        self._cache = self._access.value_cache()
+        self._hot = self._access.hot_cache(self._index_id) if self._hot_cache_enabled else None
+
+    def _flush(self) -> None:
+        # Operations reading the whole index need all the changes in the database.
+        if self._overlay is not None:
+            self._overlay.flush()
+
+    def __iter__(self) -> MapIter:
+        return self.keys()
+
+    def keys(
+        self,
+        start: Optional[IntoBytes] = None,
+        end: Optional[IntoBytes] = None,
+        prefix: Optional[bytes] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> MapIter:
+        """Returns an iterator over the keys of the map. See `items` for the description of arguments."""
+        self._flush()
+        return MapIter(self._index, self._concrete_key.from_bytes, None, chunk_size, _bounds(start, end, prefix))
+
+    def values(
+        self,
+        start: Optional[IntoBytes] = None,
+        end: Optional[IntoBytes] = None,
+        prefix: Optional[bytes] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> MapIter:
+        """Returns an iterator over the values of the map. See `items` for the description of arguments."""
+        self._flush()
+        return MapIter(self._index, None, self._concrete_value.from_bytes, chunk_size, _bounds(start, end, prefix))
+
+    def items(
+        self,
+        start: Optional[IntoBytes] = None,
+        end: Optional[IntoBytes] = None,
+        prefix: Optional[bytes] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> MapIter:
+        """Returns an iterator over the (key, value) pairs of the map.
+
+        If provided, only entries with keys in the `[start, end)` range and with binary
+        representation starting with `prefix` are returned.
+        Entries are fetched from the database by `chunk_size` items at once.
+
+        Keys of MapIndex are iterated in the lexicographic order of their binary representation,
+        so bounded scans only touch the requested entries (see `exonum_runtime.merkledb.codecs`
+        for the order-preserving key types).
+
+        Entries of ProofMapIndex are ordered by the hash of the key rather than by the key itself,
+        so the iteration order is arbitrary and bounds don't narrow the scan: every entry of the map
+        is checked (on the Rust side)."""
+        self._flush()
+        key_from_bytes, value_from_bytes = self._concrete_key.from_bytes, self._concrete_value.from_bytes
+        return MapIter(self._index, key_from_bytes, value_from_bytes, chunk_size, _bounds(start, end, prefix))
+
+    def _value_from_bytes(self, value: Optional[bytes]) -> Optional[IntoBytes]:
+        if value is not None:
+            return self._concrete_value.from_bytes(value)
+
+        return None
+
+    def __getitem__(self, key: IntoBytes) -> IntoBytes:
+        value = self.get(key)
+
+        if value is None:
+            raise KeyError(f"KeyError: {key}")
+
+        return value
+
+    def get(self, key: IntoBytes, default: Optional[IntoBytes] = None) -> Optional[IntoBytes]:
+        """Returns the value assotiated with provided key, or `default` value if there is
+        no such key in the map."""
+        raw_key = key.into_bytes()
+
+        if self._overlay is not None and raw_key in self._overlay:
+            written = self._overlay[raw_key]
+            return default if written is None else self._value_from_bytes(written)
+
+        if self._hot is not None:
+            value = self._hot_get(raw_key)
+            return default if value is None else value
+
+        if self._cache is not None:
+            value = self._cached_get(raw_key)
+            return default if value is None else value
+
+        value = self._index.get(raw_key)
+
+        if value is None:
+            return default
+
+        return self._value_from_bytes(value)
+
+    def _hot_get(self, raw_key: bytes) -> Optional[IntoBytes]:
+        assert self._hot is not None
+
+        found, raw_value = self._hot.get(raw_key)
+        if not found:
+            raw_value = self._index.get(raw_key)
+            self._hot.read(raw_key, raw_value)
+
+        # Values are decoded on every read, so changing them in place doesn't affect the cache.
+        return self._value_from_bytes(raw_value)
+
+    def _hot_get_many(self, raw_keys: List[bytes]) -> List[Optional[IntoBytes]]:
+        assert self._hot is not None
+
+        raw_values: Dict[bytes, Optional[bytes]] = dict()
+        missing = []
+        for raw_key in raw_keys:
+            found, raw_value = self._hot.get(raw_key)
+            if found:
+                raw_values[raw_key] = raw_value
+            else:
+                missing.append(raw_key)
+
+        for raw_key, raw_value in zip(missing, self._index.get_many(missing)):
+            raw_values[raw_key] = raw_value
+            self._hot.read(raw_key, raw_value)
+
+        return [self._value_from_bytes(raw_values[raw_key]) for raw_key in raw_keys]
+
+    def _cached_get(self, raw_key: bytes) -> Optional[IntoBytes]:
+        assert self._cache is not None
+
+        found, value = self._cache.get(self._index_id, raw_key)
+        if not found:
+            generation = self._cache.generation()
+            value = self._value_from_bytes(self._index.get(raw_key))
+            self._cache.put(self._index_id, raw_key, value, generation)
+
+        return value
+
+    def _cached_get_many(self, raw_keys: List[bytes]) -> List[Optional[IntoBytes]]:
+        assert self._cache is not None
+
+        generation = self._cache.generation()
+        values: Dict[bytes, Optional[IntoBytes]] = dict()
+        missing = []
+        for raw_key in raw_keys:
+            found, value = self._cache.get(self._index_id, raw_key)
+            if found:
+                values[raw_key] = value
+            else:
+                missing.append(raw_key)
+
+        # Values which are not cached are fetched at once.
+        for raw_key, raw_value in zip(missing, self._index.get_many(missing)):
+            value = self._value_from_bytes(raw_value)
+            values[raw_key] = value
+            self._cache.put(self._index_id, raw_key, value, generation)
+
+        return [values[raw_key] for raw_key in raw_keys]
+
+    def get_many(self, keys: Iterable[IntoBytes]) -> List[Optional[IntoBytes]]:
+        """Returns the values associated with provided keys (None for absent keys).
+
+        All the values are fetched from the database at once, which is much faster than
+        calling `get` for every key."""
+        raw_keys = [key.into_bytes() for key in keys]
+        overlay = self._overlay
+
+        if not overlay:
+            return self._fetch_many(raw_keys)
+
+        # Only keys without pending changes are fetched, the same way as `get` does.
+        missing = [raw_key for raw_key in raw_keys if raw_key not in overlay]
+        fetched = dict(zip(missing, self._fetch_many(missing)))
+
+        return [self._value_from_bytes(overlay[key]) if key in overlay else fetched[key] for key in raw_keys]
+
+    def _fetch_many(self, raw_keys: List[bytes]) -> List[Optional[IntoBytes]]:
+        if self._hot is not None:
+            return self._hot_get_many(raw_keys)
+
+        if self._cache is not None:
+            return self._cached_get_many(raw_keys)
+
+        return [self._value_from_bytes(value) for value in self._index.get_many(raw_keys)]
+
+    @BaseIndex.mutable
+    def __setitem__(self, key: IntoBytes, value: IntoBytes) -> None:
+        raw_key, raw_value = key.into_bytes(), value.into_bytes()
+
+        if self._hot is not None:
+            self._hot.write(raw_key, raw_value)
+
+        if self._overlay is not None:
+            self._overlay.put(raw_key, raw_value)
+            return
+
+        self._index.put(raw_key, raw_value)
+
+    @BaseIndex.mutable
+    def put_many(self, entries: Union[Mapping[IntoBytes, IntoBytes], Iterable[Tuple[IntoBytes, IntoBytes]]]) -> None:
+        """Puts all the provided entries (either a mapping or an iterable of (key, value) pairs)
+        into the index at once."""
+        items = entries.items() if isinstance(entries, Mapping) else entries
+        encoded = [(key.into_bytes(), value.into_bytes()) for key, value in items]
+
+        if self._hot is not None:
+            for raw_key, raw_value in encoded:
+                self._hot.write(raw_key, raw_value)
+
+        if self._overlay is not None:
+            for raw_key, raw_value in encoded:
+                self._overlay.put(raw_key, raw_value)
+            return
+
+        self._index.put_many(encoded)
+
+    @BaseIndex.mutable
+    def __delitem__(self, key: IntoBytes) -> None:
+        """Removes an element from the map."""
+        raw_key = key.into_bytes()
+
+        if self._hot is not None:
+            self._hot.write(raw_key, None)
+
+        if self._overlay is not None:
+            self._overlay.remove(raw_key)
+            return
+
+        self._index.remove(raw_key)
+
+    @BaseIndex.mutable
+    def remove_many(self, keys: Iterable[IntoBytes]) -> None:
+        """Removes all the provided keys from the index at once."""
+        raw_keys = [key.into_bytes() for key in keys]
+
+        if self._hot is not None:
+            for raw_key in raw_keys:
+                self._hot.write(raw_key, None)
+
+        if self._overlay is not None:
+            for raw_key in raw_keys:
+                self._overlay.remove(raw_key)
+            return
+
+        self._index.remove_many(raw_keys)
+
+    @BaseIndex.mutable
+    def clear(self) -> None:
+        """Removes all the elements from index."""
+        if self._hot is not None:
+            self._hot.clear()
+
+        if self._overlay is not None:
+            self._overlay.discard()
+
+        self._index.clear()
+
+
+def _bounds(start: Optional[IntoBytes], end: Optional[IntoBytes], prefix: Optional[bytes]) -> KeyBounds:
+    return (
+        start.into_bytes() if start is not None else None,
+        end.into_bytes() if end is not None else None,
+        prefix,
+    )
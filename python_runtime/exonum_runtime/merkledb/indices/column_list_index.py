@@ -0,0 +1,148 @@
+"""List of fixed-width numbers stored by chunks."""
+
+from typing import Any, Iterable
+
+from exonum_runtime.ffi.merkledb import MerkledbFFI
+from .base_index import BaseIndex
+from ..types import Fork
+from ..codecs.arrays import numpy, scalar_dtype
+
+# Amount of elements stored in one entry of the underlying list.
+CHUNK_SIZE = 4096
+
+
+class ColumnListIndex(BaseIndex):
+    """List of fixed-width numbers (e.g. per-block time series) with the NumPy interface.
+
+    Element type is either a `fixed_record` scalar type or anything accepted by `numpy.dtype`:
+
+    >>> class PricesSchema(Schema):
+    ...     ticks: ColumnListIndex[u64]
+    ...     volumes: ColumnListIndex["f8"]
+
+    Elements are stored in chunks of `CHUNK_SIZE` elements (little-endian), every chunk is one
+    entry of the underlying list. So reading a range costs one database call. With a Fork, the
+    partial last chunk is kept in memory for the access scope (see `ColumnOverlay`): appending
+    costs at most one write of the partial chunk, and full chunks are never rewritten.
+    """
+
+    @staticmethod
+    def _validate_generic_(item: Any) -> None:
+        # Element type is resolved by NumPy on the index creation, so NumPy is not needed to declare a schema.
+        if isinstance(item, tuple):
+            raise ValueError("ColumnListIndex has exactly one element type, e.g. ColumnListIndex[u64]")
+
+    def initialize(self) -> None:
+        """Initializes the ColumnListIndex internal structure."""
+        # pylint: disable=attribute-defined-outside-init
+        generic = getattr(type(self), "_generic", None)
+        if generic is None:
+            raise RuntimeError("You must specify element type, e.g. ColumnListIndex[u64]")
+
+        self._dtype = scalar_dtype(generic)
+        self._chunk_bytes = CHUNK_SIZE * self._dtype.itemsize
+
+        ffi = MerkledbFFI.instance()
+        self._index = self._access.index_handle("list_index", self._index_id, ffi.list_index)
+        self._overlay = None
+        if isinstance(self._access, Fork):
+            self._overlay = self._access.column_overlay(self._index_id, self._index, self._chunk_bytes)
+
+    def _to_array(self, data: bytes) -> Any:
+        return numpy().frombuffer(data, dtype=self._dtype)
+
+    def _flush(self) -> None:
+        # Elements are read from the database, so appended ones must be written first.
+        if self._overlay is not None:
+            self._overlay.flush()
+
+    def __len__(self) -> int:
+        if self._overlay is not None:
+            return self._overlay.size() // self._dtype.itemsize
+
+        chunks = self._index.len()
+        if chunks == 0:
+            return 0
+
+        last_chunk = self._index.get(chunks - 1)
+        return (chunks - 1) * CHUNK_SIZE + len(last_chunk) // self._dtype.itemsize
+
+    def __getitem__(self, idx: int) -> Any:
+        self._flush()
+        if idx < 0:
+            idx += len(self)
+
+        chunk = self._index.get(idx // CHUNK_SIZE) if idx >= 0 else None
+        if chunk is None or (idx % CHUNK_SIZE) * self._dtype.itemsize >= len(chunk):
+            raise IndexError("ColumnListIndex index out of range")
+
+        return self._to_array(chunk)[idx % CHUNK_SIZE]
+
+    def get_range(self, start: int, end: int) -> Any:
+        """Returns elements with indices in the `[start, end)` range as a read-only NumPy array.
+        All the covered chunks are fetched from the database at once. Range is truncated to
+        the length of the list."""
+        if start < 0:
+            raise IndexError("ColumnListIndex index out of range")
+
+        self._flush()
+        if end <= start:
+            return self._to_array(b"")
+
+        first_chunk = start // CHUNK_SIZE
+        chunks = self._index.get_range(first_chunk, (end - 1) // CHUNK_SIZE + 1)
+        values = self._to_array(b"".join(chunks))
+
+        offset = start - first_chunk * CHUNK_SIZE
+        return values[offset : offset + end - start]
+
+    def to_array(self) -> Any:
+        """Returns all the elements as a read-only NumPy array."""
+        self._flush()
+        return self._to_array(b"".join(self._index.get_range(0, self._index.len())))
+
+    @BaseIndex.mutable
+    def __setitem__(self, idx: int, value: Any) -> None:
+        length = len(self)
+        if idx < 0:
+            idx += length
+
+        if not 0 <= idx < length:
+            raise IndexError("ColumnListIndex index out of range")
+
+        self._flush()
+        chunk_idx = idx // CHUNK_SIZE
+        chunk = self._to_array(self._index.get(chunk_idx)).copy()
+        chunk[idx % CHUNK_SIZE] = value
+
+        self._index.set_item(chunk_idx, chunk.tobytes())
+        if self._overlay is not None:
+            # Changed chunk may be the partial one, so it's read again.
+            self._overlay.discard()
+
+    @BaseIndex.mutable
+    def append(self, value: Any) -> None:
+        """Adds an element to the ColumnListIndex. Prefer `extend` for adding several elements."""
+        self.extend([value])
+
+    @BaseIndex.mutable
+    def extend(self, values: Iterable[Any]) -> None:
+        """Adds all the provided elements (any array-like object) to the ColumnListIndex at once."""
+        if not hasattr(values, "__len__"):
+            values = list(values)
+
+        data = numpy().asarray(values, dtype=self._dtype).tobytes()
+        if not data:
+            return
+
+        # Mutable methods are called only with a Fork, which always has the overlay.
+        assert self._overlay is not None
+        self._overlay.extend(data)
+
+    @BaseIndex.mutable
+    def clear(self) -> None:
+        """Removes all the elements from index."""
+        if self._overlay is not None:
+            self._overlay.discard()
+
+        self._index.clear()
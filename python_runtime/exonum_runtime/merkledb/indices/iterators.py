@@ -0,0 +1,146 @@
+"""Iterators over the index contents which fetch data from the database in chunks."""
+from typing import Callable, Optional, Iterator, List, Union, Any
+
+from exonum_runtime.ffi.merkledb import ListIndexWrapper, ProofListIndexWrapper, MapIndexWrapper, ProofMapIndexWrapper
+from exonum_runtime.ffi.merkledb.common import KeyBounds
+
+# Default amount of elements fetched from the database at once.
+DEFAULT_CHUNK_SIZE = 128
+
+# Marker of the end of the current chunk.
+_END = object()
+
+
+class ListIter:
+    """Iterator over the `[start, end)` range of a list index.
+
+    Instead of requesting elements one by one, iterator fetches `chunk_size` elements
+    per FFI call and yields them from the local buffer.
+    If `reverse` is True, elements are yielded from the end of the range."""
+
+    def __init__(
+        self,
+        index: Union[ListIndexWrapper, ProofListIndexWrapper],
+        from_bytes: Callable[[bytes], Any],
+        start: int = 0,
+        end: Optional[int] = None,
+        reverse: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+
+        if start < 0 or (end is not None and end < 0):
+            raise ValueError("Range bounds must be non-negative")
+
+        # Range is truncated to the length of the list, the same way as `get_range` does.
+        length = index.len()
+        self._index = index
+        self._from_bytes = from_bytes
+        self._start = start
+        self._end = length if end is None else min(end, length)
+        self._reverse = reverse
+        self._chunk_size = chunk_size
+        self._chunk: Iterator[bytes] = iter(())
+
+    def __iter__(self) -> "ListIter":
+        return self
+
+    def __next__(self) -> Any:
+        value = next(self._chunk, None)
+        if value is None:
+            self._chunk = self._fetch_chunk()
+            value = next(self._chunk)
+
+        return self._from_bytes(value)
+
+    def _fetch_chunk(self) -> Iterator[bytes]:
+        if self._start >= self._end:
+            raise StopIteration
+
+        if self._reverse:
+            start, end = max(self._start, self._end - self._chunk_size), self._end
+            self._end = start
+        else:
+            start, end = self._start, min(self._end, self._start + self._chunk_size)
+            self._start = end
+
+        values = self._index.get_range(start, end)
+        if len(values) != end - start:
+            raise RuntimeError("Index size changed during iteration")
+
+        return reversed(values) if self._reverse else iter(values)
+
+
+class MapIter:
+    """Iterator over the entries of a map index.
+
+    Entries are read by a native cursor: every FFI call returns up to `chunk_size`
+    entries and the next call resumes after the last returned key.
+
+    Iterator yields keys if `value_from_bytes` is None, values if `key_from_bytes` is None,
+    and (key, value) pairs otherwise. Values are not read from the database when only
+    keys are requested.
+
+    Only entries satisfying `bounds` (start, end, prefix) are returned; bounds are checked
+    on the Rust side."""
+
+    def __init__(
+        self,
+        index: Union[MapIndexWrapper, ProofMapIndexWrapper],
+        key_from_bytes: Optional[Callable[[bytes], Any]],
+        value_from_bytes: Optional[Callable[[bytes], Any]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        bounds: KeyBounds = (None, None, None),
+    ) -> None:
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+
+        self._index = index
+        self._bounds = bounds
+        self._key_from_bytes = key_from_bytes
+        self._value_from_bytes = value_from_bytes
+        self._with_values = value_from_bytes is not None
+        self._chunk_size = chunk_size
+
+        self._last_key: Optional[bytes] = None
+        self._exhausted = False
+        self._chunk: Iterator[Any] = iter(())
+
+    def __iter__(self) -> "MapIter":
+        return self
+
+    def __next__(self) -> Any:
+        item = next(self._chunk, _END)
+        if item is _END:
+            self._chunk = self._fetch_chunk()
+            item = next(self._chunk)
+
+        return item
+
+    def _fetch_chunk(self) -> Iterator[Any]:
+        if self._exhausted:
+            raise StopIteration
+
+        items = self._index.iter_chunk(self._last_key, self._chunk_size, self._with_values, self._bounds)
+
+        step = 2 if self._with_values else 1
+        keys = items[::step]
+        if len(keys) < self._chunk_size:
+            self._exhausted = True
+        if not keys:
+            raise StopIteration
+
+        self._last_key = keys[-1]
+
+        return iter(self._decode(keys, items[1::2]))
+
+    def _decode(self, keys: List[bytes], values: List[bytes]) -> List[Any]:
+        if self._value_from_bytes is None:
+            return [self._key_from_bytes(key) for key in keys]  # type: ignore
+
+        if self._key_from_bytes is None:
+            return [self._value_from_bytes(value) for value in values]
+
+        key_from_bytes, value_from_bytes = self._key_from_bytes, self._value_from_bytes
+        return [(key_from_bytes(key), value_from_bytes(value)) for key, value in zip(keys, values)]
@@ -1,9 +1,11 @@
 """TODO"""
 
-from typing import Optional
+from typing import Any, Optional, Iterable, List, Union
 
-from exonum_runtime.ffi.merkledb import MerkledbFFI, ListIndexWrapper
+from exonum_runtime.ffi.merkledb import MerkledbFFI
 from .base_index import BaseIndex
+from .iterators import ListIter, DEFAULT_CHUNK_SIZE
+from ..codecs.arrays import records_from_items
 from ..into_bytes import IntoBytes
 
 
@@ -16,10 +18,21 @@ class ListIndex(BaseIndex):
         self._concrete = type(self)._one_index_type()
 
         ffi = MerkledbFFI.instance()
-        self._index = ffi.list_index(self._index_id, self._access.inner())
+        self._index = self._access.index_handle("list_index", self._index_id, ffi.list_index)
 
-    def __iter__(self) -> "_ListIndexIter":
-        return _ListIndexIter(self._index)
+    def __iter__(self) -> ListIter:
+        return ListIter(self._index, self._concrete.from_bytes)
+
+    def __reversed__(self) -> ListIter:
+        return ListIter(self._index, self._concrete.from_bytes, reverse=True)
+
+    def iter_range(
+        self, start: int = 0, end: Optional[int] = None, reverse: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> ListIter:
+        """Returns an iterator over elements in the `[start, end)` range which fetches
+        `chunk_size` elements from the database at once. Range is truncated to the length
+        of the list, negative bounds are not allowed."""
+        return ListIter(self._index, self._concrete.from_bytes, start, end, reverse, chunk_size)
 
     def _from_bytes(self, value: Optional[bytes]) -> Optional[IntoBytes]:
         if value is not None:
@@ -27,11 +40,34 @@ class ListIndex(BaseIndex):
 
         return None
 
-    def __getitem__(self, idx: int) -> Optional[IntoBytes]:
+    def __getitem__(self, idx: Union[int, slice]) -> Union[Optional[IntoBytes], List[IntoBytes]]:
+        if isinstance(idx, slice):
+            indices = range(*idx.indices(len(self)))
+            if not indices:
+                return []
+
+            # Fetch the whole covered range at once and pick the requested elements from it.
+            first = min(indices[0], indices[-1])
+            values = self._index.get_range(first, max(indices[0], indices[-1]) + 1)
+
+            return [self._concrete.from_bytes(values[i - first]) for i in indices]
+
         item = self._index.get(idx)
 
         return self._from_bytes(item)
 
+    def get_range(self, start: int, end: int) -> List[IntoBytes]:
+        """Returns elements with indices in the `[start, end)` range fetched from
+        the database at once. Range is truncated to the length of the list."""
+        return [self._concrete.from_bytes(value) for value in self._index.get_range(start, end)]
+
+    def get_range_array(self, start: int, end: int) -> Any:
+        """Same as `get_range`, but returns the elements as a NumPy structured array.
+
+        Element type must be a `fixed_record`. Array is a view of the buffer obtained
+        from the database, so no object is created per element."""
+        return records_from_items(self._concrete, self._index.get_range_buffer(start, end))
+
     @BaseIndex.mutable
     def __setitem__(self, idx: int, value: IntoBytes) -> None:
         self._index.set_item(idx, value.into_bytes())
@@ -49,6 +85,11 @@ class ListIndex(BaseIndex):
         """Adds an element to the ListIndex."""
         self._index.push(item.into_bytes())
 
+    @BaseIndex.mutable
+    def extend(self, items: Iterable[IntoBytes]) -> None:
+        """Adds all the provided elements to the ListIndex at once."""
+        self._index.extend([item.into_bytes() for item in items])
+
     @BaseIndex.mutable
     def pop(self) -> Optional[IntoBytes]:
         """Removes the last element from the ListIndex and returns its value
@@ -61,22 +102,3 @@ class ListIndex(BaseIndex):
     def clear(self) -> None:
         """Removes all the elements from index."""
         self._index.clear()
-
-
-class _ListIndexIter:
-    def __init__(self, index: ListIndexWrapper):
-        self._pos = 0
-        self._index = index
-        self._len = self._index.len()
-
-    def __next__(self) -> bytes:
-        if self._pos >= self._len:
-            raise StopIteration
-
-        value = self._index.get(self._pos)
-        if value is None:
-            raise RuntimeError("Index size changed during iteration")
-
-        self._pos += 1
-
-        return value
@@ -1,63 +1,25 @@
 """TODO"""
 
-from typing import Optional
+from typing import Any, Iterable, Tuple
 
-from exonum_runtime.ffi.merkledb import MerkledbFFI
-from .base_index import BaseIndex
+from .base_map_index import BaseMapIndex
+from ..codecs.arrays import records_from_values
 from ..into_bytes import IntoBytes
 
 
-class MapIndex(BaseIndex):
+class MapIndex(BaseMapIndex):
     """TODO"""
 
-    def initialize(self) -> None:
-        """Initializes the MapIndex internal structure."""
-        # pylint: disable=attribute-defined-outside-init
-        concrete_key, concrete_value = type(self)._two_index_types()
-        self._concrete_key = concrete_key
-        self._concrete_value = concrete_value
+    _index_type_ = "map_index"
 
-        ffi = MerkledbFFI.instance()
-        self._index = ffi.map_index(self._index_id, self._access.inner())
+    def get_many_array(self, keys: Iterable[IntoBytes]) -> Tuple[Any, Any]:
+        """Returns the values associated with provided keys as a NumPy structured array,
+        alongside with the boolean mask of the found keys (records of absent keys are zeroed).
 
-    # TODO iteration is not yet supported
-    # def __iter__(self) -> "_MapIndexIter":
-    # return _MapIndexIter(self._index)
+        Value type must be a `fixed_record`. Values are decoded right from the buffer obtained
+        from the database, without creating an object per value."""
+        self._flush()
+        raw_keys = [key.into_bytes() for key in keys]
+        buffer, offsets, found = self._index.get_many_buffer(raw_keys)
 
-    def _value_from_bytes(self, value: Optional[bytes]) -> Optional[IntoBytes]:
-        if value is not None:
-            return self._concrete_value.from_bytes(value)
-
-        return None
-
-    def __getitem__(self, key: IntoBytes) -> IntoBytes:
-        value = self.get(key)
-
-        if value is None:
-            raise KeyError(f"KeyError: {key}")
-
-        return value
-
-    def get(self, key: IntoBytes, default: Optional[IntoBytes] = None) -> Optional[IntoBytes]:
-        """Returns the value assotiated with provided key, or `default` value if there is
-        no such key in the map."""
-        value = self._index.get(key.into_bytes())
-
-        if value is None:
-            return default
-
-        return self._value_from_bytes(value)
-
-    @BaseIndex.mutable
-    def __setitem__(self, key: IntoBytes, value: IntoBytes) -> None:
-        self._index.put(key.into_bytes(), value.into_bytes())
-
-    @BaseIndex.mutable
-    def __delitem__(self, key: IntoBytes) -> None:
-        """Removes an element from the MapIndex."""
-        self._index.remove(key.into_bytes())
-
-    @BaseIndex.mutable
-    def clear(self) -> None:
-        """Removes all the elements from index."""
-        self._index.clear()
+        return records_from_values(self._concrete_value, buffer, offsets, found)
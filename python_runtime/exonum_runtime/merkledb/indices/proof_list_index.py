@@ -1,11 +1,13 @@
 """TODO"""
 
-from typing import Optional
+from typing import Optional, Iterable, List, Union
 
 from exonum_runtime.crypto import Hash
-from exonum_runtime.ffi.merkledb import MerkledbFFI, ProofListIndexWrapper
+from exonum_runtime.ffi.merkledb import MerkledbFFI
 from .base_index import BaseIndex
+from .iterators import ListIter, DEFAULT_CHUNK_SIZE
 from ..into_bytes import IntoBytes
+from ..proofs import ListProof
 
 
 class ProofListIndex(BaseIndex):
@@ -17,10 +19,21 @@ class ProofListIndex(BaseIndex):
         self._concrete = type(self)._one_index_type()
 
         ffi = MerkledbFFI.instance()
-        self._index = ffi.proof_list_index(self._index_id, self._access.inner())
+        self._index = self._access.index_handle("proof_list_index", self._index_id, ffi.proof_list_index)
 
-    def __iter__(self) -> "_ProofListIndexIter":
-        return _ProofListIndexIter(self._index)
+    def __iter__(self) -> ListIter:
+        return ListIter(self._index, self._concrete.from_bytes)
+
+    def __reversed__(self) -> ListIter:
+        return ListIter(self._index, self._concrete.from_bytes, reverse=True)
+
+    def iter_range(
+        self, start: int = 0, end: Optional[int] = None, reverse: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> ListIter:
+        """Returns an iterator over elements in the `[start, end)` range which fetches
+        `chunk_size` elements from the database at once. Range is truncated to the length
+        of the list, negative bounds are not allowed."""
+        return ListIter(self._index, self._concrete.from_bytes, start, end, reverse, chunk_size)
 
     def _from_bytes(self, value: Optional[bytes]) -> Optional[IntoBytes]:
         if value is not None:
@@ -28,11 +41,27 @@ class ProofListIndex(BaseIndex):
 
         return None
 
-    def __getitem__(self, idx: int) -> Optional[IntoBytes]:
+    def __getitem__(self, idx: Union[int, slice]) -> Union[Optional[IntoBytes], List[IntoBytes]]:
+        if isinstance(idx, slice):
+            indices = range(*idx.indices(len(self)))
+            if not indices:
+                return []
+
+            # Fetch the whole covered range at once and pick the requested elements from it.
+            first = min(indices[0], indices[-1])
+            values = self._index.get_range(first, max(indices[0], indices[-1]) + 1)
+
+            return [self._concrete.from_bytes(values[i - first]) for i in indices]
+
         item = self._index.get(idx)
 
         return self._from_bytes(item)
 
+    def get_range(self, start: int, end: int) -> List[IntoBytes]:
+        """Returns elements with indices in the `[start, end)` range fetched from
+        the database at once. Range is truncated to the length of the list."""
+        return [self._concrete.from_bytes(value) for value in self._index.get_range(start, end)]
+
     @BaseIndex.mutable
     def __setitem__(self, idx: int, value: IntoBytes) -> None:
         self._index.set_item(idx, value.into_bytes())
@@ -50,6 +79,11 @@ class ProofListIndex(BaseIndex):
         """Adds an element to the ListIndex."""
         self._index.push(item.into_bytes())
 
+    @BaseIndex.mutable
+    def extend(self, items: Iterable[IntoBytes]) -> None:
+        """Adds all the provided elements to the ListIndex at once."""
+        self._index.extend([item.into_bytes() for item in items])
+
     # @BaseIndex.mutable
     # def pop(self) -> Optional[IntoBytes]:
     #     """Removes the last element from the ListIndex and returns its value
@@ -62,19 +96,18 @@ class ProofListIndex(BaseIndex):
         """Returns object hash of the index."""
         return self._index.object_hash()
 
+    def get_proof(self, idx: int) -> ListProof:
+        """Returns a proof of existence of the element with the provided index
+        (or a proof of absence if index is out of the list bounds)."""
+        return self.get_range_proof(idx, idx + 1)
 
-class _ProofListIndexIter:
-    def __init__(self, index: ProofListIndexWrapper):
-        self._pos = 0
-        self._index = index
-        self._len = self._index.len()
-
-    def __next__(self) -> bytes:
-        if self._pos >= self._len:
-            raise StopIteration
+    def get_range_proof(self, start: int, end: int) -> ListProof:
+        """Returns a proof of existence of the elements in the `[start, end)` range."""
+        if start < 0 or start >= end:
+            raise ValueError("Proof range must be non-empty and non-negative")
 
-        value = self._index.get(self._pos)
-        if value is None:
-            raise RuntimeError("Index size changed during iteration")
+        proof = self._index.get_range_proof(start, end)
+        if proof is None:
+            raise RuntimeError("Block snapshot is not available")
 
-        return value
+        return ListProof.from_bytes(proof)
@@ -6,6 +6,9 @@ import abc
 class IntoBytes(metaclass=abc.ABCMeta):
     """Interface for keys and values to be stored in MerkleDB"""
 
+    # Allows subclasses to declare `__slots__`.
+    __slots__ = ()
+
     @abc.abstractmethod
     def into_bytes(self) -> bytes:
         """Converts an object into byte sequence."""
@@ -0,0 +1,158 @@
+"""Write-back overlays of the indices."""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class MapOverlay:
+    """Pending changes of a map index.
+
+    Writes are collected in the overlay instead of being sent to the database right away:
+    repeated writes of one key collapse into one, and reads of the written keys are served
+    from the overlay. Changes are sent to the database in bulk by `flush`.
+
+    Only the encoded values are kept, so the index decodes them on every read (the same way
+    as for the hot cache) and changing a read value in place doesn't affect the pending write.
+    """
+
+    def __init__(self, index: Any):
+        self._index = index
+        # Key => encoded value, None for removed keys.
+        self._entries: Dict[bytes, Optional[bytes]] = dict()
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: bytes) -> Optional[bytes]:
+        """Returns the encoded value written for the key, or None if the key was removed."""
+        return self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self._entries)
+
+    def put(self, key: bytes, raw_value: bytes) -> None:
+        """Writes the encoded value for the key."""
+        self._entries[key] = raw_value
+
+    def remove(self, key: bytes) -> None:
+        """Removes the key."""
+        self._entries[key] = None
+
+    def flush(self) -> None:
+        """Sends all the pending changes to the database."""
+        if not self._entries:
+            return
+
+        puts: List[Tuple[bytes, bytes]] = []
+        removes: List[bytes] = []
+        for key, raw_value in self._entries.items():
+            if raw_value is None:
+                removes.append(key)
+            else:
+                puts.append((key, raw_value))
+
+        self._entries.clear()
+
+        if puts:
+            self._index.put_many(puts)
+        if removes:
+            self._index.remove_many(removes)
+
+    def discard(self) -> None:
+        """Drops all the pending changes."""
+        self._entries.clear()
+
+
+class ColumnOverlay:
+    """Partial last chunk of a column list index (see `ColumnListIndex`), shared by the index objects
+    created within one Fork scope.
+
+    Elements are appended to the partial chunk kept in memory, so the length and the last chunk
+    are read from the database once per scope, and full chunks are never rewritten. With write-back
+    enabled, appended elements are sent to the database by `flush` (the partial chunk is written once);
+    otherwise they are written right away.
+    """
+
+    def __init__(self, index: Any, chunk_bytes: int, write_back: bool):
+        self._index = index
+        self._chunk_bytes = chunk_bytes
+        self._write_back = write_back
+
+        self._loaded = False
+        self._changed = False
+        # Amount of entries of the underlying list, and whether the last of them is a partial chunk.
+        self._stored = 0
+        self._stored_tail = False
+        # Full chunks, including the ones which are not written yet.
+        self._full = 0
+        self._pending: List[bytes] = []
+        # Data following the full chunks.
+        self._tail = bytearray()
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+
+        self._stored = self._index.len()
+        last_chunk = self._index.get(self._stored - 1) if self._stored > 0 else b""
+
+        self._stored_tail = 0 < len(last_chunk) < self._chunk_bytes
+        self._full = self._stored - 1 if self._stored_tail else self._stored
+        self._tail = bytearray(last_chunk) if self._stored_tail else bytearray()
+        self._loaded = True
+
+    def size(self) -> int:
+        """Returns the size of the column data in bytes."""
+        self._load()
+        return self._full * self._chunk_bytes + len(self._tail)
+
+    def extend(self, data: bytes) -> None:
+        """Appends the encoded elements."""
+        self._load()
+
+        if len(self._tail) + len(data) < self._chunk_bytes:
+            self._tail += data
+        else:
+            data = bytes(self._tail) + data
+            split = len(data) - len(data) % self._chunk_bytes
+            self._pending.extend(data[pos : pos + self._chunk_bytes] for pos in range(0, split, self._chunk_bytes))
+            self._full += split // self._chunk_bytes
+            self._tail = bytearray(data[split:])
+
+        self._changed = True
+        if not self._write_back:
+            self.flush()
+
+    def flush(self) -> None:
+        """Sends the appended elements to the database."""
+        if not self._changed:
+            return
+
+        entries = self._pending
+        if self._tail:
+            entries.append(bytes(self._tail))
+
+        self._pending = []
+        self._changed = False
+
+        # Stored partial chunk is a prefix of the new data, so it's replaced by the first entry.
+        if self._stored_tail:
+            self._index.set_item(self._stored - 1, entries[0])
+            entries = entries[1:]
+
+        if len(entries) == 1:
+            self._index.push(entries[0])
+        elif entries:
+            self._index.extend(entries)
+
+        self._stored = self._full + (1 if self._tail else 0)
+        self._stored_tail = bool(self._tail)
+
+    def discard(self) -> None:
+        """Drops the elements which are not written yet. State is read again on the next use."""
+        self._loaded = False
+        self._changed = False
+        self._pending = []
+        self._tail = bytearray()
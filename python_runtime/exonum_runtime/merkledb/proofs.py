@@ -0,0 +1,396 @@
+"""Merkle proofs of the ProofMapIndex and ProofListIndex contents.
+
+Proofs are built on the Rust side (see `ProofMapIndex.get_multiproof` and
+`ProofListIndex.get_range_proof`) and passed to Python in a compact binary form
+which can be sent to clients as is (`proof.raw`).
+
+Verification is implemented in pure Python and follows the MerkleDB hashing rules,
+so it can be used by the light clients without the Rust part. `ProofVerifier` can
+check many proofs in one batch: hashes of the tree nodes shared by the proofs
+(e.g. the upper levels of the tree for the proofs of different keys of the same map)
+are computed once.
+
+>>> proofs = [wallets.get_proof(key) for key in keys]
+>>> checked = ProofVerifier().verify_batch(proofs, wallets.object_hash())
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple, Iterable, Union, Any
+import struct
+
+from exonum_runtime.crypto import Hash
+
+# Hash prefixes used by MerkleDB.
+_TAG_LEAF = b"\x00"
+_TAG_NODE = b"\x01"
+_TAG_LIST = b"\x02"
+_TAG_MAP = b"\x03"
+_TAG_MAP_BRANCH = b"\x04"
+
+# Tags of the list proof nodes in the binary representation.
+_LIST_PROOF_FULL = 0
+_LIST_PROOF_LEFT = 1
+_LIST_PROOF_LEFT_SINGLE = 2
+_LIST_PROOF_RIGHT = 3
+_LIST_PROOF_LEAF = 4
+_LIST_PROOF_ABSENT = 5
+
+_U64 = struct.Struct("<Q")
+_HASH_LEN = 32
+_PATH_LEN = 34
+_KEY_BITS = 256
+_ZERO_HASH = bytes(_HASH_LEN)
+
+# Proof path as a string of bits ("0110..."), bits of every byte are taken from the least significant one.
+_Path = str
+
+
+class ProofError(Exception):
+    """Error to be raised if proof is malformed or doesn't match the expected hash."""
+
+
+class MapProof(NamedTuple):
+    """Proof of existence (or absence) of the keys in ProofMapIndex."""
+
+    # Binary representation of the proof.
+    raw: bytes
+    # Requested keys and their values (None for absent keys).
+    entries: List[Tuple[bytes, Optional[bytes]]]
+    # Hashes of the subtrees required to restore the root hash: (path, hash).
+    proof: List[Tuple[bytes, bytes]]
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MapProof":
+        """Parses the proof obtained from `ProofMapIndex`."""
+        reader = _Reader(data)
+
+        entries = []
+        for _ in range(reader.u64()):
+            found = reader.byte()
+            key = reader.item()
+            entries.append((key, reader.item() if found else None))
+
+        proof = []
+        for _ in range(reader.u64()):
+            proof.append((reader.take(_PATH_LEN), reader.take(_HASH_LEN)))
+
+        reader.finish()
+
+        return cls(bytes(data), entries, proof)
+
+
+class ListProof(NamedTuple):
+    """Proof of existence of the range of elements in ProofListIndex."""
+
+    # Binary representation of the proof.
+    raw: bytes
+    # Length of the list.
+    length: int
+    # Proof tree: tuples of the node tag and its children / hashes / value.
+    tree: Tuple[Any, ...]
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ListProof":
+        """Parses the proof obtained from `ProofListIndex`."""
+        reader = _Reader(data)
+
+        length = reader.u64()
+        tree = _read_list_node(reader)
+
+        reader.finish()
+
+        return cls(bytes(data), length, tree)
+
+
+class CheckedMapProof(NamedTuple):
+    """Result of the map proof verification."""
+
+    # Object hash of the index restored from the proof.
+    index_hash: Hash
+    # Proven entries.
+    entries: Dict[bytes, bytes]
+    # Keys proven to be absent.
+    missing_keys: List[bytes]
+
+
+class CheckedListProof(NamedTuple):
+    """Result of the list proof verification."""
+
+    # Object hash of the index restored from the proof.
+    index_hash: Hash
+    # Length of the list.
+    length: int
+    # Proven elements: (index, value).
+    entries: List[Tuple[int, bytes]]
+
+
+class ProofVerifier:
+    """Verifier of the map and list proofs.
+
+    Proofs verified together by `verify_batch` share the cache of the tree node hashes, so hashes
+    of the common nodes are calculated once. The cache lives only for one `verify_batch` call."""
+
+    def __init__(self) -> None:
+        self._node_hashes: Optional[Dict[bytes, bytes]] = None
+
+    def verify_batch(
+        self, proofs: Iterable[Union[MapProof, ListProof]], expected_hash: Optional[Hash] = None
+    ) -> List[Union[CheckedMapProof, CheckedListProof]]:
+        """Verifies all the provided proofs and returns the results in the same order.
+
+        If `expected_hash` is provided, every proof is checked to match it."""
+        results: List[Union[CheckedMapProof, CheckedListProof]] = []
+        self._node_hashes = dict()
+        try:
+            for proof in proofs:
+                if isinstance(proof, MapProof):
+                    results.append(self.verify_map_proof(proof, expected_hash))
+                else:
+                    results.append(self.verify_list_proof(proof, expected_hash))
+        finally:
+            self._node_hashes = None
+
+        return results
+
+    def verify_map_proof(self, proof: MapProof, expected_hash: Optional[Hash] = None) -> CheckedMapProof:
+        """Restores the object hash of the map from the proof and checks it against `expected_hash`
+        (if provided). Raises `ProofError` if proof is incorrect."""
+        nodes: List[Tuple[_Path, bytes]] = []
+        for path_bytes, node_hash in proof.proof:
+            nodes.append((_parse_path(path_bytes), node_hash))
+
+        proof_paths = [path for path, _ in nodes]
+        if proof_paths != sorted(proof_paths):
+            raise ProofError("Proof entries are not ordered")
+
+        entries: Dict[bytes, bytes] = dict()
+        missing_keys: List[bytes] = []
+        for key, value in proof.entries:
+            key_path = _key_path(key)
+
+            # A proof node covering the requested key would hide its actual value.
+            if any(key_path.startswith(path) for path in proof_paths):
+                raise ProofError("Proof contains a node covering a requested key")
+
+            if value is None:
+                missing_keys.append(key)
+            else:
+                entries[key] = value
+                nodes.append((key_path, self._hash(_TAG_LEAF, value)))
+
+        nodes.sort(key=lambda node: node[0])
+        for (path, _), (next_path, _) in zip(nodes, nodes[1:]):
+            if next_path.startswith(path):
+                raise ProofError("Duplicate or embedded paths in the proof")
+
+        index_hash = Hash(self._hash(_TAG_MAP, self._map_root(nodes)))
+        _check_hash(index_hash, expected_hash)
+
+        return CheckedMapProof(index_hash, entries, missing_keys)
+
+    def verify_list_proof(self, proof: ListProof, expected_hash: Optional[Hash] = None) -> CheckedListProof:
+        """Restores the object hash of the list from the proof and checks it against `expected_hash`
+        (if provided). Raises `ProofError` if proof is incorrect."""
+        entries: List[Tuple[int, bytes]] = []
+
+        if proof.tree[0] == _LIST_PROOF_ABSENT:
+            root = proof.tree[1]
+        else:
+            if proof.length == 0:
+                raise ProofError("Proof of elements of the empty list")
+
+            # Leaves are located at the same depth, which is determined by the list length.
+            leaf_depth = (proof.length - 1).bit_length()
+            root = self._list_node_hash(proof.tree, 0, 0, leaf_depth, entries)
+
+            if entries[-1][0] >= proof.length:
+                raise ProofError("Proven element is out of the list bounds")
+
+        index_hash = Hash(self._hash(_TAG_LIST, _U64.pack(proof.length), root))
+        _check_hash(index_hash, expected_hash)
+
+        return CheckedListProof(index_hash, proof.length, entries)
+
+    def _hash(self, tag: bytes, *parts: bytes) -> bytes:
+        data = b"".join((tag,) + parts)
+        if self._node_hashes is None:
+            return Hash.hash_data(data).value
+
+        node_hash = self._node_hashes.get(data)
+        if node_hash is None:
+            node_hash = Hash.hash_data(data).value
+            self._node_hashes[data] = node_hash
+
+        return node_hash
+
+    def _map_root(self, nodes: List[Tuple[_Path, bytes]]) -> bytes:
+        if not nodes:
+            return _ZERO_HASH
+
+        if len(nodes) == 1:
+            path, node_hash = nodes[0]
+            if len(path) != _KEY_BITS:
+                raise ProofError("Single proof node must be a leaf")
+
+            return self._hash(_TAG_MAP_BRANCH, _path_bytes(path), node_hash)
+
+        # Nodes are sorted by path, so the tree is restored by folding the rightmost
+        # branch (contour) while the common prefix with the next node is getting shorter.
+        contour = [nodes[0], nodes[1]]
+        last_prefix = _common_prefix(nodes[0][0], nodes[1][0])
+
+        for node in nodes[2:]:
+            new_prefix = _common_prefix(contour[-1][0], node[0])
+            while len(contour) > 1 and len(new_prefix) < len(last_prefix):
+                last_prefix = self._fold(contour, last_prefix)
+
+            contour.append(node)
+            last_prefix = new_prefix
+
+        while len(contour) > 1:
+            last_prefix = self._fold(contour, last_prefix)
+
+        return contour[0][1]
+
+    def _fold(self, contour: List[Tuple[_Path, bytes]], last_prefix: _Path) -> _Path:
+        right_path, right_hash = contour.pop()
+        left_path, left_hash = contour.pop()
+
+        branch_hash = self._hash(
+            _TAG_MAP_BRANCH, left_hash, right_hash, _path_bytes(left_path), _path_bytes(right_path)
+        )
+        contour.append((last_prefix, branch_hash))
+
+        if len(contour) > 1:
+            return _common_prefix(contour[-2][0], last_prefix)
+
+        return last_prefix
+
+    def _list_node_hash(
+        self, node: Tuple[Any, ...], depth: int, index: int, leaf_depth: int, entries: List[Tuple[int, bytes]]
+    ) -> bytes:
+        tag = node[0]
+
+        if tag == _LIST_PROOF_LEAF:
+            if depth != leaf_depth:
+                raise ProofError("List proof leaf at the wrong depth")
+
+            entries.append((index, node[1]))
+            return self._hash(_TAG_LEAF, node[1])
+
+        if depth >= leaf_depth or tag == _LIST_PROOF_ABSENT:
+            raise ProofError("Unexpected list proof node")
+
+        left, right = index * 2, index * 2 + 1
+
+        if tag == _LIST_PROOF_FULL:
+            left_hash = self._list_node_hash(node[1], depth + 1, left, leaf_depth, entries)
+            right_hash = self._list_node_hash(node[2], depth + 1, right, leaf_depth, entries)
+            return self._hash(_TAG_NODE, left_hash, right_hash)
+
+        if tag == _LIST_PROOF_LEFT:
+            left_hash = self._list_node_hash(node[1], depth + 1, left, leaf_depth, entries)
+            return self._hash(_TAG_NODE, left_hash, node[2])
+
+        if tag == _LIST_PROOF_LEFT_SINGLE:
+            left_hash = self._list_node_hash(node[1], depth + 1, left, leaf_depth, entries)
+            return self._hash(_TAG_NODE, left_hash)
+
+        # _LIST_PROOF_RIGHT
+        right_hash = self._list_node_hash(node[2], depth + 1, right, leaf_depth, entries)
+        return self._hash(_TAG_NODE, node[1], right_hash)
+
+
+class _Reader:
+    """Reader of the binary proof representation."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self._pos = 0
+
+    def take(self, length: int) -> bytes:
+        """Reads the next `length` bytes."""
+        end = self._pos + length
+        if end > len(self._data):
+            raise ProofError("Unexpected end of the proof")
+
+        chunk = bytes(self._data[self._pos : end])
+        self._pos = end
+
+        return chunk
+
+    def byte(self) -> int:
+        """Reads a single byte."""
+        return self.take(1)[0]
+
+    def u64(self) -> int:
+        """Reads a little-endian 64-bit unsigned integer."""
+        (value,) = _U64.unpack(self.take(_U64.size))
+        return value
+
+    def item(self) -> bytes:
+        """Reads a byte string prefixed with its u64 length."""
+        return self.take(self.u64())
+
+    def finish(self) -> None:
+        """Checks that the whole proof was read."""
+        if self._pos != len(self._data):
+            raise ProofError("Unexpected trailing data in the proof")
+
+
+def _read_list_node(reader: _Reader) -> Tuple[Any, ...]:
+    tag = reader.byte()
+
+    if tag == _LIST_PROOF_FULL:
+        return (tag, _read_list_node(reader), _read_list_node(reader))
+    if tag == _LIST_PROOF_LEFT:
+        return (tag, _read_list_node(reader), reader.take(_HASH_LEN))
+    if tag == _LIST_PROOF_LEFT_SINGLE:
+        return (tag, _read_list_node(reader))
+    if tag == _LIST_PROOF_RIGHT:
+        return (tag, reader.take(_HASH_LEN), _read_list_node(reader))
+    if tag == _LIST_PROOF_LEAF:
+        return (tag, reader.item())
+    if tag == _LIST_PROOF_ABSENT:
+        return (tag, reader.take(_HASH_LEN))
+
+    raise ProofError(f"Unknown list proof node tag: {tag}")
+
+
+def _bits(data: bytes) -> str:
+    return "".join(format(byte, "08b")[::-1] for byte in data)
+
+
+def _key_path(key: bytes) -> _Path:
+    # Keys of ProofMapIndex are hashed to obtain their path in the tree.
+    return _bits(Hash.hash_data(key).value)
+
+
+def _parse_path(data: bytes) -> _Path:
+    is_leaf = data[0] == 1
+    length = _KEY_BITS if is_leaf else data[_PATH_LEN - 1]
+
+    return _bits(data[1 : 1 + _HASH_LEN])[:length]
+
+
+def _path_bytes(path: _Path) -> bytes:
+    padded = path.ljust(_KEY_BITS, "0")
+    key = bytes(int(padded[i : i + 8][::-1], 2) for i in range(0, _KEY_BITS, 8))
+
+    if len(path) == _KEY_BITS:
+        return b"\x01" + key + b"\x00"
+
+    return b"\x00" + key + bytes([len(path)])
+
+
+def _common_prefix(first: _Path, second: _Path) -> _Path:
+    length = 0
+    for first_bit, second_bit in zip(first, second):
+        if first_bit != second_bit:
+            break
+        length += 1
+
+    return first[:length]
+
+
+def _check_hash(actual: Hash, expected: Optional[Hash]) -> None:
+    if expected is not None and actual != expected:
+        raise ProofError(f"Proof hash mismatch: expected {expected}, got {actual}")
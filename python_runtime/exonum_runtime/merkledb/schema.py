@@ -5,7 +5,7 @@ from typing import Tuple, Dict, Any, List, Optional, Type, Union
 
 from exonum_runtime.crypto import Hash
 from exonum_runtime.interfaces import Named
-from .indices.base_index import BaseIndex
+from .indices.base_index import BaseIndex, _index_id
 from .indices import ProofListIndex, ProofMapIndex
 from .types import Access
 
@@ -46,6 +46,10 @@ class _WithSchemaMeta(abc.ABCMeta):
         # Check that if _state_hash_ attribute is set, it has correct layout.
         state_hash = dct.get("_state_hash_")
         cls._verify_state_hash_attr(schema, state_hash)
+        assert state_hash is not None
+
+        # Indices are resolved once, so the state hash is calculated without creating a schema.
+        dct["_state_hash_indices_"] = [(index_name, schema.index_type(index_name)) for index_name in state_hash]
 
         new_class = super().__new__(cls, name, bases, dct, **kwargs)  # type: ignore
         return new_class
@@ -124,6 +128,7 @@ class WithSchema(metaclass=_WithSchemaMeta):
 
     _schema_: Optional[Type["Schema"]] = None
     _state_hash_: Optional[List[str]] = None
+    _state_hash_indices_: List[Tuple[str, Type[BaseIndex]]] = []
 
     def _get_indices(self) -> List[str]:
         return getattr(self, "_schema_meta").values()
@@ -132,29 +137,28 @@ class WithSchema(metaclass=_WithSchemaMeta):
         """Returns a list of state hashes from indices defined in _state_hash_ attribute."""
         state_hashes: List[Hash] = []
 
-        # Assertions to give static analysis tools hints of invariants.
-        assert self._schema_ is not None
-        assert issubclass(self._schema_, Schema)
-        assert isinstance(self._state_hash_, list)
-        assert isinstance(self, Named)
-
-        if not self._state_hash_:
-            # No state hash should be calculated, return an empty list without creating schema.
+        if not self._state_hash_indices_:
+            # No state hash should be calculated, return an empty list right away.
             return []
 
-        # _schema_ is type, it's callable (see check above)
-        # pylint: disable=not-callable
-        schema = self._schema_(self, access)
+        # Assertion to give static analysis tools hints of invariants.
+        assert isinstance(self, Named)
 
-        # _state_hash_ is a list, it's an iterable (see check above)
-        # pylint: disable=not-an-iterable
-        for index_name in self._state_hash_:
-            index: Union[ProofListIndex, ProofMapIndex] = getattr(schema, index_name)()
+        owner = self.instance_name()
+        for index_name, index_type in self._state_hash_indices_:
+            index: Union[ProofListIndex, ProofMapIndex] = index_type(access, owner, index_name)()  # type: ignore
 
             state_hashes.append(index.object_hash())
 
         return state_hashes
 
+    def state_hash_index_ids(self) -> List[bytes]:
+        """Returns the ids of indices from which state hash is calculated."""
+        assert isinstance(self, Named)
+
+        owner = self.instance_name()
+        return [_index_id(owner, index_name, None) for index_name, _ in self._state_hash_indices_]
+
     @classmethod
     def schema(cls, owner: Union[Named, str], access: Access) -> "Schema":
         """Gets the Schema assotiated with that service."""
@@ -164,6 +168,25 @@ class WithSchema(metaclass=_WithSchemaMeta):
         return cls._schema_(owner, access)
 
 
+class _IndexDescriptor:
+    """Descriptor of the schema index: creates an index object on every access."""
+
+    def __init__(self, index_name: str, index_type: Type[BaseIndex], hot_cache: bool):
+        self._index_name = index_name
+        self._index_type = index_type
+        self._hot_cache = hot_cache
+
+    def __get__(self, schema: Optional["Schema"], owner: type) -> Any:
+        if schema is None:
+            # Accessed on the schema class.
+            return self
+
+        # pylint: disable=protected-access
+        index = self._index_type(schema._access, schema._owner, self._index_name)
+        index._hot_cache_enabled = self._hot_cache
+        return index
+
+
 class _SchemaMeta(abc.ABCMeta):
     """Metaclass for Schema class.
 
@@ -172,14 +195,15 @@ class _SchemaMeta(abc.ABCMeta):
     """
 
     def __new__(cls, name: str, bases: Tuple[type, ...], dct: Dict[str, Any], **kwargs: Any) -> type:  # type: ignore
-        """This method performs required checks and fills the "_schema_meta" attribute with
-        mapping `index name` => `index type`.
+        """This method performs required checks, fills the "_schema_meta" attribute with
+        mapping `index name` => `index type` and creates a descriptor for every index.
 
         Performed checks:
 
         - Class should directly inherit `Schema`;
         - Class should provide type annotations to define used indices;
-        - Indices types should be inherited from `BaseIndex`.
+        - Indices types should be inherited from `BaseIndex`;
+        - Indices from `_hot_cache_` attribute (if any) should be map indices from the schema.
         """
         if name == "Schema":
             # Proxy class, skip it.
@@ -193,6 +217,10 @@ class _SchemaMeta(abc.ABCMeta):
         # Check that class have type annotations and get them.
         annotations = cls._get_annotations(dct)
 
+        # Check that indices with the hot cache are the maps of the schema.
+        hot_cache = dct.get("_hot_cache_", [])
+        cls._verify_hot_cache_attr(annotations, hot_cache)
+
         # Fill the schema metainformation
         dct["_schema_meta"] = dict()
 
@@ -202,6 +230,7 @@ class _SchemaMeta(abc.ABCMeta):
                 raise AttributeError(f"Incorrect index type: {index_type}")
 
             dct["_schema_meta"][index_name] = index_type
+            dct[index_name] = _IndexDescriptor(index_name, index_type, index_name in hot_cache)
 
         new_class = super().__new__(cls, name, bases, dct, **kwargs)  # type: ignore
         return new_class
@@ -211,6 +240,18 @@ class _SchemaMeta(abc.ABCMeta):
         if Schema not in bases:
             raise TypeError("Schemas should be derived from Schema class")
 
+    @staticmethod
+    def _verify_hot_cache_attr(annotations: Dict[str, Any], hot_cache: Any) -> None:
+        if not isinstance(hot_cache, list) or not all(map(lambda x: isinstance(x, str), hot_cache)):
+            raise AttributeError("_hot_cache_ attribute must be a list of strings")
+
+        for item in hot_cache:
+            if annotations.get(item) is None:
+                raise AttributeError(f"Item '{item}' is not a part of defined schema")
+
+            if not annotations[item].__name__ in ("MapIndex", "ProofMapIndex"):
+                raise AttributeError(f"Item '{item}' is not a MapIndex or ProofMapIndex")
+
     @staticmethod
     def _get_annotations(dct: Dict[str, Any]) -> Dict[str, Any]:
         annotations = dct.get("__annotations__")
@@ -239,9 +280,18 @@ class Schema(metaclass=_SchemaMeta):
     ...     _schema_ = CurrencySchema
     ...     _state_hash_ = ["wallets"]
 
-    Please note that this class overrides `__getattribute__` method to provide
-    handy interface of interaction with schema, so user-defined schemas should
-    not override it.
+    Please note that indices are class attributes of the schema (created from the
+    annotations), so user-defined schemas should not define attributes with the same names.
+
+    Maps which are read in almost every transaction can be listed in the `_hot_cache_`
+    attribute (not annotated), so their values are cached across blocks
+    if the `hot_cache_size` option of the runtime is set:
+
+    >>> class ExchangeSchema(Schema):
+    ...     _hot_cache_ = ["order_book"]
+    ...     order_book: ProofMapIndex
+
+    Such maps must be changed only by the Python services.
     """
 
     @classmethod
@@ -264,17 +314,3 @@ class Schema(metaclass=_SchemaMeta):
             self._owner = owner
         else:
             raise ValueError(f"Owner must be either an instance of Named or string, but got {owner}")
-
-    def __getattribute__(self, name: str) -> Any:
-        schema_meta = super().__getattribute__("_schema_meta")
-        if name in schema_meta:
-            # If we're accessing the name assotiated with index,
-            # create an object of that index and return it.
-            index_type = schema_meta[name]
-
-            instance_name = self._owner
-            index_name = name
-
-            return index_type(self._access, instance_name, index_name)
-
-        return super().__getattribute__(name)
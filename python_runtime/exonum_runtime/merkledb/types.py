@@ -1,9 +1,14 @@
 """TODO"""
 
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Dict, Set, Tuple
 
+from exonum_runtime.ffi.arena import thread_arena
 from exonum_runtime.ffi.raw_types import RawIndexAccess
 
+from .cache import ValueCache
+from .hot_cache import HotCache, HotIndexCache
+from .overlay import ColumnOverlay, MapOverlay
+
 
 class Access:
     """A generic access to the database."""
@@ -11,18 +16,64 @@ class Access:
     def __init__(self, inner: RawIndexAccess):
         self._inner = inner
         self._valid = False
+        self._always_valid = False
+
+        # Native index handles opened within the current scope, keyed by (index type, index id).
+        self._handles: Dict[Tuple[str, bytes], Any] = dict()
+
+        # Write-back overlays of the map indices, keyed the same way as the handles.
+        self._write_back = False
+        self._overlays: Dict[Tuple[str, bytes], MapOverlay] = dict()
+        # Partial last chunks of the column list indices, keyed by the index id.
+        self._column_overlays: Dict[bytes, ColumnOverlay] = dict()
+
+        self._value_cache: Optional[ValueCache] = None
+        self._hot_cache: Optional[HotCache] = None
+        self._hot_cache_tracked = False
 
     def __enter__(self) -> "Access":
         self._valid = True
 
+        # Data read from the database within the scope is released in bulk on exit.
+        thread_arena().enter_scope()
+
         return self
 
     def __exit__(self, exc_type: Optional[type], exc_value: Optional[Any], exc_traceback: Optional[object]) -> None:
         self._valid = False
 
+        # Changes which weren't flushed explicitly are dropped.
+        self.discard()
+        self._write_back = False
+
+        # Opened indices borrow the database access, so they must be closed before it is destroyed.
+        for handle in self._handles.values():
+            handle.free()
+        self._handles.clear()
+
+        thread_arena().exit_scope()
+
     def set_always_valid(self) -> None:
         """Marks Access as always valid (meaning that with kind of Access database can be accessed anytime)"""
         self._valid = True
+        self._always_valid = True
+
+    def set_value_cache(self, cache: ValueCache) -> None:
+        """Sets the cache of the decoded values read through this access.
+
+        Cache should be used only with the access to the block snapshot, and invalidated on every block commit."""
+        self._value_cache = cache
+
+    def value_cache(self) -> Optional[ValueCache]:
+        """Returns the cache of the decoded values, if any."""
+        return self._value_cache
+
+    def hot_cache(self, index_id: bytes) -> Optional[HotIndexCache]:
+        """Returns the cache of the index listed in the `_hot_cache_` attribute of the schema, if any."""
+        if self._hot_cache is None:
+            return None
+
+        return self._hot_cache.index(index_id, self._hot_cache_tracked)
 
     def valid(self) -> bool:
         """Returns True if access is valid and can be used."""
@@ -35,10 +86,104 @@ class Access:
 
         return self._inner
 
+    def index_handle(self, index_type: str, index_id: bytes, open_index: Callable[[bytes, RawIndexAccess], Any]) -> Any:
+        """Returns the native handle of the index, opening it with `open_index` on the first request.
+
+        Handles are shared by all the index objects created within the access scope
+        and are closed when the scope exits."""
+        key = (index_type, index_id)
+        handle = self._handles.get(key)
+
+        if handle is None:
+            handle = open_index(index_id, self.inner())
+
+            # Always valid access has no scope to close the handles, so they are not pooled.
+            if not self._always_valid:
+                # Snapshot may be read from several threads, so the handle opened first is kept.
+                pooled = self._handles.setdefault(key, handle)
+                if pooled is not handle:
+                    handle.free()
+                    handle = pooled
+
+        return handle
+
+    def overlay(self, index_type: str, index_id: bytes, index: Any) -> Optional[MapOverlay]:
+        """Returns the write-back overlay of the map index, or None if write-back is not enabled."""
+        if not self._write_back:
+            return None
+
+        key = (index_type, index_id)
+        overlay = self._overlays.get(key)
+
+        if overlay is None:
+            overlay = MapOverlay(index)
+            self._overlays[key] = overlay
+
+        return overlay
+
+    def discard(self) -> None:
+        """Drops the changes collected in the write-back overlays."""
+        for overlay in self._overlays.values():
+            overlay.discard()
+        self._overlays.clear()
+
+        for column_overlay in self._column_overlays.values():
+            column_overlay.discard()
+        self._column_overlays.clear()
+
 
 class Fork(Access):
     """Write access to the database."""
 
+    def __init__(self, inner: RawIndexAccess):
+        super().__init__(inner)
+
+        # Ids of the indices changed through this access.
+        self._changed_indices: Set[bytes] = set()
+
+    def mark_changed(self, index_id: bytes) -> None:
+        """Marks the index as changed. Called by the mutable methods of the indices."""
+        self._changed_indices.add(index_id)
+
+    def changed_indices(self) -> Set[bytes]:
+        """Returns ids of the indices changed through this access (including rolled back changes)."""
+        return self._changed_indices
+
+    def enable_write_back(self) -> None:
+        """Enables write-back overlays of the map indices until the end of the access scope.
+
+        Changes of the maps (and elements appended to the column lists) are sent to the database
+        on `flush` and dropped on scope exit otherwise."""
+        self._write_back = True
+
+    def flush(self) -> None:
+        """Sends the changes collected in the write-back overlays to the database."""
+        for overlay in self._overlays.values():
+            overlay.flush()
+
+        for column_overlay in self._column_overlays.values():
+            column_overlay.flush()
+
+    def column_overlay(self, index_id: bytes, index: Any, chunk_bytes: int) -> ColumnOverlay:
+        """Returns the overlay of the column list index, shared by all the index objects created
+        within the access scope. Appended elements are kept in it until `flush` if write-back is enabled."""
+        overlay = self._column_overlays.get(index_id)
+
+        if overlay is None:
+            overlay = ColumnOverlay(index, chunk_bytes, self._write_back)
+            self._column_overlays[index_id] = overlay
+
+        return overlay
+
+    def set_hot_cache(self, cache: HotCache, tracked: bool) -> None:
+        """Sets the cache of the decoded values which survives across blocks.
+
+        `tracked` should be True only for the forks of the block execution, since the cache
+        is notified about the results of transactions and blocks. Changes made through other
+        forks drop the cached values of the changed indices."""
+        self._hot_cache = cache
+        self._hot_cache_tracked = tracked
+
 
 class Snapshot(Access):
     """Read access to the database."""
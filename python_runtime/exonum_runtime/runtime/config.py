@@ -18,3 +18,10 @@ class Configuration:
         self.built_sources_folder = toml_config["python"]["built_sources_folder"]
         self.runtime_api_port = toml_config["python"]["api_port"]
         self.service_api_ports_start = toml_config["python"]["service_api_ports_start"]
+        self.production_mode = toml_config["python"].get("production_mode", False)
+        self.write_back_overlay = toml_config["python"].get("write_back_overlay", False)
+        self.api_value_cache_size = toml_config["python"].get("api_value_cache_size", 0)
+        self.api_value_cache_limits = toml_config["python"].get("api_value_cache_limits", dict())
+        self.hot_cache_size = toml_config["python"].get("hot_cache_size", 0)
+        self.cache_state_hashes = toml_config["python"].get("cache_state_hashes", False)
+        self.state_hash_threads = toml_config["python"].get("state_hash_threads", 1)
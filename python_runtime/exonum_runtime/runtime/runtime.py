@@ -1,7 +1,10 @@
 """TODO"""
 
 import asyncio
-from typing import Dict, Optional, Tuple, Union, List
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple, Union, List
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import functools
 import os
 import sys
 import logging
@@ -24,6 +27,9 @@ from exonum_runtime.ffi.merkledb import MerkledbFFI
 # Merkledb
 from exonum_runtime.merkledb.schema import WithSchema
 from exonum_runtime.merkledb.types import Fork, Snapshot
+from exonum_runtime.merkledb.indices import set_access_checks
+from exonum_runtime.merkledb.cache import ValueCache
+from exonum_runtime.merkledb.hot_cache import HotCache
 
 # Runtime
 from .artifact import Artifact
@@ -38,6 +44,7 @@ from .types import (
     ExecutionContext,
     RawIndexAccess,
     InstanceId,
+    Caller,
 )
 from .config import Configuration
 from .runtime_interface import RuntimeInterface
@@ -58,10 +65,14 @@ class PythonRuntime(RuntimeInterface, Named, WithSchema, ServiceApiProvider):
 
         self._loop = loop
         self._configuration = Configuration(config_path)
+        set_access_checks(not self._configuration.production_mode)
         self._rust_ffi = RustFFIProvider(self._configuration.rust_lib_path, self, build_callbacks())
         self._merkledb_ffi = MerkledbFFI(self._rust_ffi._rust_interface)
         self._pending_deployments: Dict[ArtifactId, Artifact] = {}
         self._artifacts: Dict[ArtifactId, Artifact] = {}
+        # Protobuf specs of the deployed artifacts and their content hashes, so sources are read
+        # and hashed only once.
+        self._protobuf_specs: Dict[ArtifactId, Tuple[ArtifactProtobufSpec, bytes]] = {}
         # Temporary buffer for started but not yet initialized services
         self._started_services: Dict[InstanceId, Tuple[Artifact, InstanceSpec]] = {}
         self._instances: Dict[InstanceId, Service] = {}
@@ -70,6 +81,31 @@ class PythonRuntime(RuntimeInterface, Named, WithSchema, ServiceApiProvider):
         api_config = RuntimeApiConfig(self._configuration.artifacts_sources_folder, self)
         self._api_snapshot = Snapshot(self._rust_ffi.snapshot_token())
         self._api_snapshot.set_always_valid()
+        self._value_cache: Optional[ValueCache] = None
+        if self._configuration.api_value_cache_size > 0 or self._configuration.api_value_cache_limits:
+            limits = self._configuration.api_value_cache_limits
+            self._value_cache = ValueCache(
+                self._configuration.api_value_cache_size,
+                {bytes(index_id, "utf-8"): limit for index_id, limit in limits.items()},
+            )
+            self._api_snapshot.set_value_cache(self._value_cache)
+        self._hot_cache: Optional[HotCache] = None
+        if self._configuration.hot_cache_size > 0:
+            self._hot_cache = HotCache(self._configuration.hot_cache_size)
+
+        # Indices changed since the last commit.
+        self._changed_indices: Set[bytes] = set()
+        # State hashes of the instances at the last committed block and at the last executed one.
+        self._state_hashes_cache: Dict[InstanceId, List[Hash]] = dict()
+        self._pending_state_hashes: Dict[InstanceId, List[Hash]] = dict()
+        self._hashed_blocks = 0
+
+        self._state_hash_pool: Optional[ThreadPoolExecutor] = None
+        if self._configuration.state_hash_threads > 1:
+            self._state_hash_pool = ThreadPoolExecutor(
+                self._configuration.state_hash_threads, thread_name_prefix="state_hashes"
+            )
+
         self._runtime_api = RuntimeApi(port=self._configuration.runtime_api_port, config=api_config)
         self._free_service_port = self._configuration.service_api_ports_start
         self._service_api: Dict[str, ServiceApi] = dict()
@@ -200,9 +236,24 @@ class PythonRuntime(RuntimeInterface, Named, WithSchema, ServiceApiProvider):
     def add_service(
         self, access: RawIndexAccess, instance_spec: InstanceSpec, parameters: bytes
     ) -> Union[PythonRuntimeResult, ServiceError]:
+        with self._fork(access) as fork:
+
+            if self._hot_cache is not None:
+                # Service initialization isn't a part of the transaction execution.
+                fork.set_hot_cache(self._hot_cache, tracked=False)
+
+            return self._start_service(instance_spec, fork, parameters)
+
+    @contextlib.contextmanager
+    def _fork(self, access: RawIndexAccess) -> Iterator[Fork]:
+        """Opens the Fork scope and remembers the indices changed within it."""
         with Fork(access) as fork:
             assert isinstance(fork, Fork)
-            return self._start_service(instance_spec, fork, parameters)
+
+            try:
+                yield fork
+            finally:
+                self._changed_indices.update(fork.changed_indices())
 
     def _stop_service(self, instance_id: InstanceId, force: bool = True) -> None:
         if force:
@@ -223,6 +274,25 @@ class PythonRuntime(RuntimeInterface, Named, WithSchema, ServiceApiProvider):
 
     def execute(
         self, context: ExecutionContext, call_info: CallInfo, arguments: bytes
+    ) -> Union[PythonRuntimeResult, ServiceError]:
+        with self._fork(context.access) as fork:
+            self._prepare_execution_fork(fork)
+
+            result = self._execute_call(fork, context.caller, call_info, arguments)
+            self._finish_hot_cache_transaction(result == PythonRuntimeResult.OK)
+
+            return result
+
+    def _prepare_execution_fork(self, fork: Fork) -> None:
+        if self._configuration.write_back_overlay:
+            # Changes are flushed only if transaction succeeds, and dropped on the scope exit otherwise.
+            fork.enable_write_back()
+
+        if self._hot_cache is not None:
+            fork.set_hot_cache(self._hot_cache, tracked=True)
+
+    def _execute_call(
+        self, fork: Fork, caller: Caller, call_info: CallInfo, arguments: bytes
     ) -> Union[PythonRuntimeResult, ServiceError]:
         instance_id = call_info.instance_id
 
@@ -230,30 +300,43 @@ class PythonRuntime(RuntimeInterface, Named, WithSchema, ServiceApiProvider):
             self._logger.error("Received execute request for service %s which is not running", instance_id)
             return PythonRuntimeResult.UNKNOWN_SERVICE
 
-        with Fork(context.access) as fork:
-            assert isinstance(fork, Fork)
-            transaction_context = TransactionContext(fork, context.caller)
+        transaction_context = TransactionContext(fork, caller)
 
-            try:
-                self._instances[instance_id].execute(transaction_context, call_info.method_id, arguments)
-
-                return PythonRuntimeResult.OK
-            except ServiceError as error:
-                # Services are allowed to raise ServiceError to indicate that input data isn't valid.
-                self._logger.debug("Execute service error (emitted by service): %s", error)
-                return error
-            # Services are untrusted code, so we have to supress all the exceptions.
-            except Exception as error:  # pylint: disable=broad-except
-                # Indicate that service isn't OK and remove it from the running instances.
-                self._logger.warning("Execute service error (emitted by runtime): %s", error)
-                self._logger.warning("Exception traceback:\n%s", traceback.format_exc())
-                self._stop_service(instance_id, force=True)
-                return ServiceError(GenericServiceError.WRONG_SERVICE_IMPLEMENTATION)
-
-    def artifact_protobuf_spec(self, artifact: ArtifactId) -> Optional[ArtifactProtobufSpec]:
+        try:
+            self._instances[instance_id].execute(transaction_context, call_info.method_id, arguments)
+            fork.flush()
+
+            return PythonRuntimeResult.OK
+        except ServiceError as error:
+            # Services are allowed to raise ServiceError to indicate that input data isn't valid.
+            self._logger.debug("Execute service error (emitted by service): %s", error)
+            return error
+        # Services are untrusted code, so we have to supress all the exceptions.
+        except Exception as error:  # pylint: disable=broad-except
+            # Indicate that service isn't OK and remove it from the running instances.
+            self._logger.warning("Execute service error (emitted by runtime): %s", error)
+            self._logger.warning("Exception traceback:\n%s", traceback.format_exc())
+            self._stop_service(instance_id, force=True)
+            return ServiceError(GenericServiceError.WRONG_SERVICE_IMPLEMENTATION)
+
+    def _finish_hot_cache_transaction(self, succeeded: bool) -> None:
+        if self._hot_cache is None:
+            return
+
+        if succeeded:
+            self._hot_cache.commit_transaction()
+        else:
+            # Changes of the failed transaction are rolled back by the core.
+            self._hot_cache.rollback_transaction()
+
+    def artifact_protobuf_spec(self, artifact: ArtifactId) -> Optional[Tuple[ArtifactProtobufSpec, bytes]]:
         if not self.is_artifact_deployed(artifact):
             return None
 
+        cached_spec = self._protobuf_specs.get(artifact)
+        if cached_spec is not None:
+            return cached_spec
+
         try:
             sources = self._artifacts[artifact].get_service().proto_sources()
         except Exception:  # pylint: disable=broad-except
@@ -263,7 +346,10 @@ class PythonRuntime(RuntimeInterface, Named, WithSchema, ServiceApiProvider):
         if not isinstance(sources, ArtifactProtobufSpec):
             return None
 
-        return sources
+        spec = (sources, sources.content_hash())
+        self._protobuf_specs[artifact] = spec
+
+        return spec
 
     def state_hashes(self, access: RawIndexAccess) -> StateHashAggregator:
 
@@ -274,13 +360,29 @@ class PythonRuntime(RuntimeInterface, Named, WithSchema, ServiceApiProvider):
             instances = []
             to_stop = []
 
+            results: Dict[InstanceId, Tuple[bool, Any]] = dict()
+            to_calculate = []
             for instance_id, instance in self._instances.items():
-                try:
-                    state_hashes = instance.state_hashes(snapshot)
-                except Exception as error:  # pylint: disable=broad-except
+                cached = self._cached_state_hashes(instance_id, instance)
+                if cached is not None:
+                    results[instance_id] = (True, cached)
+                else:
+                    to_calculate.append((instance_id, instance))
+
+            calculate = functools.partial(self._calculate_state_hashes, snapshot)
+            calculate_instances = [instance for _, instance in to_calculate]
+            if self._state_hash_pool is not None and len(to_calculate) > 1:
+                # Native calls release the GIL, so hashes of different instances are calculated concurrently.
+                calculated: Iterable[Tuple[bool, Any]] = self._state_hash_pool.map(calculate, calculate_instances)
+            else:
+                calculated = map(calculate, calculate_instances)
+            results.update(zip([instance_id for instance_id, _ in to_calculate], calculated))
+
+            # Results are merged in the order of instances regardless of the calculation order.
+            for instance_id in self._instances:
+                succeeded, state_hashes = results[instance_id]
+                if not succeeded:
                     # Remove service from the running instances and skip it.
-                    self._logger.warning("State hash service error (emitted by runtime): %s", error)
-                    self._logger.warning("Exception traceback:\n%s", traceback.format_exc())
                     to_stop.append(instance_id)
                     continue
 
@@ -296,11 +398,42 @@ class PythonRuntime(RuntimeInterface, Named, WithSchema, ServiceApiProvider):
                 # Stop failed instances.
                 self._stop_service(instance_id)
 
+        if self._configuration.cache_state_hashes:
+            self._pending_state_hashes = dict(instances)
+            self._hashed_blocks += 1
+
         return StateHashAggregator(runtime, instances)
 
+    def _calculate_state_hashes(self, snapshot: Snapshot, instance: Service) -> Tuple[bool, Any]:
+        """Returns (True, state hashes) of the instance, or (False, None) if the service raised an exception."""
+        try:
+            return True, instance.state_hashes(snapshot)
+        except Exception as error:  # pylint: disable=broad-except
+            self._logger.warning("State hash service error (emitted by runtime): %s", error)
+            self._logger.warning("Exception traceback:\n%s", traceback.format_exc())
+            return False, None
+
+    def _cached_state_hashes(self, instance_id: InstanceId, instance: Service) -> Optional[List[Hash]]:
+        """Returns the state hashes of the instance at the last committed block
+        if none of its state hash indices were changed since then."""
+        cached = self._state_hashes_cache.get(instance_id)
+        if cached is None:
+            return None
+
+        # Only the default implementation is known to depend on the schema indices only.
+        if not isinstance(instance, WithSchema) or type(instance).state_hashes is not Service.state_hashes:
+            return None
+
+        if any(index_id in self._changed_indices for index_id in instance.state_hash_index_ids()):
+            return None
+
+        return cached
+
     def before_commit(self, access: RawIndexAccess) -> None:
-        with Fork(access) as fork:
-            assert isinstance(fork, Fork)
+        with self._fork(access) as fork:
+
+            if self._hot_cache is not None:
+                fork.set_hot_cache(self._hot_cache, tracked=True)
 
             to_stop = []
 
@@ -317,7 +450,24 @@ class PythonRuntime(RuntimeInterface, Named, WithSchema, ServiceApiProvider):
                 # Stop failed instances.
                 self._stop_service(instance_id)
 
+        if self._hot_cache is not None:
+            # Block is executed, but it may be not committed (e.g. if other proposal is accepted).
+            self._hot_cache.finish_block()
+
     def after_commit(self, access: RawIndexAccess) -> None:
+        if self._value_cache is not None:
+            # Block snapshot is already updated, so cached values are outdated.
+            self._value_cache.invalidate()
+
+        if self._hot_cache is not None:
+            self._hot_cache.commit_block()
+
+        # If several blocks were executed, it's unknown which hashes belong to the committed one.
+        self._state_hashes_cache = self._pending_state_hashes if self._hashed_blocks == 1 else dict()
+        self._pending_state_hashes = dict()
+        self._hashed_blocks = 0
+        self._changed_indices.clear()
+
         with Snapshot(access) as snapshot:
             assert isinstance(snapshot, Snapshot)
 
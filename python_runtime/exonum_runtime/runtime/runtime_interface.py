@@ -1,6 +1,6 @@
 """Interface for a runtime."""
 
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 import abc
 
 from .types import (
@@ -45,8 +45,8 @@ class RuntimeInterface(metaclass=abc.ABCMeta):
         """Execute the transaction."""
 
     @abc.abstractmethod
-    def artifact_protobuf_spec(self, artifact: ArtifactId) -> Optional[ArtifactProtobufSpec]:
-        """Retrieve artifact protobuf sources."""
+    def artifact_protobuf_spec(self, artifact: ArtifactId) -> Optional[Tuple[ArtifactProtobufSpec, bytes]]:
+        """Retrieve artifact protobuf sources alongside with their content hash."""
 
     @abc.abstractmethod
     def state_hashes(self, access: RawIndexAccess) -> StateHashAggregator:
@@ -2,6 +2,7 @@
 import abc
 from typing import no_type_check, List, NamedTuple, Callable, Dict, Any, Type, Optional
 import importlib
+import types
 
 from google.protobuf.message import Message as ProtobufMessage, DecodeError as ProtobufDecodeError
 
@@ -31,6 +32,15 @@ class _TransactionRoute(NamedTuple):
         return self.handler.__name__ == other.handler.__name__ and self.deserializer == other.deserializer
 
 
+class _Dispatch(NamedTuple):
+    """Transaction route resolved for the service instance."""
+
+    # Handler bound to the service instance.
+    handler: Callable[[TransactionContext, Any], None]
+    # Message object reused for every transaction, None if message class can't be resolved.
+    message: Optional[ProtobufMessage]
+
+
 class Service(Named, metaclass=abc.ABCMeta):
     """Base interface for every Exonum Python service.
 
@@ -84,6 +94,9 @@ class Service(Named, metaclass=abc.ABCMeta):
         self.__config = config
         self.__module_name = module_name
 
+        # Routes are resolved once, so transaction execution doesn't involve any lookups except for the method id.
+        self.__dispatch = self.__build_dispatch()
+
         # If we've already initialized the service, we won't have to initialize it again.
         if config is None:
             return
@@ -109,6 +122,26 @@ class Service(Named, metaclass=abc.ABCMeta):
 
         self.initialize(fork, config_message)
 
+    def __build_dispatch(self) -> Dict[int, _Dispatch]:
+        routes = self.__routing_table.get(type(self).__name__, dict())
+
+        try:
+            service_module: Optional[types.ModuleType] = importlib.import_module(
+                f"{self.__module_name}.proto.service_pb2"
+            )
+        except (ImportError, ModuleNotFoundError):
+            # Service doesn't provide "service.proto", it will be reported on the transaction execution.
+            service_module = None
+
+        dispatch = dict()
+        for method_id, route in routes.items():
+            deserializer: Optional[Type[ProtobufMessage]] = getattr(service_module, route.deserializer, None)
+            message = deserializer() if deserializer is not None else None
+
+            dispatch[method_id] = _Dispatch(types.MethodType(route.handler, self), message)
+
+        return dispatch
+
     @abc.abstractmethod
     def initialize(self, fork: Fork, config: ProtobufMessage) -> None:
         """Method to perform initialization of the service instance.
@@ -167,6 +200,10 @@ class Service(Named, metaclass=abc.ABCMeta):
         >>> deserializer = getattr(service_proto, tx_name)
         >>> tx = deserializer()
         >>> tx.ParseFromString(raw_tx_bytes)
+
+        Please note that the message object is created once for the service instance and
+        is reused for every transaction with the same `tx_id`, so handlers should copy
+        the message (or its parts) if they need it after returning.
         """
 
         TransactionHandler = Callable[["Service", TransactionContext, Any], None]
@@ -194,34 +231,26 @@ class Service(Named, metaclass=abc.ABCMeta):
 
         In case of execution error service should raise an subclass of
         ServiceError exception."""
-        service_name = type(self).__name__
-
-        if service_name not in self.__routing_table:
-            raise ServiceError(GenericServiceError.METHOD_NOT_FOUND.value)
-
-        tx_route = self.__routing_table[service_name].get(method_id)
+        tx_dispatch = self.__dispatch.get(method_id)
 
-        if tx_route is None:
+        if tx_dispatch is None:
             # Unknown method.
             raise ServiceError(GenericServiceError.METHOD_NOT_FOUND.value)
 
-        try:
-            service_module = importlib.import_module(f"{self.__module_name}.proto.service_pb2")
-            deserializer: Type[ProtobufMessage] = getattr(service_module, tx_route.deserializer)
+        transaction = tx_dispatch.message
 
-            transaction = deserializer()
-        except (ImportError, ModuleNotFoundError, AttributeError):
+        if transaction is None:
             # Service doesn't provide either "service.proto" or deserializer message.
-
             raise ServiceError(GenericServiceError.WRONG_SERVICE_IMPLEMENTATION.value)
 
         try:
+            # Message is cleared before parsing, so nothing is left from the previous transaction.
             transaction.ParseFromString(raw_tx)
         except ProtobufDecodeError:
             # Unable to parse tx.
             raise ServiceError(GenericServiceError.MALFORMED_CONFIG)
 
-        tx_route.handler(self, context, transaction)
+        tx_dispatch.handler(context, transaction)
 
     def state_hashes(self, snapshot: Snapshot) -> List[Hash]:
         """Should return hashes of indices used by service.
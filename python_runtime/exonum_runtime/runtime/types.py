@@ -1,6 +1,7 @@
 """Common types for python runtime."""
 from typing import NamedTuple, NewType, Tuple, List, Union, Optional
 from enum import IntEnum
+import hashlib
 import os
 
 import ctypes as c
@@ -96,6 +97,17 @@ class ArtifactProtobufSpec(NamedTuple):
 
         return cls(sources)
 
+    def content_hash(self) -> bytes:
+        """Returns SHA-256 hash of the names and contents of the files."""
+        digest = hashlib.sha256()
+        for source in self.sources:
+            for part in (source.name, source.content):
+                data = bytes(part, "utf-8")
+                digest.update(len(data).to_bytes(8, "little"))
+                digest.update(data)
+
+        return digest.digest()
+
 
 class StateHashAggregator(NamedTuple):
     """TODO"""
@@ -0,0 +1,5 @@
+"""Common setup of the tests."""
+
+# `exonum_runtime.merkledb` and `exonum_runtime.runtime` import each other, and the cycle
+# resolves only when the runtime package is imported first (as the runtime itself does).
+import exonum_runtime.runtime  # noqa: F401 pylint: disable=unused-import
@@ -0,0 +1,165 @@
+"""In-memory replacement of the native MerkleDB bindings for the index tests."""
+from typing import Any, Dict, List, Optional, Tuple
+import contextlib
+import struct
+
+from exonum_runtime.crypto import Hash
+from exonum_runtime.ffi.merkledb import MerkledbFFI
+from exonum_runtime.ffi.merkledb.common import KeyBounds
+
+
+class FakeListIndex:
+    """Same interface as `ListIndexWrapper`, but data is kept in a Python list."""
+
+    def __init__(self, data: List[bytes], calls: List[str]) -> None:
+        self.data = data
+        self.calls = calls
+
+    def free(self) -> None:
+        pass
+
+    def get(self, idx: int) -> Optional[bytes]:
+        self.calls.append("get")
+        return self.data[idx] if 0 <= idx < len(self.data) else None
+
+    def get_range(self, start: int, end: int) -> List[bytes]:
+        self.calls.append("get_range")
+        return self.data[start:end]
+
+    def push(self, value: bytes) -> None:
+        self.calls.append("push")
+        self.data.append(value)
+
+    def extend(self, values: List[bytes]) -> None:
+        self.calls.append("extend")
+        self.data.extend(values)
+
+    def pop(self) -> Optional[bytes]:
+        self.calls.append("pop")
+        return self.data.pop() if self.data else None
+
+    def len(self) -> int:
+        return len(self.data)
+
+    def set_item(self, idx: int, value: bytes) -> None:
+        self.calls.append("set_item")
+        self.data[idx] = value
+
+    def clear(self) -> None:
+        self.calls.append("clear")
+        self.data.clear()
+
+
+class FakeMapIndex:
+    """Same interface as `MapIndexWrapper`, but data is kept in a Python dict."""
+
+    def __init__(self, data: Dict[bytes, bytes], calls: List[str]) -> None:
+        self.data = data
+        self.calls = calls
+
+    def free(self) -> None:
+        pass
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        self.calls.append("get")
+        return self.data.get(key)
+
+    def get_many(self, keys: List[bytes]) -> List[Optional[bytes]]:
+        self.calls.append("get_many")
+        return [self.data.get(key) for key in keys]
+
+    def iter_chunk(
+        self, from_key: Optional[bytes], limit: int, with_values: bool, bounds: KeyBounds = (None, None, None)
+    ) -> List[bytes]:
+        self.calls.append("iter_chunk")
+        start, end, prefix = bounds
+
+        items: List[bytes] = []
+        for key in sorted(self.data):
+            if from_key is not None and key <= from_key:
+                continue
+            if (start is not None and key < start) or (end is not None and key >= end):
+                continue
+            if prefix is not None and not key.startswith(prefix):
+                continue
+            if len(items) == limit * (2 if with_values else 1):
+                break
+
+            items.extend((key, self.data[key]) if with_values else (key,))
+
+        return items
+
+    def put(self, key: bytes, value: bytes) -> None:
+        self.calls.append("put")
+        self.data[key] = value
+
+    def put_many(self, entries: List[Tuple[bytes, bytes]]) -> None:
+        self.calls.append("put_many")
+        self.data.update(entries)
+
+    def remove(self, key: bytes) -> None:
+        self.calls.append("remove")
+        self.data.pop(key, None)
+
+    def remove_many(self, keys: List[bytes]) -> None:
+        self.calls.append("remove_many")
+        for key in keys:
+            self.data.pop(key, None)
+
+    def clear(self) -> None:
+        self.calls.append("clear")
+        self.data.clear()
+
+
+class FakeProofMapIndex(FakeMapIndex):
+    """Same interface as `ProofMapIndexWrapper`. Hashes and proofs only reflect the current data,
+    they don't follow the MerkleDB format."""
+
+    def object_hash(self) -> Hash:
+        self.calls.append("object_hash")
+        return Hash.hash_data(b"".join(key + value for key, value in sorted(self.data.items())))
+
+    def get_multiproof(self, keys: List[bytes]) -> Optional[bytes]:
+        self.calls.append("get_multiproof")
+
+        # Proof with the requested entries and without the subtree hashes.
+        raw = struct.pack("<Q", len(keys))
+        for key in keys:
+            value = self.data.get(key)
+            raw += struct.pack("<BQ", value is not None, len(key)) + key
+            if value is not None:
+                raw += struct.pack("<Q", len(value)) + value
+
+        return raw + struct.pack("<Q", 0)
+
+
+class FakeMerkledb:
+    """Replacement of `MerkledbFFI`: indices with the same id share the data."""
+
+    def __init__(self) -> None:
+        self.lists: Dict[bytes, List[bytes]] = dict()
+        self.maps: Dict[bytes, Dict[bytes, bytes]] = dict()
+        # Names of the calls made to the native indices.
+        self.calls: List[str] = []
+
+    def list_index(self, name: bytes, _access: Any) -> FakeListIndex:
+        return FakeListIndex(self.lists.setdefault(name, []), self.calls)
+
+    def map_index(self, name: bytes, _access: Any) -> FakeMapIndex:
+        return FakeMapIndex(self.maps.setdefault(name, dict()), self.calls)
+
+    def proof_map_index(self, name: bytes, _access: Any) -> FakeProofMapIndex:
+        return FakeProofMapIndex(self.maps.setdefault(name, dict()), self.calls)
+
+
+@contextlib.contextmanager
+def fake_merkledb() -> Any:
+    """Installs `FakeMerkledb` as the MerkleDB bindings within the context."""
+    # pylint: disable=protected-access
+    previous = MerkledbFFI._FFI_ENTITY
+    fake = FakeMerkledb()
+    MerkledbFFI._FFI_ENTITY = fake  # type: ignore
+    try:
+        yield fake
+    finally:
+        MerkledbFFI._FFI_ENTITY = previous
@@ -0,0 +1,79 @@
+"""Tests of the index access checks in the debug and production modes."""
+from typing import Any, Callable, List, Tuple
+import contextlib
+import unittest
+
+from exonum_runtime.merkledb.codecs import Str, U64
+from exonum_runtime.merkledb.indices import IndexAccessError, ListIndex, MapIndex, ProofMapIndex, set_access_checks
+from exonum_runtime.merkledb.types import Fork, Snapshot
+
+from .fake_merkledb import fake_merkledb
+
+
+def _mutations(access: Any) -> List[Tuple[str, Callable[[], Any]]]:
+    """Mutable calls of every index type."""
+    items = ListIndex[U64](access, "service", "list")()
+    mutations: List[Tuple[str, Callable[[], Any]]] = [
+        ("list.append", lambda: items.append(U64(1))),
+        ("list.extend", lambda: items.extend([U64(1)])),
+        ("list.__setitem__", lambda: items.__setitem__(0, U64(1))),
+        ("list.pop", items.pop),
+        ("list.clear", items.clear),
+    ]
+
+    for index_type in (MapIndex, ProofMapIndex):
+        index = index_type[Str, U64](access, "service", index_type.__name__)()
+        name = index_type.__name__
+        mutations += [
+            (f"{name}.__setitem__", lambda index=index: index.__setitem__(Str("alice"), U64(1))),
+            (f"{name}.put_many", lambda index=index: index.put_many({Str("alice"): U64(1)})),
+            (f"{name}.__delitem__", lambda index=index: index.__delitem__(Str("alice"))),
+            (f"{name}.remove_many", lambda index=index: index.remove_many([Str("alice")])),
+            (f"{name}.clear", index.clear),
+        ]
+
+    return mutations
+
+
+class TestAccessChecks(unittest.TestCase):
+    def setUp(self) -> None:
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+        self.addCleanup(set_access_checks, True)
+
+        self.merkledb = stack.enter_context(fake_merkledb())
+        self.merkledb.lists[b"service.list"] = [U64(0).into_bytes()]
+
+    def check_modes(self, test: Callable[[], None]) -> None:
+        for enabled in (True, False):
+            set_access_checks(enabled)
+            with self.subTest(access_checks=enabled):
+                test()
+
+    def test_snapshot_is_read_only(self) -> None:
+        def test() -> None:
+            with Snapshot(None) as snapshot:
+                for name, mutation in _mutations(snapshot):
+                    with self.assertRaises(IndexAccessError, msg=name):
+                        mutation()
+
+                # Reads are not affected.
+                self.assertEqual(len(ListIndex[U64](snapshot, "service", "list")()), 1)
+                self.assertIsNone(MapIndex[Str, U64](snapshot, "service", "map")().get(Str("alice")))
+
+            self.assertEqual(self.merkledb.lists[b"service.list"], [U64(0).into_bytes()])
+            self.assertFalse(any(self.merkledb.maps.values()))
+
+        self.check_modes(test)
+
+    def test_fork_is_mutable(self) -> None:
+        def test() -> None:
+            with Fork(None) as fork:
+                for _, mutation in _mutations(fork):
+                    mutation()
+
+        self.check_modes(test)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Tests of the per-thread arena allocator."""
+import ctypes as c
+import threading
+import unittest
+
+from exonum_runtime.ffi.arena import Arena, thread_arena
+
+
+def _write(address: int, data: bytes) -> None:
+    c.memmove(address, data, len(data))
+
+
+class TestArena(unittest.TestCase):
+    def test_allocations_within_chunk(self) -> None:
+        arena = Arena(chunk_size=64)
+
+        first = arena.allocate(10)
+        second = arena.allocate(20)
+        self.assertEqual(second, first + 10)
+
+        _write(first, b"a" * 10)
+        _write(second, b"b" * 20)
+        self.assertEqual(bytes(arena.view(first, 10)), b"a" * 10)
+        self.assertEqual(bytes(arena.view(second, 20)), b"b" * 20)
+
+    def test_allocation_across_chunk_boundary(self) -> None:
+        arena = Arena(chunk_size=32)
+
+        first = arena.allocate(24)
+        # Doesn't fit into the rest of the first chunk, so a new chunk is used.
+        second = arena.allocate(16)
+        self.assertNotEqual(second, first + 24)
+        self.assertEqual(len(arena._chunks), 2)  # pylint: disable=protected-access
+
+        _write(first, b"x" * 24)
+        _write(second, b"y" * 16)
+        self.assertEqual(bytes(arena.view(first, 24)), b"x" * 24)
+        self.assertEqual(bytes(arena.view(second, 16)), b"y" * 16)
+
+    def test_big_allocation_gets_dedicated_chunk(self) -> None:
+        arena = Arena(chunk_size=32)
+
+        address = arena.allocate(100)
+        _write(address, bytes(range(100)))
+
+        self.assertEqual(bytes(arena.view(address, 100)), bytes(range(100)))
+        self.assertEqual(len(arena._chunks[-1].buffer), 100)  # pylint: disable=protected-access
+
+    def test_view_is_truncated_to_length(self) -> None:
+        arena = Arena(chunk_size=32)
+
+        address = arena.allocate(8)
+        _write(address, b"abcdefgh")
+
+        self.assertEqual(bytes(arena.view(address, 3)), b"abc")
+
+    def test_nested_scopes(self) -> None:
+        arena = Arena(chunk_size=32)
+        self.assertFalse(arena.in_scope())
+
+        arena.enter_scope()
+        arena.enter_scope()
+        address = arena.allocate(8)
+
+        arena.exit_scope()
+        # Inner scope doesn't release the buffers of the outer one.
+        self.assertTrue(arena.in_scope())
+        self.assertEqual(len(arena.view(address, 8)), 8)
+
+        arena.exit_scope()
+        self.assertFalse(arena.in_scope())
+        with self.assertRaises(KeyError):
+            arena.view(address, 8)
+
+    def test_release_keeps_only_first_chunk(self) -> None:
+        arena = Arena(chunk_size=32)
+
+        first = arena.allocate(30)
+        arena.allocate(30)
+        arena.allocate(100)
+        self.assertEqual(len(arena._chunks), 3)  # pylint: disable=protected-access
+
+        arena.release()
+
+        self.assertEqual(len(arena._chunks), 1)  # pylint: disable=protected-access
+        # Allocation starts from the beginning of the first chunk again.
+        self.assertEqual(arena.allocate(4), first)
+
+    def test_arena_per_thread(self) -> None:
+        main_arena = thread_arena()
+        self.assertIs(thread_arena(), main_arena)
+
+        results = {}
+
+        def worker(name: str) -> None:
+            arena = thread_arena()
+            arena.enter_scope()
+            address = arena.allocate(4)
+            _write(address, name.encode()[:4].ljust(4, b"_"))
+            results[name] = (arena, bytes(arena.view(address, 4)), arena.in_scope())
+            arena.exit_scope()
+
+        threads = [threading.Thread(target=worker, args=(name,)) for name in ("one", "two")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        arenas = {id(arena) for arena, _, _ in results.values()}
+        self.assertEqual(len(arenas), 2)
+        self.assertNotIn(id(main_arena), arenas)
+        self.assertEqual(results["one"][1], b"one_")
+        self.assertEqual(results["two"][1], b"two_")
+        # Scopes opened by the workers are not visible on the main thread.
+        self.assertTrue(all(in_scope for _, _, in_scope in results.values()))
+        self.assertFalse(main_arena.in_scope())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Tests of the NumPy arrays of fixed-layout records."""
+from dataclasses import dataclass
+from typing import Any, List
+import struct
+import unittest
+
+from exonum_runtime.merkledb.codecs import fixed_record, bytes32, i16, u32
+from exonum_runtime.merkledb.codecs.arrays import record_dtype, records_from_items, records_from_values
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@fixed_record
+@dataclass
+class Point:
+    x: u32
+    y: i16
+    visible: bool
+    tag: bytes32
+
+
+def _point(idx: int) -> Point:
+    return Point(u32(idx), i16(-idx), idx % 2 == 0, bytes32(bytes([idx]) * 32))
+
+
+def _items(values: List[bytes]) -> bytearray:
+    return bytearray(b"".join(struct.pack("<Q", len(value)) + value for value in values))
+
+
+def _offsets(values: List[bytes]) -> bytes:
+    offsets = [0]
+    for value in values:
+        offsets.append(offsets[-1] + len(value))
+
+    return struct.pack(f"<{len(offsets)}Q", *offsets)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestArrays(unittest.TestCase):
+    def assert_points(self, records: Any, indices: List[int]) -> None:
+        self.assertEqual(records["x"].tolist(), indices)
+        self.assertEqual(records["y"].tolist(), [-idx for idx in indices])
+        self.assertEqual(records["visible"].tolist(), [idx % 2 == 0 for idx in indices])
+        self.assertEqual([bytes(tag) for tag in records["tag"]], [bytes([idx]) * 32 for idx in indices])
+
+    def test_record_dtype(self) -> None:
+        dtype = record_dtype(Point)
+        self.assertEqual(dtype.names, ("x", "y", "visible", "tag"))
+        self.assertEqual([dtype.fields[name][1] for name in dtype.names], [0, 4, 6, 7])
+        self.assertEqual(dtype.itemsize, len(_point(0).into_bytes()))
+        self.assertEqual(dtype["x"], np.dtype("<u4"))
+        self.assertEqual(dtype["tag"], np.dtype("V32"))
+
+        # Prefix shifts the fields, dtypes are shared.
+        prefixed = record_dtype(Point, 8)
+        self.assertEqual([prefixed.fields[name][1] for name in prefixed.names], [8, 12, 14, 15])
+        self.assertEqual(prefixed.itemsize, dtype.itemsize + 8)
+        self.assertIs(record_dtype(Point), dtype)
+
+        with self.assertRaises(TypeError):
+            record_dtype(int)
+
+    def test_records_from_values(self) -> None:
+        points = [_point(1), None, _point(2), None]
+        values = [b"" if point is None else point.into_bytes() for point in points]
+        found = bytes(point is not None for point in points)
+
+        records, mask = records_from_values(Point, bytearray(b"".join(values)), _offsets(values), found)
+        self.assertEqual(mask.tolist(), [True, False, True, False])
+        self.assert_points(records[mask], [1, 2])
+        # Records of the absent values are zeroed.
+        self.assertEqual(records["x"][~mask].tolist(), [0, 0])
+
+        empty, mask = records_from_values(Point, bytearray(), _offsets([]), b"")
+        self.assertEqual((len(empty), len(mask)), (0, 0))
+
+    def test_records_from_values_with_wrong_layout(self) -> None:
+        values = [_point(1).into_bytes(), b"short"]
+        with self.assertRaises(ValueError):
+            records_from_values(Point, bytearray(b"".join(values)), _offsets(values), b"\x01\x01")
+
+    def test_records_from_items(self) -> None:
+        buffer = _items([_point(idx).into_bytes() for idx in range(5)])
+        records = records_from_items(Point, buffer)
+
+        self.assert_points(records, list(range(5)))
+        self.assertEqual(len(records_from_items(Point, bytearray())), 0)
+
+        # Records are a view of the buffer.
+        buffer[8] = 42
+        self.assertEqual(records["x"][0], 42)
+
+    def test_records_from_items_with_wrong_layout(self) -> None:
+        record = _point(1).into_bytes()
+        for buffer in (_items([record, b"short"]), _items([record[:-1] + b"\x00\x00"])):
+            with self.assertRaises(ValueError):
+                records_from_items(Point, buffer)
+
+
+if __name__ == "__main__":
+    unittest.main()
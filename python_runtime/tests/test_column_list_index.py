@@ -0,0 +1,155 @@
+"""Tests of the chunked column list index."""
+from typing import Any, List
+import contextlib
+import unittest
+
+from exonum_runtime.merkledb.codecs import u16
+from exonum_runtime.merkledb.indices import ColumnListIndex
+from exonum_runtime.merkledb.indices.column_list_index import CHUNK_SIZE
+from exonum_runtime.merkledb.types import Fork, Snapshot
+
+from .fake_merkledb import fake_merkledb
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestColumnListIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+
+        self.merkledb = stack.enter_context(fake_merkledb())
+        self.fork = stack.enter_context(Fork(None))
+
+    def column(self, access: Any = None) -> Any:
+        return ColumnListIndex[u16](access or self.fork, "service", "column")()
+
+    def chunk_lengths(self) -> List[int]:
+        return [len(chunk) // 2 for chunk in self.merkledb.lists.get(b"service.column", [])]
+
+    def test_append_across_chunk_boundary(self) -> None:
+        column = self.column()
+        column.extend(range(CHUNK_SIZE - 2))
+        self.assertEqual(self.chunk_lengths(), [CHUNK_SIZE - 2])
+
+        self.merkledb.calls.clear()
+        for value in range(3):
+            column.append(value)
+
+        # Partial chunk is written, and the element after the full chunk starts the new one.
+        self.assertEqual(self.merkledb.calls, ["set_item", "set_item", "push"])
+        self.assertEqual(self.chunk_lengths(), [CHUNK_SIZE, 1])
+        self.assertEqual(column.to_array().tolist(), list(range(CHUNK_SIZE - 2)) + [0, 1, 2])
+
+        # Full chunks are never rewritten.
+        self.merkledb.calls.clear()
+        column.extend(range(2 * CHUNK_SIZE))
+        self.assertEqual(self.merkledb.calls, ["set_item", "extend"])
+        self.assertEqual(self.chunk_lengths(), [CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE, 1])
+
+    def test_len(self) -> None:
+        column = self.column()
+        self.assertEqual(len(column), 0)
+
+        for amount, expected in ((1, 1), (CHUNK_SIZE - 1, CHUNK_SIZE), (CHUNK_SIZE + 5, 2 * CHUNK_SIZE + 5)):
+            column.extend(np.zeros(amount, dtype="u2"))
+            self.assertEqual(len(column), expected)
+
+        # Length is read from the database once per access scope.
+        self.merkledb.calls.clear()
+        self.assertEqual(len(self.column()), 2 * CHUNK_SIZE + 5)
+        self.assertEqual(self.merkledb.calls, [])
+
+        with Snapshot(None) as snapshot:
+            self.assertEqual(len(self.column(snapshot)), 2 * CHUNK_SIZE + 5)
+
+        with Fork(None) as fork:
+            self.assertEqual(len(self.column(fork)), 2 * CHUNK_SIZE + 5)
+
+    def test_get_range(self) -> None:
+        column = self.column()
+        column.extend(np.arange(CHUNK_SIZE + 10, dtype="u2"))
+
+        self.merkledb.calls.clear()
+        values = column.get_range(CHUNK_SIZE - 2, CHUNK_SIZE + 2)
+        self.assertEqual(values.tolist(), list(range(CHUNK_SIZE - 2, CHUNK_SIZE + 2)))
+        self.assertEqual(self.merkledb.calls, ["get_range"])
+
+        # Range is truncated to the length of the list.
+        values = column.get_range(CHUNK_SIZE + 5, 10 * CHUNK_SIZE)
+        self.assertEqual(values.tolist(), list(range(CHUNK_SIZE + 5, CHUNK_SIZE + 10)))
+        self.assertEqual(column.get_range(5 * CHUNK_SIZE, 6 * CHUNK_SIZE).tolist(), [])
+        self.assertEqual(column.get_range(5, 5).tolist(), [])
+
+        with self.assertRaises(IndexError):
+            column.get_range(-1, 5)
+
+    def test_getitem(self) -> None:
+        column = self.column()
+        column.extend(np.arange(CHUNK_SIZE + 10, dtype="u2"))
+
+        self.assertEqual(column[0], 0)
+        self.assertEqual(column[CHUNK_SIZE], CHUNK_SIZE)
+        self.assertEqual(column[-1], CHUNK_SIZE + 9)
+
+        for idx in (CHUNK_SIZE + 10, -(CHUNK_SIZE + 11)):
+            with self.assertRaises(IndexError):
+                column[idx]  # pylint: disable=pointless-statement
+
+    def test_setitem(self) -> None:
+        column = self.column()
+        column.extend(np.arange(CHUNK_SIZE + 10, dtype="u2"))
+
+        column[1] = 1000
+        column[CHUNK_SIZE + 1] = 2000
+        column[-1] = 3000
+
+        for idx in (CHUNK_SIZE + 10, -(CHUNK_SIZE + 11)):
+            with self.assertRaises(IndexError):
+                column[idx] = 0
+
+        # Elements appended after the change of the partial chunk follow it.
+        column.append(4000)
+
+        expected = list(range(CHUNK_SIZE + 10)) + [4000]
+        expected[1], expected[CHUNK_SIZE + 1], expected[CHUNK_SIZE + 9] = 1000, 2000, 3000
+        self.assertEqual(column.to_array().tolist(), expected)
+        self.assertEqual(self.chunk_lengths(), [CHUNK_SIZE, 11])
+
+    def test_write_back(self) -> None:
+        with Fork(None) as fork:
+            fork.enable_write_back()
+            column = self.column(fork)
+
+            self.merkledb.calls.clear()
+            column.extend(range(10))
+            column.append(10)
+            self.assertEqual(len(self.column(fork)), 11)
+            self.assertEqual(self.merkledb.calls, [])
+
+            fork.flush()
+            self.assertEqual(self.merkledb.calls, ["push"])
+            self.assertEqual(self.chunk_lengths(), [11])
+
+            # Elements which weren't flushed are dropped on the scope exit.
+            column.append(11)
+
+        self.assertEqual(self.chunk_lengths(), [11])
+        self.assertEqual(len(self.column()), 11)
+
+    def test_clear(self) -> None:
+        column = self.column()
+        column.extend(range(10))
+        column.clear()
+
+        self.assertEqual(len(column), 0)
+        column.append(1)
+        self.assertEqual(column.to_array().tolist(), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
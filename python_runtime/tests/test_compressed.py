@@ -0,0 +1,122 @@
+"""Tests of the compressed values codec."""
+import json
+import os
+import unittest
+import zlib
+
+from exonum_runtime.merkledb.codecs import Bytes, Compressed, train_dictionary
+from exonum_runtime.merkledb.codecs.compressed import MAX_DICTIONARY_SIZE
+
+
+def _document(idx: int) -> bytes:
+    """JSON document of the typical structure."""
+    return json.dumps(
+        {"id": idx, "title": f"Document {idx}", "author": {"name": "Alice", "role": "editor"}, "tags": ["draft"]}
+    ).encode()
+
+
+SAMPLES = [_document(idx) for idx in range(50)]
+
+
+class TestCompressed(unittest.TestCase):
+    def assert_round_trip(self, codec: type, data: bytes, header: int) -> bytes:
+        encoded = codec(Bytes(data)).into_bytes()
+        self.assertEqual(encoded[0], header)
+        self.assertEqual(codec.from_bytes(encoded), codec(Bytes(data)))
+        return encoded
+
+    def test_small_values_are_raw(self) -> None:
+        codec = Compressed[Bytes, 6, 64]
+        for data in (b"", b"short", b"a" * 64):
+            self.assertEqual(self.assert_round_trip(codec, data, 0), b"\x00" + data)
+
+    def test_incompressible_values_are_raw(self) -> None:
+        data = os.urandom(1024)
+        self.assertEqual(self.assert_round_trip(Compressed[Bytes, 6, 64], data, 0), b"\x00" + data)
+
+    def test_zlib(self) -> None:
+        data = b"".join(SAMPLES)
+        encoded = self.assert_round_trip(Compressed[Bytes], data, 1)
+
+        self.assertLess(len(encoded), len(data))
+        self.assertEqual(zlib.decompress(encoded[1:]), data)
+
+        # Level doesn't affect decoding.
+        encoded = Compressed[Bytes, 9](Bytes(data)).into_bytes()
+        self.assertEqual(Compressed[Bytes, 1].from_bytes(encoded).value.value, data)
+
+    def test_dictionary(self) -> None:
+        dictionary = train_dictionary(SAMPLES)
+        codec = Compressed[Bytes, 6, 64, dictionary]
+        data = _document(1000)
+
+        encoded = self.assert_round_trip(codec, data, 2)
+        self.assertEqual(encoded[1:5], zlib.crc32(dictionary).to_bytes(4, "little"))
+
+        # Dictionary makes the small values of the known structure much shorter.
+        self.assertLess(len(encoded), len(Compressed[Bytes, 6, 64](Bytes(data)).into_bytes()))
+
+        # Values compressed without the dictionary are still readable.
+        plain = Compressed[Bytes, 6, 64](Bytes(b"".join(SAMPLES))).into_bytes()
+        self.assertEqual(codec.from_bytes(plain).value.value, b"".join(SAMPLES))
+
+    def test_wrong_dictionary(self) -> None:
+        encoded = Compressed[Bytes, 6, 64, train_dictionary(SAMPLES)](Bytes(_document(1000))).into_bytes()
+
+        for codec in (Compressed[Bytes, 6, 64], Compressed[Bytes, 6, 64, b"another dictionary"]):
+            with self.assertRaises(ValueError):
+                codec.from_bytes(encoded)
+
+    def test_malformed(self) -> None:
+        codec = Compressed[Bytes]
+        for data in (b"", b"\x03data"):
+            with self.assertRaises(ValueError):
+                codec.from_bytes(data)
+
+        with self.assertRaises(zlib.error):
+            codec.from_bytes(b"\x01not zlib")
+
+    def test_parameters(self) -> None:
+        self.assertIs(Compressed[Bytes], Compressed[Bytes, 6, 512, None])
+        self.assertIsNot(Compressed[Bytes, 1], Compressed[Bytes, 9])
+
+        too_long = bytes(MAX_DICTIONARY_SIZE + 1)
+        invalid = (
+            (int,),
+            (Bytes, 10),
+            (Bytes, 6, -1),
+            (Bytes, 6, "512"),
+            (Bytes, 6, 512, "dictionary"),
+            (Bytes, 6, 512, too_long),
+            (Bytes, 6, 512, None, "extra"),
+            (),
+        )
+        for params in invalid:
+            with self.assertRaises(ValueError):
+                Compressed[params]  # pylint: disable=pointless-statement
+
+        with self.assertRaises(RuntimeError):
+            Compressed(Bytes(b""))
+
+    def test_train_dictionary(self) -> None:
+        dictionary = train_dictionary(SAMPLES, size=256)
+        self.assertLessEqual(len(dictionary), 256)
+        self.assertIn(b'"author"', dictionary)
+
+        # Substrings of a single sample are not included, however often they repeat.
+        self.assertEqual(train_dictionary([b"x" * 1000]), b"")
+        self.assertEqual(train_dictionary([]), b"")
+
+        # Most frequent substrings are at the end of the dictionary.
+        samples = [b"common_prefix_" + bytes([idx]) * 16 for idx in range(10)] + [b"rare"] * 2
+        dictionary = train_dictionary(samples, segment=4)
+        self.assertTrue(dictionary.startswith(b"rare"), dictionary)
+        self.assertIn(b"comm", dictionary)
+
+        for size in (0, MAX_DICTIONARY_SIZE + 1):
+            with self.assertRaises(ValueError):
+                train_dictionary(SAMPLES, size=size)
+
+
+if __name__ == "__main__":
+    unittest.main()
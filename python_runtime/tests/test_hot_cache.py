@@ -0,0 +1,111 @@
+"""Tests of the cross-block hot cache of the map indices."""
+from typing import Any
+import contextlib
+import unittest
+
+from google.protobuf.wrappers_pb2 import UInt64Value
+
+from exonum_runtime.merkledb.codecs import ProtoCodec, Str
+from exonum_runtime.merkledb.hot_cache import HotCache
+from exonum_runtime.merkledb.indices import MapIndex
+from exonum_runtime.merkledb.schema import Schema
+from exonum_runtime.merkledb.types import Fork
+
+from .fake_merkledb import fake_merkledb
+
+Balance = ProtoCodec[UInt64Value]
+
+
+class WalletsSchema(Schema):
+    _hot_cache_ = ["balances"]
+
+    balances: MapIndex[Str, Balance]
+
+
+class TestHotCache(unittest.TestCase):
+    def setUp(self) -> None:
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+
+        self.merkledb = stack.enter_context(fake_merkledb())
+        self.merkledb.maps[b"service.balances"] = {b"alice": Balance(value=100).into_bytes()}
+
+        self.hot_cache = HotCache(16)
+
+    @contextlib.contextmanager
+    def transaction(self, succeeded: bool = True) -> Any:
+        """Yields the hot-cached index within the fork of the block execution."""
+        with Fork(None) as fork:
+            fork.enable_write_back()
+            fork.set_hot_cache(self.hot_cache, tracked=True)
+
+            yield WalletsSchema("service", fork).balances()
+
+            if succeeded:
+                fork.flush()
+                self.hot_cache.commit_transaction()
+            else:
+                self.hot_cache.rollback_transaction()
+
+    def balance(self) -> int:
+        with self.transaction() as balances:
+            return balances[Str("alice")].value
+
+    def test_values_are_cached(self) -> None:
+        self.assertEqual(self.balance(), 100)
+
+        self.merkledb.calls.clear()
+        self.assertEqual(self.balance(), 100)
+        self.assertEqual(self.merkledb.calls, [])
+
+    def test_in_place_change_of_failed_transaction(self) -> None:
+        self.assertEqual(self.balance(), 100)
+
+        with self.transaction(succeeded=False) as balances:
+            sender = balances[Str("alice")]
+            sender.value -= 10
+            self.assertEqual(balances[Str("alice")].value, 100)
+
+        with self.transaction(succeeded=False) as balances:
+            sender = balances.get_many([Str("alice")])[0]
+            sender.value -= 10
+            balances[Str("alice")] = sender
+            self.assertEqual(balances[Str("alice")].value, 90)
+
+        self.assertEqual(self.balance(), 100)
+
+    def test_committed_block(self) -> None:
+        with self.transaction() as balances:
+            sender = balances[Str("alice")]
+            sender.value -= 10
+            balances[Str("alice")] = sender
+            self.assertEqual(balances.get_many([Str("alice")])[0].value, 90)
+
+        with self.transaction(succeeded=False) as balances:
+            balances[Str("alice")] = Balance(value=0)
+
+        self.hot_cache.finish_block()
+        self.hot_cache.commit_block()
+
+        self.merkledb.calls.clear()
+        self.assertEqual(self.balance(), 90)
+        self.assertEqual(self.merkledb.calls, [])
+
+    def test_uncommitted_blocks(self) -> None:
+        self.assertEqual(self.balance(), 100)
+
+        for value in (90, 80):
+            with self.transaction() as balances:
+                balances[Str("alice")] = Balance(value=value)
+            self.hot_cache.finish_block()
+
+        # Several blocks were executed, so it's not known which of them is committed.
+        self.hot_cache.commit_block()
+
+        self.merkledb.calls.clear()
+        self.assertEqual(self.balance(), 80)
+        self.assertEqual(self.merkledb.calls, ["get"])
+
+
+if __name__ == "__main__":
+    unittest.main()
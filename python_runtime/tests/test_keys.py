@@ -0,0 +1,130 @@
+"""Tests of the order-preserving key codecs."""
+from typing import Any, List, Sequence, Type
+import itertools
+import unittest
+
+from exonum_runtime.merkledb.codecs import U8, U16, U32, U64, I8, I16, I32, I64, Bytes, Str, TimestampIdKey, TupleKey
+from exonum_runtime.merkledb.codecs import prefix
+from exonum_runtime.merkledb.into_bytes import IntoBytes
+
+
+class TestOrderedKeys(unittest.TestCase):
+    def assert_order_preserved(self, key_type: Type[IntoBytes], values: Sequence[Any]) -> None:
+        """Checks that `a < b` implies `encode(a) < encode(b)` for all the pairs, and that keys round-trip."""
+        keys: List[Any] = [key_type(*value) if isinstance(value, tuple) else key_type(value) for value in values]
+
+        for key in keys:
+            self.assertEqual(key_type.from_bytes(key.into_bytes()), key)
+
+        for first, second in itertools.combinations(keys, 2):
+            if first < second:
+                self.assertLess(first.into_bytes(), second.into_bytes(), (first, second))
+            elif second < first:
+                self.assertLess(second.into_bytes(), first.into_bytes(), (first, second))
+            else:
+                self.assertEqual(first.into_bytes(), second.into_bytes(), (first, second))
+
+    def test_unsigned_integers(self) -> None:
+        for key_type, bits in ((U8, 8), (U16, 16), (U32, 32), (U64, 64)):
+            values = [0, 1, 2, 127, 128, 255, (1 << bits) - 2, (1 << bits) - 1]
+            self.assert_order_preserved(key_type, sorted(set(value for value in values if value < 1 << bits)))
+
+    def test_signed_integers(self) -> None:
+        for key_type, bits in ((I8, 8), (I16, 16), (I32, 32), (I64, 64)):
+            low, high = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+            self.assert_order_preserved(key_type, [low, low + 1, -100, -2, -1, 0, 1, 2, 100, high - 1, high])
+
+    def test_integer_size_is_checked(self) -> None:
+        with self.assertRaises(ValueError):
+            U32.from_bytes(b"\x00\x01")
+
+        with self.assertRaises(OverflowError):
+            U8(256).into_bytes()
+
+    def test_strings(self) -> None:
+        self.assert_order_preserved(Str, ["", "a", "aa", "ab", "b", "z", "é", "ж", "中", "\U0001f600"])
+
+    def test_bytes(self) -> None:
+        self.assert_order_preserved(Bytes, [b"", b"\x00", b"\x00\x00", b"\x00\x01", b"\x01", b"\xff"])
+
+    def test_timestamp_id_key(self) -> None:
+        self.assert_order_preserved(TimestampIdKey, [(0, 0), (0, 5), (1, 0), (1, 1), (1 << 40, 0)])
+
+        key = TimestampIdKey(10, 3)
+        self.assertEqual((key.timestamp, key.entry_id), (10, 3))
+        self.assertTrue(key.into_bytes().startswith(TimestampIdKey.prefix(10)))
+
+    def test_tuple_with_variable_length_components(self) -> None:
+        key_type = TupleKey[Bytes, U64]
+        values = [(b"", 5), (b"a", 0), (b"a", 7), (b"ab", 0), (b"b", 0), (b"b", 1 << 63)]
+        self.assert_order_preserved(key_type, values)
+
+        # Without escaping and terminators, b"b" would be placed after b"ab".
+        self.assertLess(key_type(b"ab", 0).into_bytes(), key_type(b"b", 0).into_bytes())
+
+    def test_tuple_with_zero_bytes(self) -> None:
+        key_type = TupleKey[Bytes, Str]
+        values = [
+            (b"", ""),
+            (b"", "a"),
+            (b"\x00", ""),
+            (b"\x00", "a"),
+            (b"\x00\x00", ""),
+            (b"\x00\x01", ""),
+            (b"\x00\xff", "z"),
+            (b"\x01", ""),
+        ]
+        self.assert_order_preserved(key_type, values)
+
+        for value in values:
+            self.assertEqual(key_type.from_bytes(key_type(*value).into_bytes()).value, value)
+
+    def test_tuple_incorrect_encoding(self) -> None:
+        key_type = TupleKey[Bytes, Bytes]
+
+        with self.assertRaises(ValueError):
+            key_type.from_bytes(b"a\x00\x01b")
+
+        with self.assertRaises(ValueError):
+            key_type.from_bytes(b"a\x00\x05\x00\x01")
+
+        with self.assertRaises(ValueError):
+            key_type(b"a")
+
+    def test_tuple_components_are_normalized(self) -> None:
+        key_type = TupleKey[U64, Str]
+
+        self.assertEqual(key_type(U64(1), "a"), key_type(1, "a"))
+        self.assertEqual(key_type(U64(1), Str("a")), key_type(1, "a"))
+        self.assertEqual(hash(key_type(U64(1), "a")), hash(key_type(1, "a")))
+        self.assertEqual(key_type(U64(1), "a").value, (1, "a"))
+        self.assertEqual(key_type.from_bytes(key_type(1, "a").into_bytes()), key_type(U64(1), "a"))
+
+    def test_tuple_types_are_cached(self) -> None:
+        self.assertIs(TupleKey[U64, Str], TupleKey[U64, Str])
+        self.assertIsNot(TupleKey[U64, Str], TupleKey[Str, U64])
+
+    def test_tuple_prefix(self) -> None:
+        key_type = TupleKey[Bytes, U64, Str]
+        key = key_type(b"account", 42, "x")
+
+        self.assertTrue(key.into_bytes().startswith(key_type.prefix(b"account")))
+        self.assertTrue(key.into_bytes().startswith(key_type.prefix(b"account", 42)))
+        self.assertEqual(key_type.prefix(b"account", 42, "x"), key.into_bytes())
+        self.assertEqual(key_type.prefix(), b"")
+        # Prefix of a component doesn't match longer components.
+        self.assertFalse(key_type(b"accounts", 1, "").into_bytes().startswith(key_type.prefix(b"account")))
+
+        with self.assertRaises(ValueError):
+            key_type.prefix(b"a", 1, "b", "c")
+
+    def test_prefix_helper(self) -> None:
+        self.assertEqual(prefix(TupleKey[Bytes, U64], b"a"), TupleKey[Bytes, U64].prefix(b"a"))
+        self.assertEqual(prefix(TimestampIdKey, 7), TimestampIdKey.prefix(7))
+        self.assertEqual(prefix(Bytes, b"ab"), b"ab")
+        self.assertEqual(prefix(Str, "ab"), b"ab")
+        self.assertEqual(prefix(U16, 1), b"\x00\x01")
+
+
+if __name__ == "__main__":
+    unittest.main()
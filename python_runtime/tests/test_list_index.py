@@ -0,0 +1,88 @@
+"""Tests of the ListIndex range reads and iterators."""
+from typing import Any, Iterable, List
+import contextlib
+import unittest
+
+from exonum_runtime.merkledb.codecs import U64
+from exonum_runtime.merkledb.indices import ListIndex
+from exonum_runtime.merkledb.types import Fork
+
+from .fake_merkledb import fake_merkledb
+
+
+class TestListIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+
+        self.merkledb = stack.enter_context(fake_merkledb())
+        self.merkledb.lists[b"service.list"] = [U64(value).into_bytes() for value in range(10)]
+
+        fork = stack.enter_context(Fork(None))
+        self.index = ListIndex[U64](fork, "service", "list")()
+
+    @staticmethod
+    def values(iterable: Iterable[Any]) -> List[int]:
+        """Unwraps the U64 elements."""
+        return [item.value for item in iterable]
+
+    def test_forward_iteration(self) -> None:
+        self.assertEqual(self.values(self.index), list(range(10)))
+
+    def test_reverse_iteration(self) -> None:
+        self.assertEqual(self.values(reversed(self.index)), list(reversed(range(10))))
+
+    def test_chunk_boundaries(self) -> None:
+        for chunk_size in (1, 3, 5, 10, 11):
+            forward = self.index.iter_range(2, 9, chunk_size=chunk_size)
+            self.assertEqual(self.values(forward), list(range(2, 9)), chunk_size)
+
+            backward = self.index.iter_range(2, 9, reverse=True, chunk_size=chunk_size)
+            self.assertEqual(self.values(backward), list(range(8, 1, -1)), chunk_size)
+
+    def test_chunks_are_fetched_at_once(self) -> None:
+        self.merkledb.calls.clear()
+        self.values(self.index.iter_range(0, 10, chunk_size=4))
+
+        self.assertEqual(self.merkledb.calls, ["get_range"] * 3)
+
+    def test_end_is_truncated(self) -> None:
+        self.assertEqual(self.values(self.index.iter_range(0, 1000)), list(range(10)))
+        self.assertEqual(self.values(self.index.iter_range(5, 1000, reverse=True)), list(range(9, 4, -1)))
+        self.assertEqual(self.values(self.index.get_range(8, 1000)), [8, 9])
+
+    def test_empty_ranges(self) -> None:
+        self.assertEqual(self.values(self.index.iter_range(20, 30)), [])
+        self.assertEqual(self.values(self.index.iter_range(5, 5)), [])
+        self.assertEqual(self.values(self.index.iter_range(7, 3, reverse=True)), [])
+
+    def test_negative_bounds_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            self.index.iter_range(-1, 5)
+
+        with self.assertRaises(ValueError):
+            self.index.iter_range(0, -5)
+
+        with self.assertRaises(ValueError):
+            self.index.iter_range(0, 5, chunk_size=0)
+
+    def test_slices(self) -> None:
+        self.assertEqual(self.values(self.index[2:5]), [2, 3, 4])
+        self.assertEqual(self.values(self.index[::3]), [0, 3, 6, 9])
+        self.assertEqual(self.values(self.index[::-4]), [9, 5, 1])
+        self.assertEqual(self.values(self.index[-3:]), [7, 8, 9])
+        self.assertEqual(self.values(self.index[5:2]), [])
+
+        # A slice is served by a single range read.
+        self.merkledb.calls.clear()
+        self.index[1:8:2]
+        self.assertEqual(self.merkledb.calls, ["get_range"])
+
+    def test_element_access(self) -> None:
+        self.assertEqual(self.index[3].value, 3)
+        self.assertIsNone(self.index[30])
+        self.assertEqual(len(self.index), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
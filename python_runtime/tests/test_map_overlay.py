@@ -0,0 +1,184 @@
+"""Tests of the write-back overlay of the map indices."""
+from typing import Any, List, Optional
+import contextlib
+import unittest
+
+from exonum_runtime.merkledb.codecs import Str, U64
+from exonum_runtime.merkledb.hot_cache import HotCache
+from exonum_runtime.merkledb.indices import MapIndex, ProofMapIndex
+from exonum_runtime.merkledb.schema import Schema
+from exonum_runtime.merkledb.types import Fork
+
+from .fake_merkledb import fake_merkledb
+
+
+class OverlaySchema(Schema):
+    _hot_cache_ = ["hot"]
+
+    map: MapIndex[Str, U64]
+    hot: MapIndex[Str, U64]
+    proof_map: ProofMapIndex[Str, U64]
+
+
+def _values(values: List[Optional[U64]]) -> List[Optional[int]]:
+    return [None if value is None else value.value for value in values]
+
+
+class TestMapOverlay(unittest.TestCase):
+    def setUp(self) -> None:
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+
+        self.merkledb = stack.enter_context(fake_merkledb())
+        for name in (b"service.map", b"service.hot", b"service.proof_map"):
+            self.merkledb.maps[name] = {b"alice": U64(100).into_bytes(), b"bob": U64(200).into_bytes()}
+
+        self.hot_cache = HotCache(16)
+
+    def fork(self, tracked: bool = True) -> Any:
+        fork = Fork(None)
+        fork.__enter__()
+        fork.enable_write_back()
+        fork.set_hot_cache(self.hot_cache, tracked)
+        return fork
+
+    def data(self, name: str) -> dict:
+        entries = self.merkledb.maps[f"service.{name}".encode()]
+        return {key: U64.from_bytes(value).value for key, value in entries.items()}
+
+    def test_reads_see_own_writes(self) -> None:
+        fork = self.fork()
+        for name in ("map", "hot", "proof_map"):
+            index = getattr(OverlaySchema("service", fork), name)()
+            index[Str("alice")] = U64(150)
+            index[Str("carol")] = U64(300)
+            del index[Str("bob")]
+
+            self.assertEqual(index[Str("alice")], U64(150), name)
+            self.assertIsNone(index.get(Str("bob")), name)
+            self.assertEqual(
+                _values(index.get_many([Str("alice"), Str("bob"), Str("carol"), Str("dave")])), [150, None, 300, None]
+            )
+
+            index.put_many({Str("bob"): U64(250)})
+            index.remove_many([Str("carol")])
+            self.assertEqual(_values(index.get_many([Str("bob"), Str("carol")])), [250, None], name)
+
+        # Nothing is written until flush.
+        self.assertFalse({"put", "put_many", "remove", "remove_many"} & set(self.merkledb.calls))
+        fork.__exit__(None, None, None)
+
+    def test_written_values_are_copied(self) -> None:
+        fork = self.fork()
+        for name in ("map", "hot", "proof_map"):
+            index = getattr(OverlaySchema("service", fork), name)()
+            value = U64(150)
+            index[Str("alice")] = value
+
+            # Neither the written value nor the values read back share the state with the pending write.
+            value.value = 0
+            self.assertEqual(index[Str("alice")], U64(150), name)
+            index[Str("alice")].value = 1
+            index.get_many([Str("alice")])[0].value = 2
+            self.assertEqual(_values(index.get_many([Str("alice")])), [150], name)
+
+        fork.flush()
+        for name in ("map", "hot", "proof_map"):
+            self.assertEqual(self.data(name)[b"alice"], 150, name)
+        fork.__exit__(None, None, None)
+
+    def test_failed_transaction_is_discarded(self) -> None:
+        fork = self.fork()
+        schema = OverlaySchema("service", fork)
+        schema.map()[Str("alice")] = U64(0)
+        schema.hot()[Str("alice")] = U64(0)
+
+        # Transaction fails: changes are not flushed and the access scope exits.
+        self.hot_cache.rollback_transaction()
+        fork.__exit__(None, None, None)
+
+        self.assertEqual(self.data("map"), {b"alice": 100, b"bob": 200})
+        self.assertEqual(self.data("hot"), {b"alice": 100, b"bob": 200})
+
+        fork = self.fork()
+        schema = OverlaySchema("service", fork)
+        self.assertEqual(schema.map()[Str("alice")], U64(100))
+        self.assertEqual(_values(schema.hot().get_many([Str("alice")])), [100])
+        fork.__exit__(None, None, None)
+
+    def test_flush(self) -> None:
+        fork = self.fork()
+        index = OverlaySchema("service", fork).map()
+
+        index[Str("alice")] = U64(1)
+        index[Str("alice")] = U64(2)
+        del index[Str("bob")]
+        index[Str("bob")] = U64(3)
+        index[Str("carol")] = U64(4)
+        del index[Str("carol")]
+
+        self.merkledb.calls.clear()
+        fork.flush()
+
+        # Repeated writes of a key collapse into the last one, and all the changes are sent in bulk.
+        self.assertEqual(self.merkledb.calls, ["put_many", "remove_many"])
+        self.assertEqual(self.data("map"), {b"alice": 2, b"bob": 3})
+
+        # Overlay is empty after flush.
+        self.merkledb.calls.clear()
+        fork.flush()
+        self.assertEqual(self.merkledb.calls, [])
+
+        # Flushed changes are not dropped on scope exit.
+        fork.__exit__(None, None, None)
+        self.assertEqual(self.data("map"), {b"alice": 2, b"bob": 3})
+
+    def test_flush_before_iteration(self) -> None:
+        fork = self.fork()
+        index = OverlaySchema("service", fork).map()
+        index[Str("carol")] = U64(300)
+        del index[Str("alice")]
+
+        self.assertEqual([(key.value, value.value) for key, value in index.items()], [("bob", 200), ("carol", 300)])
+        self.assertEqual([key.value for key in index.keys()], ["bob", "carol"])
+        self.assertEqual([value.value for value in index.values()], [200, 300])
+        fork.__exit__(None, None, None)
+
+    def test_flush_before_proof(self) -> None:
+        fork = self.fork()
+        index = OverlaySchema("service", fork).proof_map()
+        index[Str("alice")] = U64(150)
+
+        self.merkledb.calls.clear()
+        proof = index.get_proof(Str("alice"))
+        self.assertEqual(self.merkledb.calls, ["put_many", "get_multiproof"])
+        self.assertEqual(proof.entries, [(b"alice", U64(150).into_bytes())])
+
+        index[Str("bob")] = U64(250)
+        self.merkledb.calls.clear()
+        index.object_hash()
+        self.assertEqual(self.merkledb.calls, ["put_many", "object_hash"])
+        fork.__exit__(None, None, None)
+
+    def test_hot_cache_get_many_sees_overlay(self) -> None:
+        # Values are cached by the block execution.
+        fork = self.fork()
+        self.assertEqual(_values(OverlaySchema("service", fork).hot().get_many([Str("alice")])), [100])
+        fork.__exit__(None, None, None)
+
+        for tracked in (True, False):
+            fork = self.fork(tracked)
+            index = OverlaySchema("service", fork).hot()
+            index[Str("alice")] = U64(150)
+
+            self.merkledb.calls.clear()
+            self.assertEqual(_values(index.get_many([Str("alice"), Str("bob")])), [150, 200], tracked)
+            # Only the key without pending changes is read.
+            self.assertNotIn("put_many", self.merkledb.calls)
+
+            self.hot_cache.rollback_transaction()
+            fork.__exit__(None, None, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,310 @@
+"""Known-answer tests of the pure-Python proof verifier.
+
+Expected hashes are calculated by a straightforward reference implementation of the MerkleDB
+trees (the whole tree is built from all the entries), independent of the contour fold used by
+the verifier. Hashes of the empty indices are pinned to the values produced by exonum-merkledb."""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import struct
+import unittest
+
+from exonum_runtime.crypto import Hash
+from exonum_runtime.merkledb.proofs import ListProof, MapProof, ProofError, ProofVerifier
+
+_ZERO = bytes(32)
+
+# Object hashes of the empty ProofMapIndex and ProofListIndex, as calculated by exonum-merkledb.
+EMPTY_MAP_HASH = "7324b5c72b51bb5d4c180f1109cfd347b60473882145841c39f3e584576296f9"
+EMPTY_LIST_HASH = "c6c0aa07f27493d2f2e5cff56c890a353a20086d6c25ec825128e12ae752b2d9"
+
+
+def _sha256(*parts: bytes) -> bytes:
+    return hashlib.sha256(b"".join(parts)).digest()
+
+
+def _u64(value: int) -> bytes:
+    return struct.pack("<Q", value)
+
+
+def _item(data: bytes) -> bytes:
+    return _u64(len(data)) + data
+
+
+def _key_bits(key: bytes) -> str:
+    return "".join(format(byte, "08b")[::-1] for byte in _sha256(key))
+
+
+def _path_bytes(path: str) -> bytes:
+    padded = path.ljust(256, "0")
+    key = bytes(int(padded[i : i + 8][::-1], 2) for i in range(0, 256, 8))
+    return b"\x01" + key + b"\x00" if len(path) == 256 else b"\x00" + key + bytes([len(path)])
+
+
+def _common_prefix(paths: Sequence[str]) -> str:
+    length = 0
+    while all(len(path) > length and path[length] == paths[0][length] for path in paths):
+        length += 1
+    return paths[0][:length]
+
+
+class ReferenceMap:
+    """Whole ProofMapIndex tree restored from its entries."""
+
+    def __init__(self, entries: Dict[bytes, bytes]) -> None:
+        self.leaves = sorted((_key_bits(key), key, _sha256(b"\x00", value)) for key, value in entries.items())
+
+    def _node(self, leaves: List[Tuple[str, bytes, bytes]]) -> Tuple[str, bytes, Any]:
+        """Returns (path, hash, children) of the subtree."""
+        if len(leaves) == 1:
+            return leaves[0][0], leaves[0][2], None
+
+        prefix = _common_prefix([path for path, _, _ in leaves])
+        left = self._node([leaf for leaf in leaves if leaf[0][len(prefix)] == "0"])
+        right = self._node([leaf for leaf in leaves if leaf[0][len(prefix)] == "1"])
+        branch_hash = _sha256(b"\x04", left[1], right[1], _path_bytes(left[0]), _path_bytes(right[0]))
+        return prefix, branch_hash, (left, right)
+
+    def object_hash(self) -> bytes:
+        if not self.leaves:
+            root = _ZERO
+        elif len(self.leaves) == 1:
+            path, _, leaf_hash = self.leaves[0]
+            root = _sha256(b"\x04", _path_bytes(path), leaf_hash)
+        else:
+            root = self._node(self.leaves)[1]
+        return _sha256(b"\x03", root)
+
+    def proof(self, keys: Sequence[bytes], data: Dict[bytes, bytes]) -> bytes:
+        """Binary proof for the keys: subtrees which don't lead to any requested key are hashed."""
+        key_paths = [_key_bits(key) for key in keys]
+        nodes: List[Tuple[str, bytes]] = []
+
+        def collect(node: Tuple[str, bytes, Any], is_root: bool = False) -> None:
+            path, node_hash, children = node
+            # The root branch is never a part of the proof, the proof contains its children instead.
+            if not (is_root and children) and not any(key_path.startswith(path) for key_path in key_paths):
+                nodes.append((path, node_hash))
+            elif children is not None:
+                collect(children[0])
+                collect(children[1])
+
+        if self.leaves:
+            collect(self._node(self.leaves), is_root=True)
+
+        raw = _u64(len(keys))
+        for key in keys:
+            raw += b"\x01" + _item(key) + _item(data[key]) if key in data else b"\x00" + _item(key)
+        raw += _u64(len(nodes))
+        for path, node_hash in nodes:
+            raw += _path_bytes(path) + node_hash
+        return raw
+
+
+class ReferenceList:
+    """Whole ProofListIndex tree restored from its elements."""
+
+    def __init__(self, values: List[bytes]) -> None:
+        self.values = values
+        self.levels = [[_sha256(b"\x00", value) for value in values]]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            self.levels.append([_sha256(b"\x01", *level[i : i + 2]) for i in range(0, len(level), 2)])
+
+    @property
+    def height(self) -> int:
+        return len(self.levels) - 1
+
+    def object_hash(self) -> bytes:
+        root = self.levels[-1][0] if self.values else _ZERO
+        return _sha256(b"\x02", _u64(len(self.values)), root)
+
+    def proof(self, start: int, end: int) -> bytes:
+        """Binary proof of the `[start, end)` range."""
+
+        def node(depth: int, index: int) -> bytes:
+            if depth == self.height:
+                return b"\x04" + _item(self.values[index])
+
+            level = self.levels[self.height - depth - 1]
+            shift = self.height - depth - 1
+            left, right = index * 2, index * 2 + 1
+            left_in_range = left << shift < end and (left + 1) << shift > start
+            right_in_range = right < len(level) and right << shift < end and (right + 1) << shift > start
+
+            if right >= len(level):
+                return b"\x02" + node(depth + 1, left)
+            if left_in_range and right_in_range:
+                return b"\x00" + node(depth + 1, left) + node(depth + 1, right)
+            if left_in_range:
+                return b"\x01" + node(depth + 1, left) + level[right]
+            return b"\x03" + level[left] + node(depth + 1, right)
+
+        if start >= end:
+            return _u64(len(self.values)) + b"\x05" + (self.levels[-1][0] if self.values else _ZERO)
+        return _u64(len(self.values)) + node(0, 0)
+
+
+MAP_DATA = {b"alice": b"100", b"bob": b"200", b"carol": b"300", b"dave": b"400", b"eve": b"500"}
+
+
+class TestMapProofs(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tree = ReferenceMap(MAP_DATA)
+        self.expected = Hash(self.tree.object_hash())
+
+    def verify(self, keys: Sequence[bytes], data: Optional[Dict[bytes, bytes]] = None) -> Any:
+        proof = MapProof.from_bytes(self.tree.proof(keys, MAP_DATA if data is None else data))
+        return ProofVerifier().verify_map_proof(proof, self.expected)
+
+    def test_known_hashes(self) -> None:
+        # Hashes of the trees with up to one entry are calculated without the contour fold.
+        self.assertEqual(ReferenceMap(dict()).object_hash(), _sha256(b"\x03", _ZERO))
+        path = _path_bytes(_key_bits(b"key"))
+        self.assertEqual(
+            ReferenceMap({b"key": b"value"}).object_hash(),
+            _sha256(b"\x03", _sha256(b"\x04", path, _sha256(b"\x00", b"value"))),
+        )
+        self.assertEqual(path[0], 1)
+        self.assertEqual(path[1:33], _sha256(b"key"))
+
+    def test_merkledb_empty_map(self) -> None:
+        # Proof of absence of a key in the empty map: one missing entry and no subtree hashes.
+        raw = _u64(1) + b"\x00" + _item(b"key") + _u64(0)
+        checked = ProofVerifier().verify_map_proof(MapProof.from_bytes(raw))
+
+        self.assertEqual(checked.index_hash.value.hex(), EMPTY_MAP_HASH)
+        self.assertEqual(checked.missing_keys, [b"key"])
+        self.assertEqual(ReferenceMap(dict()).object_hash().hex(), EMPTY_MAP_HASH)
+
+    def test_existing_key(self) -> None:
+        for key in MAP_DATA:
+            checked = self.verify([key])
+            self.assertEqual(checked.index_hash, self.expected)
+            self.assertEqual(checked.entries, {key: MAP_DATA[key]})
+            self.assertEqual(checked.missing_keys, [])
+
+    def test_missing_key(self) -> None:
+        checked = self.verify([b"mallory"])
+        self.assertEqual(checked.entries, dict())
+        self.assertEqual(checked.missing_keys, [b"mallory"])
+
+    def test_multiproof(self) -> None:
+        checked = self.verify([b"alice", b"carol", b"mallory", b"eve"])
+        self.assertEqual(checked.entries, {b"alice": b"100", b"carol": b"300", b"eve": b"500"})
+        self.assertEqual(checked.missing_keys, [b"mallory"])
+
+        # All the entries are in the proof, so there are no subtree hashes.
+        self.assertEqual(MapProof.from_bytes(self.tree.proof(list(MAP_DATA), MAP_DATA)).proof, [])
+        self.assertEqual(self.verify(list(MAP_DATA)).entries, MAP_DATA)
+
+    def test_small_maps(self) -> None:
+        for data in (dict(), {b"alice": b"100"}, {b"alice": b"100", b"bob": b"200"}):
+            tree = ReferenceMap(data)
+            for keys in ([b"alice"], [b"mallory"]):
+                proof = MapProof.from_bytes(tree.proof(keys, data))
+                checked = ProofVerifier().verify_map_proof(proof, Hash(tree.object_hash()))
+                self.assertEqual(checked.entries, {key: data[key] for key in keys if key in data})
+
+    def test_batch(self) -> None:
+        proofs = [MapProof.from_bytes(self.tree.proof([key], MAP_DATA)) for key in (b"alice", b"bob", b"mallory")]
+        verifier = ProofVerifier()
+        checked = verifier.verify_batch(proofs, self.expected)
+
+        self.assertEqual([proof.entries for proof in checked], [{b"alice": b"100"}, {b"bob": b"200"}, dict()])
+        # Node hashes are cached only within the batch.
+        self.assertIsNone(verifier._node_hashes)  # pylint: disable=protected-access
+
+    def test_tampered_value(self) -> None:
+        with self.assertRaises(ProofError):
+            self.verify([b"alice"], {**MAP_DATA, b"alice": b"1000"})
+
+        # Claiming that an existing key is absent.
+        with self.assertRaises(ProofError):
+            self.verify([b"alice"], {key: value for key, value in MAP_DATA.items() if key != b"alice"})
+
+    def test_tampered_hash(self) -> None:
+        raw = bytearray(self.tree.proof([b"alice"], MAP_DATA))
+        raw[-1] ^= 1
+        with self.assertRaises(ProofError):
+            ProofVerifier().verify_map_proof(MapProof.from_bytes(bytes(raw)), self.expected)
+
+    def test_node_covering_requested_key(self) -> None:
+        # Proof of `bob` presented as a proof of absence of `alice`: the subtree with `alice` is hashed.
+        proof = MapProof.from_bytes(self.tree.proof([b"bob"], MAP_DATA))
+        forged = MapProof(proof.raw, [(b"alice", None)], proof.proof)
+        with self.assertRaises(ProofError):
+            ProofVerifier().verify_map_proof(forged, self.expected)
+
+    def test_malformed(self) -> None:
+        raw = self.tree.proof([b"alice"], MAP_DATA)
+        for data in (raw[:-1], raw + b"\x00"):
+            with self.assertRaises(ProofError):
+                MapProof.from_bytes(data)
+
+
+class TestListProofs(unittest.TestCase):
+    def test_known_hashes(self) -> None:
+        leaves = [_sha256(b"\x00", value) for value in (b"a", b"b", b"c")]
+        root = _sha256(b"\x01", _sha256(b"\x01", leaves[0], leaves[1]), _sha256(b"\x01", leaves[2]))
+        self.assertEqual(ReferenceList([b"a", b"b", b"c"]).object_hash(), _sha256(b"\x02", _u64(3), root))
+
+    def test_merkledb_empty_list(self) -> None:
+        raw = _u64(0) + b"\x05" + _ZERO
+        checked = ProofVerifier().verify_list_proof(ListProof.from_bytes(raw))
+
+        self.assertEqual(checked.index_hash.value.hex(), EMPTY_LIST_HASH)
+        self.assertEqual(checked.entries, [])
+        self.assertEqual(ReferenceList([]).object_hash().hex(), EMPTY_LIST_HASH)
+
+    def test_range_proofs(self) -> None:
+        for length in (1, 2, 3, 5, 8, 11):
+            values = [str(i).encode() for i in range(length)]
+            tree = ReferenceList(values)
+            expected = Hash(tree.object_hash())
+
+            for start in range(length):
+                for end in range(start + 1, length + 1):
+                    proof = ListProof.from_bytes(tree.proof(start, end))
+                    checked = ProofVerifier().verify_list_proof(proof, expected)
+                    self.assertEqual(checked.length, length)
+                    self.assertEqual(checked.entries, list(enumerate(values))[start:end], (length, start, end))
+
+    def test_empty_range(self) -> None:
+        for values in ([], [b"a", b"b", b"c"]):
+            tree = ReferenceList(values)
+            proof = ListProof.from_bytes(tree.proof(0, 0))
+            checked = ProofVerifier().verify_list_proof(proof, Hash(tree.object_hash()))
+            self.assertEqual(checked.entries, [])
+
+    def test_batch_of_maps_and_lists(self) -> None:
+        map_tree, list_tree = ReferenceMap(MAP_DATA), ReferenceList([b"a", b"b", b"c"])
+        proofs = [MapProof.from_bytes(map_tree.proof([b"bob"], MAP_DATA)), ListProof.from_bytes(list_tree.proof(1, 3))]
+        checked = ProofVerifier().verify_batch(proofs)
+
+        self.assertEqual(checked[0].index_hash, Hash(map_tree.object_hash()))
+        self.assertEqual(checked[1].index_hash, Hash(list_tree.object_hash()))
+        self.assertEqual(checked[1].entries, [(1, b"b"), (2, b"c")])
+
+    def test_tampered(self) -> None:
+        tree = ReferenceList([b"a", b"b", b"c", b"d", b"e"])
+        expected = Hash(tree.object_hash())
+        raw = tree.proof(1, 3)
+
+        # Changed element.
+        with self.assertRaises(ProofError):
+            ProofVerifier().verify_list_proof(ListProof.from_bytes(raw.replace(_item(b"b"), _item(b"x"))), expected)
+
+        # Wrong length changes the depth of the leaves.
+        with self.assertRaises(ProofError):
+            ProofVerifier().verify_list_proof(ListProof.from_bytes(_u64(9) + raw[8:]), expected)
+
+        # Proof of the first element of the list claimed to have a single element.
+        single = ReferenceList([b"a"])
+        with self.assertRaises(ProofError):
+            ProofVerifier().verify_list_proof(ListProof.from_bytes(_u64(1) + tree.proof(0, 1)[8:]), expected)
+        with self.assertRaises(ProofError):
+            ProofVerifier().verify_list_proof(ListProof.from_bytes(tree.proof(0, 1)), Hash(single.object_hash()))
+
+
+if __name__ == "__main__":
+    unittest.main()
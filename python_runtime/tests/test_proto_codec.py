@@ -0,0 +1,151 @@
+"""Tests of the protobuf messages codec."""
+from typing import Any, List
+import copy
+import threading
+import unittest
+
+from google.protobuf.struct_pb2 import Struct
+from google.protobuf.wrappers_pb2 import StringValue, UInt64Value
+
+from exonum_runtime.merkledb.codecs import ProtoCodec
+from exonum_runtime.merkledb.indices import MapIndex
+from exonum_runtime.merkledb.types import Fork
+
+from .fake_merkledb import fake_merkledb
+
+Name = ProtoCodec[StringValue]
+Balance = ProtoCodec[UInt64Value]
+Document = ProtoCodec[Struct]
+
+
+class TestProtoCodec(unittest.TestCase):
+    def test_concrete_types_are_shared(self) -> None:
+        self.assertIs(ProtoCodec[UInt64Value], Balance)
+        self.assertIsNot(Name, Balance)
+
+        with self.assertRaises(ValueError):
+            ProtoCodec[int]
+        with self.assertRaises(RuntimeError):
+            ProtoCodec(value=1)
+
+    def test_lazy_parsing(self) -> None:
+        data = Balance(value=100).into_bytes()
+        balance = Balance.from_bytes(data)
+
+        # Value which is only passed further is not parsed.
+        self.assertIsNone(balance._message)  # pylint: disable=protected-access
+        self.assertIs(balance.into_bytes(), balance._data)  # pylint: disable=protected-access
+        self.assertEqual(balance.into_bytes(), data)
+
+        self.assertEqual(balance.value, 100)
+        self.assertIsNotNone(balance._message)  # pylint: disable=protected-access
+
+        # Parsed message can be changed, so it's serialized again.
+        balance.value -= 10
+        self.assertEqual(balance.into_bytes(), Balance(value=90).into_bytes())
+        self.assertEqual(balance.message, UInt64Value(value=90))
+
+    def test_release(self) -> None:
+        balance = Balance.from_bytes(Balance(value=100).into_bytes())
+        message = balance.message
+        balance.release()
+
+        self.assertIn(message, Balance._free)  # pylint: disable=protected-access
+        self.assertNotIn(message, Name._free)  # pylint: disable=protected-access
+
+        # Released message is cleared and reused by the next parsed value of the same type.
+        other = Balance.from_bytes(Balance(value=5).into_bytes())
+        self.assertIs(other.message, message)
+        self.assertEqual(other.value, 5)
+        self.assertNotIn(message, Balance._free)  # pylint: disable=protected-access
+
+        # Values which were never parsed don't return anything to the pool.
+        free = len(Balance._free)  # pylint: disable=protected-access
+        Balance.from_bytes(b"").release()
+        self.assertEqual(len(Balance._free), free)  # pylint: disable=protected-access
+
+    def test_released_value_is_decoded_again(self) -> None:
+        balance = Balance.from_bytes(Balance(value=100).into_bytes())
+        balance.value -= 10
+        balance.release()
+        balance.release()
+
+        # Released value is restored from the data it was read from.
+        self.assertEqual(balance.value, 100)
+        self.assertEqual(balance.into_bytes(), Balance(value=100).into_bytes())
+
+        # Values created from a message can't be restored, so they are not released.
+        created = Balance(value=7)
+        message = created.message
+        created.release()
+        self.assertIs(created.message, message)
+        self.assertNotIn(message, Balance._free)  # pylint: disable=protected-access
+
+    def test_concurrent_decoding(self) -> None:
+        balance = Balance.from_bytes(Balance(value=42).into_bytes())
+        barrier = threading.Barrier(8)
+        messages: List[Any] = []
+
+        def decode() -> None:
+            barrier.wait()
+            messages.append(balance.message)
+
+        threads = [threading.Thread(target=decode) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(messages), 8)
+        self.assertTrue(all(message is balance.message for message in messages))
+        self.assertEqual(balance.value, 42)
+
+    def test_deterministic_serialization(self) -> None:
+        # Entries of the map fields are serialized in the order of keys, not of insertion.
+        first, second = Document(), Document()
+        for idx in range(32):
+            first.fields[f"key{idx}"].number_value = idx
+            second.fields[f"key{31 - idx}"].number_value = 31 - idx
+
+        self.assertEqual(first.into_bytes(), second.into_bytes())
+        self.assertEqual(first, second)
+
+    def test_private_attributes_are_not_proxied(self) -> None:
+        balance = Balance.from_bytes(Balance(value=7).into_bytes())
+
+        with self.assertRaises(AttributeError):
+            getattr(balance, "_unknown")
+
+        for copied in (copy.copy(balance), copy.deepcopy(balance)):
+            self.assertEqual(copied, balance)
+            self.assertEqual(copied.value, 7)
+
+        copied = copy.deepcopy(balance)
+        copied.value = 8
+        self.assertEqual(balance.value, 7)
+
+    def test_hash(self) -> None:
+        first, second = Name(value="alice"), Name.from_bytes(Name(value="alice").into_bytes())
+
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len({first, second, Name(value="bob")}), 2)
+        self.assertNotEqual(Name(value=""), Balance(value=0))
+
+    def test_keys_of_map(self) -> None:
+        with fake_merkledb() as merkledb, Fork(None) as fork:
+            wallets = MapIndex[Name, Balance](fork, "service", "wallets")()
+            wallets.put_many({Name(value="alice"): Balance(value=100), Name(value="bob"): Balance(value=200)})
+
+            self.assertEqual(len(merkledb.maps[b"service.wallets"]), 2)
+            self.assertEqual(wallets[Name(value="alice")].value, 100)
+
+            values = wallets.get_many([Name(value="bob"), Name(value="carol")])
+            self.assertEqual(values, [Balance(value=200), None])
+
+            entries = {key: value.value for key, value in wallets.items()}
+            self.assertEqual(entries, {Name(value="alice"): 100, Name(value="bob"): 200})
+
+
+if __name__ == "__main__":
+    unittest.main()
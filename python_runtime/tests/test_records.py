@@ -0,0 +1,85 @@
+"""Tests of the fixed-layout records."""
+from dataclasses import dataclass
+import struct
+import unittest
+
+from exonum_runtime.crypto import Hash, PublicKey
+from exonum_runtime.merkledb.codecs import fixed_record, bytes32, i16, u8, u64
+from exonum_runtime.merkledb.into_bytes import IntoBytes
+
+
+@fixed_record
+@dataclass
+class Account:
+    owner: PublicKey
+    balance: u64
+    history_hash: Hash
+    frozen: bool = False
+
+
+@fixed_record
+@dataclass
+class Counter:
+    value: i16
+
+
+OWNER = PublicKey(bytes(range(32)))
+HISTORY_HASH = Hash.hash_data(b"history")
+
+
+class TestRecords(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        account = Account(OWNER, u64(100), HISTORY_HASH, True)
+        data = account.into_bytes()
+
+        self.assertEqual(data, OWNER.value + (100).to_bytes(8, "little") + HISTORY_HASH.value + b"\x01")
+
+        decoded = Account.from_bytes(data)
+        self.assertEqual(decoded, account)
+        self.assertIsInstance(decoded.owner, PublicKey)
+        self.assertIsInstance(decoded.history_hash, Hash)
+        self.assertEqual(decoded.history_hash, HISTORY_HASH)
+
+    def test_single_field(self) -> None:
+        self.assertEqual(Counter(i16(-2)).into_bytes(), b"\xfe\xff")
+        self.assertEqual(Counter.from_bytes(b"\xfe\xff"), Counter(i16(-2)))
+
+    def test_class(self) -> None:
+        self.assertTrue(issubclass(Account, IntoBytes))
+        self.assertEqual(Account.__slots__, ("owner", "balance", "history_hash", "frozen"))
+        self.assertEqual(Account(OWNER, u64(1), HISTORY_HASH).frozen, False)
+        self.assertEqual(
+            Account._record_fields_,  # pylint: disable=protected-access, no-member
+            (("owner", "32s"), ("balance", "Q"), ("history_hash", "32s"), ("frozen", "?")),
+        )
+
+    def test_invalid_values(self) -> None:
+        @fixed_record
+        @dataclass
+        class Digest:
+            value: bytes32
+            tag: u8
+
+        self.assertEqual(Digest.from_bytes(bytes(32) + b"\x07"), Digest(bytes32(bytes(32)), u8(7)))
+
+        with self.assertRaises(ValueError):
+            Digest(bytes32(b"short"), u8(0)).into_bytes()
+        with self.assertRaises(struct.error):
+            Digest(bytes32(bytes(32)), u8(256)).into_bytes()
+        with self.assertRaises(struct.error):
+            Account.from_bytes(b"truncated")
+
+    def test_invalid_declarations(self) -> None:
+        with self.assertRaises(TypeError):
+
+            @fixed_record
+            @dataclass
+            class Name:  # pylint: disable=unused-variable
+                value: str
+
+        with self.assertRaises(TypeError):
+            fixed_record(int)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests of the decoded values cache of the API snapshot."""
+import unittest
+
+from exonum_runtime.merkledb.cache import CacheStats, ValueCache
+from exonum_runtime.merkledb.codecs import Str, U64
+from exonum_runtime.merkledb.indices import MapIndex
+from exonum_runtime.merkledb.types import Snapshot
+
+from .fake_merkledb import fake_merkledb
+
+INDEX = b"service.map"
+
+
+class TestValueCache(unittest.TestCase):
+    def put(self, cache: ValueCache, key: bytes, value: int, index_id: bytes = INDEX) -> None:
+        cache.put(index_id, key, U64(value), cache.generation())
+
+    def test_lru_eviction(self) -> None:
+        cache = ValueCache(2)
+        self.put(cache, b"a", 1)
+        self.put(cache, b"b", 2)
+
+        # Reading `a` makes `b` the least recently used entry.
+        self.assertEqual(cache.get(INDEX, b"a"), (True, U64(1)))
+        self.put(cache, b"c", 3)
+
+        self.assertEqual(cache.get(INDEX, b"b"), (False, None))
+        self.assertEqual(cache.get(INDEX, b"a"), (True, U64(1)))
+        self.assertEqual(cache.get(INDEX, b"c"), (True, U64(3)))
+
+    def test_absent_keys_are_cached(self) -> None:
+        cache = ValueCache(2)
+        cache.put(INDEX, b"a", None, cache.generation())
+
+        self.assertEqual(cache.get(INDEX, b"a"), (True, None))
+
+    def test_per_index_limits(self) -> None:
+        cache = ValueCache(1, {b"service.large": 3, b"service.disabled": 0})
+        for key in (b"a", b"b", b"c"):
+            for index_id in (INDEX, b"service.large", b"service.disabled"):
+                self.put(cache, key, 1, index_id)
+
+        stats = cache.stats()
+        self.assertEqual(stats[INDEX].size, 1)
+        self.assertEqual(stats[b"service.large"].size, 3)
+        self.assertEqual(stats[b"service.disabled"].size, 0)
+        self.assertEqual(cache.get(b"service.disabled", b"c"), (False, None))
+
+    def test_stats(self) -> None:
+        cache = ValueCache(4)
+        self.put(cache, b"a", 1)
+
+        cache.get(INDEX, b"a")
+        cache.get(INDEX, b"a")
+        cache.get(INDEX, b"b")
+        cache.get(b"service.other", b"a")
+
+        self.assertEqual(cache.stats(), {INDEX: CacheStats(2, 1, 1, 4), b"service.other": CacheStats(0, 1, 0, 4)})
+
+        # Counters survive the invalidation, unlike the values.
+        cache.invalidate()
+        self.assertEqual(cache.stats()[INDEX], CacheStats(2, 1, 0, 4))
+
+    def test_previous_generation_is_not_cached(self) -> None:
+        cache = ValueCache(4)
+
+        # Value is read from the database while the next block is committed.
+        generation = cache.generation()
+        cache.invalidate()
+        cache.put(INDEX, b"a", U64(1), generation)
+
+        self.assertEqual(cache.get(INDEX, b"a"), (False, None))
+
+        cache.put(INDEX, b"a", U64(2), cache.generation())
+        self.assertEqual(cache.get(INDEX, b"a"), (True, U64(2)))
+
+    def test_map_index(self) -> None:
+        cache = ValueCache(4)
+
+        with fake_merkledb() as merkledb, Snapshot(None) as snapshot:
+            merkledb.maps[INDEX] = {b"alice": U64(100).into_bytes()}
+            snapshot.set_value_cache(cache)
+            index = MapIndex[Str, U64](snapshot, "service", "map")()
+
+            self.assertEqual(index.get_many([Str("alice"), Str("bob")]), [U64(100), None])
+
+            merkledb.calls.clear()
+            self.assertEqual(index[Str("alice")], U64(100))
+            self.assertIsNone(index.get(Str("bob")))
+            self.assertEqual(merkledb.calls, [])
+
+            # Next block is committed.
+            merkledb.maps[INDEX][b"alice"] = U64(90).into_bytes()
+            cache.invalidate()
+            self.assertEqual(index[Str("alice")], U64(90))
+            self.assertEqual(merkledb.calls, ["get"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+pub type Allocate = unsafe extern "C" fn(len: u64) -> *mut u8;
+
 #[repr(C)]
 pub struct BinaryData {
     pub data: *const u8,
@@ -6,6 +8,122 @@ pub struct BinaryData {
 
 impl BinaryData {
     pub unsafe fn to_vec(&self) -> Vec<u8> {
-        std::slice::from_raw_parts(self.data, self.data_len as usize).to_vec()
+        self.as_slice().to_vec()
+    }
+
+    /// Returns `None` for the null data pointer and the copy of the data otherwise.
+    pub unsafe fn to_option_vec(&self) -> Option<Vec<u8>> {
+        if self.data.is_null() {
+            None
+        } else {
+            Some(self.to_vec())
+        }
+    }
+
+    pub unsafe fn as_slice(&self) -> &[u8] {
+        if self.data_len == 0 {
+            return &[];
+        }
+
+        std::slice::from_raw_parts(self.data, self.data_len as usize)
+    }
+}
+
+/// Splits a buffer of length-prefixed items (`u64` LE length followed by the item bytes)
+/// into separate items.
+pub fn unpack_items(data: &[u8]) -> Vec<Vec<u8>> {
+    let mut items = Vec::new();
+    let mut pos = 0;
+
+    while pos < data.len() {
+        let mut len_bytes = [0_u8; 8];
+        len_bytes.copy_from_slice(&data[pos..pos + 8]);
+        let len = u64::from_le_bytes(len_bytes) as usize;
+        pos += 8;
+
+        items.push(data[pos..pos + len].to_vec());
+        pos += len;
+    }
+
+    items
+}
+
+/// Copies data into the buffer allocated by the Python side.
+pub unsafe fn write_bytes(data: &[u8], allocate: Allocate) -> BinaryData {
+    let buffer: *mut u8 = allocate(data.len() as u64);
+
+    std::ptr::copy(data.as_ptr(), buffer, data.len());
+
+    BinaryData {
+        data: buffer,
+        data_len: data.len() as u64,
+    }
+}
+
+/// Writes items into one buffer allocated by the Python side
+/// in the same length-prefixed format as `unpack_items` expects.
+pub unsafe fn write_items(items: &[Vec<u8>], allocate: Allocate) -> BinaryData {
+    let total_len: usize = items.iter().map(|item| 8 + item.len()).sum();
+
+    let buffer: *mut u8 = allocate(total_len as u64);
+
+    let mut pos = 0;
+    for item in items {
+        let len_bytes = (item.len() as u64).to_le_bytes();
+        std::ptr::copy(len_bytes.as_ptr(), buffer.add(pos), len_bytes.len());
+        pos += len_bytes.len();
+
+        std::ptr::copy(item.as_ptr(), buffer.add(pos), item.len());
+        pos += item.len();
+    }
+
+    BinaryData {
+        data: buffer,
+        data_len: total_len as u64,
+    }
+}
+
+/// Writes values into one contiguous buffer allocated by the Python side.
+///
+/// `offsets` must point to an array of `values.len() + 1` elements: value `i` occupies
+/// `offsets[i]..offsets[i + 1]` bytes of the buffer.
+/// `found` must point to an array of `values.len()` elements: `found[i]` is set to 0 if
+/// the value is absent and to 1 otherwise.
+pub unsafe fn write_values(
+    values: &[Option<Vec<u8>>],
+    offsets: *mut u64,
+    found: *mut u8,
+    allocate: Allocate,
+) -> BinaryData {
+    let total_len: usize = values
+        .iter()
+        .map(|value| value.as_ref().map_or(0, Vec::len))
+        .sum();
+
+    let buffer: *mut u8 = allocate(total_len as u64);
+
+    let offsets = std::slice::from_raw_parts_mut(offsets, values.len() + 1);
+    let found = std::slice::from_raw_parts_mut(found, values.len());
+
+    let mut pos = 0;
+    for (i, value) in values.iter().enumerate() {
+        offsets[i] = pos as u64;
+
+        match value {
+            Some(data) => {
+                std::ptr::copy(data.as_ptr(), buffer.add(pos), data.len());
+                pos += data.len();
+                found[i] = 1;
+            }
+            None => {
+                found[i] = 0;
+            }
+        }
+    }
+    offsets[values.len()] = pos as u64;
+
+    BinaryData {
+        data: buffer,
+        data_len: total_len as u64,
     }
 }
@@ -1,6 +1,102 @@
 use std::ffi::CStr;
 use std::os::raw::c_char;
 
+use super::binary_data::BinaryData;
+
+/// Evaluates `$body` with `$index` bound to the index opened by the handle of `$raw` index.
+///
+/// Handles of the block snapshot token don't keep the index open (snapshot changes every block),
+/// so the index is opened over the current block snapshot for the call; `$default` is returned
+/// if there is no block snapshot yet.
+macro_rules! with_index {
+    ($raw:expr, $handle:ident, $snapshot_index:ty, |$index:ident| $body:expr, $default:expr) => {{
+        let raw = &*$raw;
+        match raw.handle.as_ref() {
+            Some($handle::Fork($index)) => $body,
+            Some($handle::Snapshot($index)) => $body,
+            Some($handle::SnapshotToken(index_name)) => {
+                match crate::python_interface::BLOCK_SNAPSHOT
+                    .read()
+                    .expect("Block snapshot read")
+                    .as_ref()
+                {
+                    Some(snapshot) => {
+                        let opened: $snapshot_index =
+                            <$snapshot_index>::new(index_name.clone(), snapshot.as_ref());
+                        let $index = &opened;
+                        $body
+                    }
+                    None => $default,
+                }
+            }
+            None => panic!("Attempt to use a freed index handle"),
+        }
+    }};
+}
+
+/// Evaluates `$body` with `$index` bound to the mutable index opened by the handle of `$raw` index.
+/// Panics if index is not opened with a fork.
+macro_rules! with_index_mut {
+    ($raw:expr, $handle:ident, |$index:ident| $body:expr) => {{
+        let raw = &*$raw;
+        match raw.handle.as_mut() {
+            Some($handle::Fork($index)) => $body,
+            Some(_) => panic!("Attempt to call mutable method with a snapshot"),
+            None => panic!("Attempt to use a freed index handle"),
+        }
+    }};
+}
+
 pub unsafe fn parse_string(data: *const c_char) -> String {
     CStr::from_ptr(data).to_string_lossy().into_owned()
 }
+
+/// Bounds of the map scan: keys in the `start..end` range which start with `prefix`.
+/// Every bound is optional.
+pub struct KeyBounds {
+    start: Option<Vec<u8>>,
+    end: Option<Vec<u8>>,
+    prefix: Option<Vec<u8>>,
+}
+
+impl KeyBounds {
+    pub unsafe fn new(start: BinaryData, end: BinaryData, prefix: BinaryData) -> Self {
+        Self {
+            start: start.to_option_vec(),
+            end: end.to_option_vec(),
+            prefix: prefix.to_option_vec(),
+        }
+    }
+
+    /// Smallest key which may satisfy the bounds, if any.
+    pub fn lower(&self) -> Option<&Vec<u8>> {
+        match (&self.start, &self.prefix) {
+            (Some(start), Some(prefix)) => Some(start.max(prefix)),
+            (Some(start), None) => Some(start),
+            (None, Some(prefix)) => Some(prefix),
+            (None, None) => None,
+        }
+    }
+
+    /// Checks the upper bounds only. For keys iterated in order starting from `lower()`,
+    /// the first key failing this check means that no further keys satisfy the bounds.
+    pub fn below_upper(&self, key: &[u8]) -> bool {
+        let before_end = self.end.as_ref().map_or(true, |end| key < end.as_slice());
+        let has_prefix = self
+            .prefix
+            .as_ref()
+            .map_or(true, |prefix| key.starts_with(prefix));
+
+        before_end && has_prefix
+    }
+
+    /// Checks if the key satisfies all the bounds.
+    pub fn contains(&self, key: &[u8]) -> bool {
+        let after_start = self
+            .start
+            .as_ref()
+            .map_or(true, |start| key >= start.as_slice());
+
+        after_start && self.below_upper(key)
+    }
+}
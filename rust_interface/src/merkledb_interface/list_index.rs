@@ -2,50 +2,74 @@ use std::os::raw::c_char;
 
 use exonum_merkledb::{Fork, ListIndex, Snapshot};
 
-use super::binary_data::BinaryData;
+use super::binary_data::{unpack_items, write_bytes, write_items, BinaryData};
 use super::common::parse_string;
-use crate::python_interface::BLOCK_SNAPSHOT;
 use crate::types::RawIndexAccess;
 
 #[repr(C)]
 pub struct RawListIndexMethods {
     pub get: ListIndexGet,
+    pub get_range: ListIndexGetRange,
     pub push: ListIndexPush,
+    pub extend: ListIndexExtend,
     pub pop: ListIndexPop,
     pub len: ListIndexLen,
     pub set: ListIndexSet,
     pub clear: ListIndexClear,
+    pub free: ListIndexFree,
 }
 
 impl Default for RawListIndexMethods {
     fn default() -> Self {
         Self {
             get,
+            get_range,
             push,
+            extend,
             pop,
             len,
             set,
             clear,
+            free,
         }
     }
 }
 
+/// Index opened for the lifetime of the database access.
+pub enum ListIndexHandle<'a> {
+    Fork(ListIndex<&'a Fork, Vec<u8>>),
+    Snapshot(ListIndex<&'a dyn Snapshot, Vec<u8>>),
+    SnapshotToken(String),
+}
+
+type SnapshotListIndex<'a> = ListIndex<&'a dyn Snapshot, Vec<u8>>;
+
 #[repr(C)]
 pub struct RawListIndex<'a> {
-    pub access: *const RawIndexAccess<'a>,
-    pub index_name: *const c_char,
+    pub handle: *mut ListIndexHandle<'a>,
 
     pub methods: RawListIndexMethods,
 }
 
+/// Opens the index. Handle must be released via the `free` method before the access
+/// is destroyed.
 #[no_mangle]
-pub unsafe fn merkledb_list_index(
-    access: *const RawIndexAccess,
+pub unsafe fn merkledb_list_index<'a>(
+    access: *const RawIndexAccess<'a>,
     index_name: *const c_char,
-) -> RawListIndex {
+) -> RawListIndex<'a> {
+    let index_name = parse_string(index_name);
+
+    let handle = match *access {
+        RawIndexAccess::Fork(fork) => ListIndexHandle::Fork(ListIndex::new(index_name, fork)),
+        RawIndexAccess::Snapshot(snapshot) => {
+            ListIndexHandle::Snapshot(ListIndex::new(index_name, snapshot))
+        }
+        RawIndexAccess::SnapshotToken => ListIndexHandle::SnapshotToken(index_name),
+    };
+
     RawListIndex {
-        access,
-        index_name,
+        handle: Box::into_raw(Box::new(handle)),
         methods: RawListIndexMethods::default(),
     }
 }
@@ -56,47 +80,22 @@ type ListIndexGet =
     unsafe extern "C" fn(index: *const RawListIndex, idx: u64, allocate: Allocate) -> BinaryData;
 type ListIndexPop =
     unsafe extern "C" fn(index: *const RawListIndex, allocate: Allocate) -> BinaryData;
+type ListIndexGetRange = unsafe extern "C" fn(
+    index: *const RawListIndex,
+    start: u64,
+    end: u64,
+    allocate: Allocate,
+) -> BinaryData;
 type ListIndexPush = unsafe extern "C" fn(index: *const RawListIndex, value: BinaryData);
+type ListIndexExtend = unsafe extern "C" fn(index: *const RawListIndex, values: BinaryData);
 type ListIndexLen = unsafe extern "C" fn(index: *const RawListIndex) -> u64;
 type ListIndexSet = unsafe extern "C" fn(index: *const RawListIndex, idx: u64, value: BinaryData);
 type ListIndexClear = unsafe extern "C" fn(index: *const RawListIndex);
+type ListIndexFree = unsafe extern "C" fn(index: *mut RawListIndex);
 
-unsafe extern "C" fn get(index: *const RawListIndex, idx: u64, allocate: Allocate) -> BinaryData {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-
-    let value = match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let index: ListIndex<&Fork, Vec<u8>> = ListIndex::new(index_name, fork);
-            index.get(idx)
-        }
-        RawIndexAccess::Snapshot(snapshot) => {
-            let index: ListIndex<&dyn Snapshot, Vec<u8>> = ListIndex::new(index_name, snapshot);
-            index.get(idx)
-        }
-        RawIndexAccess::SnapshotToken => {
-            match BLOCK_SNAPSHOT.read().expect("Block snapshot read").as_ref() {
-                Some(ref snapshot) => {
-                    let index: ListIndex<&dyn Snapshot, Vec<u8>> =
-                        ListIndex::new(index_name, snapshot.as_ref());
-                    index.get(idx)
-                }
-                None => None,
-            }
-        }
-    };
-
+unsafe fn write_optional(value: Option<Vec<u8>>, allocate: Allocate) -> BinaryData {
     match value {
-        Some(data) => {
-            let buffer: *mut u8 = allocate(data.len() as u64);
-
-            std::ptr::copy(data.as_ptr(), buffer, data.len());
-
-            BinaryData {
-                data: buffer,
-                data_len: data.len() as u64,
-            }
-        }
+        Some(data) => write_bytes(&data, allocate),
         None => BinaryData {
             data: std::ptr::null::<u8>(),
             data_len: 0,
@@ -104,112 +103,84 @@ unsafe extern "C" fn get(index: *const RawListIndex, idx: u64, allocate: Allocat
     }
 }
 
+unsafe extern "C" fn get(index: *const RawListIndex, idx: u64, allocate: Allocate) -> BinaryData {
+    let value = with_index!(
+        index,
+        ListIndexHandle,
+        SnapshotListIndex,
+        |index| index.get(idx),
+        None
+    );
+
+    write_optional(value, allocate)
+}
+
+/// Returns values with indices in the `start..end` range (range is truncated
+/// to the length of the list) packed as length-prefixed items.
+unsafe extern "C" fn get_range(
+    index: *const RawListIndex,
+    start: u64,
+    end: u64,
+    allocate: Allocate,
+) -> BinaryData {
+    let amount = end.saturating_sub(start) as usize;
+
+    let values: Vec<Vec<u8>> = with_index!(
+        index,
+        ListIndexHandle,
+        SnapshotListIndex,
+        |index| index.iter_from(start).take(amount).collect(),
+        Vec::new()
+    );
+
+    write_items(&values, allocate)
+}
+
 unsafe extern "C" fn push(index: *const RawListIndex, value: BinaryData) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
     let value: Vec<u8> = value.to_vec();
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: ListIndex<&Fork, Vec<u8>> = ListIndex::new(index_name, fork);
+    with_index_mut!(index, ListIndexHandle, |index| index.push(value));
+}
 
-            index.push(value);
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
-        }
-    }
+/// Appends values packed as length-prefixed items to the list.
+unsafe extern "C" fn extend(index: *const RawListIndex, values: BinaryData) {
+    let values = unpack_items(values.as_slice());
+
+    with_index_mut!(index, ListIndexHandle, |index| index.extend(values));
 }
 
 unsafe extern "C" fn pop(index: *const RawListIndex, allocate: Allocate) -> BinaryData {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: ListIndex<&Fork, Vec<u8>> = ListIndex::new(index_name, fork);
-
-            let value = index.pop();
-
-            match value {
-                Some(data) => {
-                    let buffer: *mut u8 = allocate(data.len() as u64);
-
-                    std::ptr::copy(data.as_ptr(), buffer, data.len());
-
-                    BinaryData {
-                        data: buffer,
-                        data_len: data.len() as u64,
-                    }
-                }
-                None => BinaryData {
-                    data: std::ptr::null::<u8>(),
-                    data_len: 0,
-                },
-            }
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
-        }
-    }
+    let value = with_index_mut!(index, ListIndexHandle, |index| index.pop());
+
+    write_optional(value, allocate)
 }
 
 unsafe extern "C" fn len(index: *const RawListIndex) -> u64 {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let index: ListIndex<&Fork, Vec<u8>> = ListIndex::new(index_name, fork);
-            index.len() as u64
-        }
-        RawIndexAccess::Snapshot(snapshot) => {
-            let index: ListIndex<&dyn Snapshot, Vec<u8>> = ListIndex::new(index_name, snapshot);
-            index.len() as u64
-        }
-
-        RawIndexAccess::SnapshotToken => {
-            match BLOCK_SNAPSHOT.read().expect("Block snapshot read").as_ref() {
-                Some(ref snapshot) => {
-                    let index: ListIndex<&dyn Snapshot, Vec<u8>> =
-                        ListIndex::new(index_name, snapshot.as_ref());
-                    index.len() as u64
-                }
-                None => 0,
-            }
-        }
-    }
+    with_index!(
+        index,
+        ListIndexHandle,
+        SnapshotListIndex,
+        |index| index.len() as u64,
+        0
+    )
 }
 
 unsafe extern "C" fn set(index: *const RawListIndex, idx: u64, value: BinaryData) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
     let value: Vec<u8> = value.to_vec();
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: ListIndex<&Fork, Vec<u8>> = ListIndex::new(index_name, fork);
-
-            index.set(idx, value);
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
-        }
-    }
+    with_index_mut!(index, ListIndexHandle, |index| index.set(idx, value));
 }
 
 unsafe extern "C" fn clear(index: *const RawListIndex) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
+    with_index_mut!(index, ListIndexHandle, |index| index.clear());
+}
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: ListIndex<&Fork, Vec<u8>> = ListIndex::new(index_name, fork);
+/// Closes the index. Handle can't be used after this call.
+unsafe extern "C" fn free(index: *mut RawListIndex) {
+    let index = &mut *index;
 
-            index.clear();
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
-        }
+    if !index.handle.is_null() {
+        drop(Box::from_raw(index.handle));
+        index.handle = std::ptr::null_mut();
     }
 }
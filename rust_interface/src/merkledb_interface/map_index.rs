@@ -1,47 +1,75 @@
 use std::os::raw::c_char;
 
-use exonum_merkledb::{Fork, MapIndex, Snapshot};
+use exonum_merkledb::{Fork, IndexAccess, MapIndex, Snapshot};
 
-use super::binary_data::BinaryData;
-use super::common::parse_string;
-use crate::python_interface::BLOCK_SNAPSHOT;
+use super::binary_data::{unpack_items, write_bytes, write_items, write_values, BinaryData};
+use super::common::{parse_string, KeyBounds};
 use crate::types::RawIndexAccess;
 
 #[repr(C)]
 pub struct RawMapIndexMethods {
     pub get: MapIndexGet,
+    pub get_many: MapIndexGetMany,
+    pub iter_chunk: MapIndexIterChunk,
     pub put: MapIndexPut,
+    pub put_many: MapIndexPutMany,
     pub remove: MapIndexRemove,
+    pub remove_many: MapIndexRemoveMany,
     pub clear: MapIndexClear,
+    pub free: MapIndexFree,
 }
 
 impl Default for RawMapIndexMethods {
     fn default() -> Self {
         Self {
             get,
+            get_many,
+            iter_chunk,
             put,
+            put_many,
             remove,
+            remove_many,
             clear,
+            free,
         }
     }
 }
 
+/// Index opened for the lifetime of the database access.
+pub enum MapIndexHandle<'a> {
+    Fork(MapIndex<&'a Fork, Vec<u8>, Vec<u8>>),
+    Snapshot(MapIndex<&'a dyn Snapshot, Vec<u8>, Vec<u8>>),
+    SnapshotToken(String),
+}
+
+type SnapshotMapIndex<'a> = MapIndex<&'a dyn Snapshot, Vec<u8>, Vec<u8>>;
+
 #[repr(C)]
 pub struct RawMapIndex<'a> {
-    pub access: *const RawIndexAccess<'a>,
-    pub index_name: *const c_char,
+    pub handle: *mut MapIndexHandle<'a>,
 
     pub methods: RawMapIndexMethods,
 }
 
+/// Opens the index. Handle must be released via the `free` method before the access
+/// is destroyed.
 #[no_mangle]
-pub unsafe fn merkledb_map_index(
-    access: *const RawIndexAccess,
+pub unsafe fn merkledb_map_index<'a>(
+    access: *const RawIndexAccess<'a>,
     index_name: *const c_char,
-) -> RawMapIndex {
+) -> RawMapIndex<'a> {
+    let index_name = parse_string(index_name);
+
+    let handle = match *access {
+        RawIndexAccess::Fork(fork) => MapIndexHandle::Fork(MapIndex::new(index_name, fork)),
+        RawIndexAccess::Snapshot(snapshot) => {
+            MapIndexHandle::Snapshot(MapIndex::new(index_name, snapshot))
+        }
+        RawIndexAccess::SnapshotToken => MapIndexHandle::SnapshotToken(index_name),
+    };
+
     RawMapIndex {
-        access,
-        index_name,
+        handle: Box::into_raw(Box::new(handle)),
         methods: RawMapIndexMethods::default(),
     }
 }
@@ -53,54 +81,48 @@ type MapIndexGet = unsafe extern "C" fn(
     key: BinaryData,
     allocate: Allocate,
 ) -> BinaryData;
+type MapIndexGetMany = unsafe extern "C" fn(
+    index: *const RawMapIndex,
+    keys: BinaryData,
+    offsets: *mut u64,
+    found: *mut u8,
+    allocate: Allocate,
+) -> BinaryData;
+type MapIndexIterChunk = unsafe extern "C" fn(
+    index: *const RawMapIndex,
+    from_key: BinaryData,
+    start: BinaryData,
+    end: BinaryData,
+    prefix: BinaryData,
+    limit: u64,
+    with_values: u8,
+    allocate: Allocate,
+) -> BinaryData;
 type MapIndexPut =
     unsafe extern "C" fn(index: *const RawMapIndex, key: BinaryData, value: BinaryData);
 type MapIndexRemove = unsafe extern "C" fn(index: *const RawMapIndex, key: BinaryData);
+type MapIndexPutMany = unsafe extern "C" fn(index: *const RawMapIndex, entries: BinaryData);
+type MapIndexRemoveMany = unsafe extern "C" fn(index: *const RawMapIndex, keys: BinaryData);
 type MapIndexClear = unsafe extern "C" fn(index: *const RawMapIndex);
+type MapIndexFree = unsafe extern "C" fn(index: *mut RawMapIndex);
 
 unsafe extern "C" fn get(
     index: *const RawMapIndex,
     key: BinaryData,
     allocate: Allocate,
 ) -> BinaryData {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-
     let key = key.to_vec();
 
-    let value = match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let index: MapIndex<&Fork, Vec<u8>, Vec<u8>> = MapIndex::new(index_name, fork);
-            index.get(&key)
-        }
-        RawIndexAccess::Snapshot(snapshot) => {
-            let index: MapIndex<&dyn Snapshot, Vec<u8>, Vec<u8>> =
-                MapIndex::new(index_name, snapshot);
-            index.get(&key)
-        }
-        RawIndexAccess::SnapshotToken => {
-            match BLOCK_SNAPSHOT.read().expect("Block snapshot read").as_ref() {
-                Some(ref snapshot) => {
-                    let index: MapIndex<&dyn Snapshot, Vec<u8>, Vec<u8>> =
-                        MapIndex::new(index_name, snapshot.as_ref());
-                    index.get(&key)
-                }
-                None => None,
-            }
-        }
-    };
+    let value = with_index!(
+        index,
+        MapIndexHandle,
+        SnapshotMapIndex,
+        |index| index.get(&key),
+        None
+    );
 
     match value {
-        Some(data) => {
-            let buffer: *mut u8 = allocate(data.len() as u64);
-
-            std::ptr::copy(data.as_ptr(), buffer, data.len());
-
-            BinaryData {
-                data: buffer,
-                data_len: data.len() as u64,
-            }
-        }
+        Some(data) => write_bytes(&data, allocate),
         None => BinaryData {
             data: std::ptr::null::<u8>(),
             data_len: 0,
@@ -108,53 +130,141 @@ unsafe extern "C" fn get(
     }
 }
 
-unsafe extern "C" fn put(index: *const RawMapIndex, key: BinaryData, value: BinaryData) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-    let key: Vec<u8> = key.to_vec();
-    let value: Vec<u8> = value.to_vec();
+unsafe extern "C" fn get_many(
+    index: *const RawMapIndex,
+    keys: BinaryData,
+    offsets: *mut u64,
+    found: *mut u8,
+    allocate: Allocate,
+) -> BinaryData {
+    let keys = unpack_items(keys.as_slice());
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: MapIndex<&Fork, Vec<u8>, Vec<u8>> = MapIndex::new(index_name, fork);
+    let values: Vec<Option<Vec<u8>>> = with_index!(
+        index,
+        MapIndexHandle,
+        SnapshotMapIndex,
+        |index| keys.iter().map(|key| index.get(key)).collect(),
+        keys.iter().map(|_| None).collect()
+    );
 
-            index.put(&key, value);
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
+    write_values(&values, offsets, found, allocate)
+}
+
+/// Reads up to `limit` entries of the map starting right after `from_key`
+/// (or from the beginning of the map if `from_key` is null).
+///
+/// Result is packed as length-prefixed items: only keys if `with_values` is 0,
+/// and keys interleaved with values otherwise.
+unsafe extern "C" fn iter_chunk(
+    index: *const RawMapIndex,
+    from_key: BinaryData,
+    start: BinaryData,
+    end: BinaryData,
+    prefix: BinaryData,
+    limit: u64,
+    with_values: u8,
+    allocate: Allocate,
+) -> BinaryData {
+    let from_key = from_key.to_option_vec();
+    let bounds = KeyBounds::new(start, end, prefix);
+    let limit = limit as usize;
+    let with_values = with_values != 0;
+
+    let items = with_index!(
+        index,
+        MapIndexHandle,
+        SnapshotMapIndex,
+        |index| read_chunk(index, from_key.as_ref(), &bounds, limit, with_values),
+        Vec::new()
+    );
+
+    write_items(&items, allocate)
+}
+
+fn read_chunk<T: IndexAccess>(
+    index: &MapIndex<T, Vec<u8>, Vec<u8>>,
+    from_key: Option<&Vec<u8>>,
+    bounds: &KeyBounds,
+    limit: usize,
+    with_values: bool,
+) -> Vec<Vec<u8>> {
+    // Keys are stored in order, so the scan starts at the lower bound (or right after the key
+    // returned by the previous chunk) and stops at the first key beyond the upper bounds.
+    let seek_key = from_key.or_else(|| bounds.lower());
+    let mut items = Vec::new();
+
+    if with_values {
+        let entries: Box<dyn Iterator<Item = (Vec<u8>, Vec<u8>)> + '_> = match seek_key {
+            Some(seek_key) => Box::new(index.iter_from(seek_key)),
+            None => Box::new(index.iter()),
+        };
+        let entries = entries
+            .skip_while(|(key, _)| Some(key) == from_key)
+            .take_while(|(key, _)| bounds.below_upper(key));
+
+        for (key, value) in entries.take(limit) {
+            items.push(key);
+            items.push(value);
         }
+    } else {
+        let keys: Box<dyn Iterator<Item = Vec<u8>> + '_> = match seek_key {
+            Some(seek_key) => Box::new(index.keys_from(seek_key)),
+            None => Box::new(index.keys()),
+        };
+        let keys = keys
+            .skip_while(|key| Some(key) == from_key)
+            .take_while(|key| bounds.below_upper(key));
+
+        items.extend(keys.take(limit));
     }
+
+    items
+}
+
+unsafe extern "C" fn put(index: *const RawMapIndex, key: BinaryData, value: BinaryData) {
+    let key: Vec<u8> = key.to_vec();
+    let value: Vec<u8> = value.to_vec();
+
+    with_index_mut!(index, MapIndexHandle, |index| index.put(&key, value));
 }
 
 unsafe extern "C" fn remove(index: *const RawMapIndex, key: BinaryData) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
     let key: Vec<u8> = key.to_vec();
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: MapIndex<&Fork, Vec<u8>, Vec<u8>> = MapIndex::new(index_name, fork);
+    with_index_mut!(index, MapIndexHandle, |index| index.remove(&key));
+}
+
+/// Puts entries packed as `key_0, value_0, key_1, value_1, ...` into the index.
+unsafe extern "C" fn put_many(index: *const RawMapIndex, entries: BinaryData) {
+    let mut entries = unpack_items(entries.as_slice()).into_iter();
 
-            index.remove(&key);
+    with_index_mut!(index, MapIndexHandle, |index| {
+        while let (Some(key), Some(value)) = (entries.next(), entries.next()) {
+            index.put(&key, value);
         }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
+    });
+}
+
+unsafe extern "C" fn remove_many(index: *const RawMapIndex, keys: BinaryData) {
+    let keys = unpack_items(keys.as_slice());
+
+    with_index_mut!(index, MapIndexHandle, |index| {
+        for key in keys {
+            index.remove(&key);
         }
-    }
+    });
 }
 
 unsafe extern "C" fn clear(index: *const RawMapIndex) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
+    with_index_mut!(index, MapIndexHandle, |index| index.clear());
+}
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: MapIndex<&Fork, Vec<u8>, Vec<u8>> = MapIndex::new(index_name, fork);
+/// Closes the index. Handle can't be used after this call.
+unsafe extern "C" fn free(index: *mut RawMapIndex) {
+    let index = &mut *index;
 
-            index.clear();
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
-        }
+    if !index.handle.is_null() {
+        drop(Box::from_raw(index.handle));
+        index.handle = std::ptr::null_mut();
     }
 }
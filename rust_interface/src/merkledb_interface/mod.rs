@@ -1,6 +1,8 @@
 pub mod binary_data;
+#[macro_use]
 mod common;
 pub mod list_index;
 pub mod map_index;
 pub mod proof_list_index;
 pub mod proof_map_index;
+mod proofs;
@@ -3,52 +3,81 @@ use std::os::raw::c_char;
 use exonum::crypto::Hash;
 use exonum_merkledb::{Fork, ObjectHash, ProofListIndex, Snapshot};
 
-use super::binary_data::BinaryData;
+use super::binary_data::{unpack_items, write_bytes, write_items, BinaryData};
 use super::common::parse_string;
-use crate::python_interface::BLOCK_SNAPSHOT;
+use super::proofs::serialize_list_proof;
 use crate::types::RawIndexAccess;
 
 #[repr(C)]
 pub struct RawProofListIndexMethods {
     pub get: ProofListIndexGet,
+    pub get_range: ProofListIndexGetRange,
     pub push: ProofListIndexPush,
+    pub extend: ProofListIndexExtend,
     // pub pop: ProofListIndexPop,
     pub len: ProofListIndexLen,
     pub set: ProofListIndexSet,
     pub clear: ProofListIndexClear,
     pub object_hash: ProofListIndexObjectHash,
+    pub get_range_proof: ProofListIndexGetRangeProof,
+    pub free: ProofListIndexFree,
 }
 
 impl Default for RawProofListIndexMethods {
     fn default() -> Self {
         Self {
             get,
+            get_range,
             push,
+            extend,
             // pop,
             len,
             set,
             clear,
             object_hash,
+            get_range_proof,
+            free,
         }
     }
 }
 
+/// Index opened for the lifetime of the database access.
+pub enum ProofListIndexHandle<'a> {
+    Fork(ProofListIndex<&'a Fork, Vec<u8>>),
+    Snapshot(ProofListIndex<&'a dyn Snapshot, Vec<u8>>),
+    SnapshotToken(String),
+}
+
+type SnapshotProofListIndex<'a> = ProofListIndex<&'a dyn Snapshot, Vec<u8>>;
+
 #[repr(C)]
 pub struct RawProofListIndex<'a> {
-    pub access: *const RawIndexAccess<'a>,
-    pub index_name: *const c_char,
+    pub handle: *mut ProofListIndexHandle<'a>,
 
     pub methods: RawProofListIndexMethods,
 }
 
+/// Opens the index. Handle must be released via the `free` method before the access
+/// is destroyed.
 #[no_mangle]
-pub unsafe fn merkledb_proof_list_index(
-    access: *const RawIndexAccess,
+pub unsafe fn merkledb_proof_list_index<'a>(
+    access: *const RawIndexAccess<'a>,
     index_name: *const c_char,
-) -> RawProofListIndex {
+) -> RawProofListIndex<'a> {
+    let index_name = parse_string(index_name);
+
+    let handle = match *access {
+        RawIndexAccess::Fork(fork) => {
+            ProofListIndexHandle::Fork(ProofListIndex::new(index_name, fork))
+        }
+        RawIndexAccess::Snapshot(snapshot) => {
+            ProofListIndexHandle::Snapshot(ProofListIndex::new(index_name, snapshot))
+        }
+        RawIndexAccess::SnapshotToken => ProofListIndexHandle::SnapshotToken(index_name),
+    };
+
     RawProofListIndex {
-        access,
-        index_name,
+        handle: Box::into_raw(Box::new(handle)),
         methods: RawProofListIndexMethods::default(),
     }
 }
@@ -62,55 +91,32 @@ type ProofListIndexGet = unsafe extern "C" fn(
 ) -> BinaryData;
 // type ProofListIndexPop =
 //     unsafe extern "C" fn(index: *const RawProofListIndex, allocate: Allocate) -> BinaryData;
+type ProofListIndexGetRange = unsafe extern "C" fn(
+    index: *const RawProofListIndex,
+    start: u64,
+    end: u64,
+    allocate: Allocate,
+) -> BinaryData;
 type ProofListIndexPush = unsafe extern "C" fn(index: *const RawProofListIndex, value: BinaryData);
+type ProofListIndexExtend =
+    unsafe extern "C" fn(index: *const RawProofListIndex, values: BinaryData);
 type ProofListIndexLen = unsafe extern "C" fn(index: *const RawProofListIndex) -> u64;
 type ProofListIndexSet =
     unsafe extern "C" fn(index: *const RawProofListIndex, idx: u64, value: BinaryData);
 type ProofListIndexClear = unsafe extern "C" fn(index: *const RawProofListIndex);
 type ProofListIndexObjectHash =
     unsafe extern "C" fn(index: *const RawProofListIndex, allocate: Allocate) -> BinaryData;
-
-unsafe extern "C" fn get(
+type ProofListIndexGetRangeProof = unsafe extern "C" fn(
     index: *const RawProofListIndex,
-    idx: u64,
+    start: u64,
+    end: u64,
     allocate: Allocate,
-) -> BinaryData {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-
-    let value = match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let index: ProofListIndex<&Fork, Vec<u8>> = ProofListIndex::new(index_name, fork);
-            index.get(idx)
-        }
-        RawIndexAccess::Snapshot(snapshot) => {
-            let index: ProofListIndex<&dyn Snapshot, Vec<u8>> =
-                ProofListIndex::new(index_name, snapshot);
-            index.get(idx)
-        }
-        RawIndexAccess::SnapshotToken => {
-            match BLOCK_SNAPSHOT.read().expect("Block snapshot read").as_ref() {
-                Some(ref snapshot) => {
-                    let index: ProofListIndex<&dyn Snapshot, Vec<u8>> =
-                        ProofListIndex::new(index_name, snapshot.as_ref());
-                    index.get(idx)
-                }
-                None => None,
-            }
-        }
-    };
+) -> BinaryData;
+type ProofListIndexFree = unsafe extern "C" fn(index: *mut RawProofListIndex);
 
+unsafe fn write_optional(value: Option<Vec<u8>>, allocate: Allocate) -> BinaryData {
     match value {
-        Some(data) => {
-            let buffer: *mut u8 = allocate(data.len() as u64);
-
-            std::ptr::copy(data.as_ptr(), buffer, data.len());
-
-            BinaryData {
-                data: buffer,
-                data_len: data.len() as u64,
-            }
-        }
+        Some(data) => write_bytes(&data, allocate),
         None => BinaryData {
             data: std::ptr::null::<u8>(),
             data_len: 0,
@@ -118,152 +124,125 @@ unsafe extern "C" fn get(
     }
 }
 
+unsafe extern "C" fn get(
+    index: *const RawProofListIndex,
+    idx: u64,
+    allocate: Allocate,
+) -> BinaryData {
+    let value = with_index!(
+        index,
+        ProofListIndexHandle,
+        SnapshotProofListIndex,
+        |index| index.get(idx),
+        None
+    );
+
+    write_optional(value, allocate)
+}
+
+/// Returns values with indices in the `start..end` range (range is truncated
+/// to the length of the list) packed as length-prefixed items.
+unsafe extern "C" fn get_range(
+    index: *const RawProofListIndex,
+    start: u64,
+    end: u64,
+    allocate: Allocate,
+) -> BinaryData {
+    let amount = end.saturating_sub(start) as usize;
+
+    let values: Vec<Vec<u8>> = with_index!(
+        index,
+        ProofListIndexHandle,
+        SnapshotProofListIndex,
+        |index| index.iter_from(start).take(amount).collect(),
+        Vec::new()
+    );
+
+    write_items(&values, allocate)
+}
+
 unsafe extern "C" fn push(index: *const RawProofListIndex, value: BinaryData) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
     let value: Vec<u8> = value.to_vec();
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: ProofListIndex<&Fork, Vec<u8>> = ProofListIndex::new(index_name, fork);
+    with_index_mut!(index, ProofListIndexHandle, |index| index.push(value));
+}
 
-            index.push(value);
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
-        }
-    }
+unsafe extern "C" fn extend(index: *const RawProofListIndex, values: BinaryData) {
+    let values = unpack_items(values.as_slice());
+
+    with_index_mut!(index, ProofListIndexHandle, |index| index.extend(values));
 }
 
 // unsafe extern "C" fn pop(index: *const RawProofListIndex, allocate: Allocate) -> BinaryData {
-//     let index = &*index;
-//     let index_name = parse_string(index.index_name);
-
-//     match *index.access {
-//         RawIndexAccess::Fork(fork) => {
-//             let mut index: ProofListIndex<&Fork, Vec<u8>> = ProofListIndex::new(index_name, fork);
-
-//             let value = index.pop();
-
-//             match value {
-//                 Some(data) => {
-//                     let buffer: *mut u8 = allocate(data.len() as u64);
-
-//                     std::ptr::copy(data.as_ptr(), buffer, data.len());
-
-//                     BinaryData {
-//                         data: buffer,
-//                         data_len: data.len() as u64,
-//                     }
-//                 }
-//                 None => BinaryData {
-//                     data: std::ptr::null::<u8>(),
-//                     data_len: 0,
-//                 },
-//             }
-//         }
-//         _ => {
-//             panic!("Attempt to call mutable method with a snapshot");
-//         }
-//     }
+//     let value = with_index_mut!(index, ProofListIndexHandle, |index| index.pop());
+//
+//     write_optional(value, allocate)
 // }
 
 unsafe extern "C" fn len(index: *const RawProofListIndex) -> u64 {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let index: ProofListIndex<&Fork, Vec<u8>> = ProofListIndex::new(index_name, fork);
-            index.len() as u64
-        }
-        RawIndexAccess::Snapshot(snapshot) => {
-            let index: ProofListIndex<&dyn Snapshot, Vec<u8>> =
-                ProofListIndex::new(index_name, snapshot);
-            index.len() as u64
-        }
-        RawIndexAccess::SnapshotToken => {
-            match BLOCK_SNAPSHOT.read().expect("Block snapshot read").as_ref() {
-                Some(ref snapshot) => {
-                    let index: ProofListIndex<&dyn Snapshot, Vec<u8>> =
-                        ProofListIndex::new(index_name, snapshot.as_ref());
-                    index.len()
-                }
-                None => 0,
-            }
-        }
-    }
+    with_index!(
+        index,
+        ProofListIndexHandle,
+        SnapshotProofListIndex,
+        |index| index.len(),
+        0
+    )
 }
 
 unsafe extern "C" fn set(index: *const RawProofListIndex, idx: u64, value: BinaryData) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
     let value: Vec<u8> = value.to_vec();
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: ProofListIndex<&Fork, Vec<u8>> = ProofListIndex::new(index_name, fork);
-
-            index.set(idx, value);
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
-        }
-    }
+    with_index_mut!(index, ProofListIndexHandle, |index| index.set(idx, value));
 }
 
 unsafe extern "C" fn clear(index: *const RawProofListIndex) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: ProofListIndex<&Fork, Vec<u8>> = ProofListIndex::new(index_name, fork);
-
-            index.clear();
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
-        }
-    }
+    with_index_mut!(index, ProofListIndexHandle, |index| index.clear());
 }
 
 unsafe extern "C" fn object_hash(
     index: *const RawProofListIndex,
     allocate: Allocate,
 ) -> BinaryData {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-
-    let value = match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let index: ProofListIndex<&Fork, Vec<u8>> = ProofListIndex::new(index_name, fork);
-            index.object_hash()
-        }
-        RawIndexAccess::Snapshot(snapshot) => {
-            let index: ProofListIndex<&dyn Snapshot, Vec<u8>> =
-                ProofListIndex::new(index_name, snapshot);
-            index.object_hash()
-        }
-        RawIndexAccess::SnapshotToken => {
-            match BLOCK_SNAPSHOT.read().expect("Block snapshot read").as_ref() {
-                Some(ref snapshot) => {
-                    let index: ProofListIndex<&dyn Snapshot, Vec<u8>> =
-                        ProofListIndex::new(index_name, snapshot.as_ref());
-                    index.object_hash()
-                }
-                None => Hash::zero(),
-            }
-        }
-    };
-    let data: &[u8] = value.as_ref();
+    let value = with_index!(
+        index,
+        ProofListIndexHandle,
+        SnapshotProofListIndex,
+        |index| index.object_hash(),
+        Hash::zero()
+    );
+
+    write_bytes(value.as_ref(), allocate)
+}
 
-    let buffer: *mut u8 = allocate(data.len() as u64);
+/// Builds a proof for the elements with indices in the `start..end` range
+/// and returns it serialized as described in the `proofs` module.
+/// `start` must be less than `end`.
+unsafe extern "C" fn get_range_proof(
+    index: *const RawProofListIndex,
+    start: u64,
+    end: u64,
+    allocate: Allocate,
+) -> BinaryData {
+    let proof = with_index!(
+        index,
+        ProofListIndexHandle,
+        SnapshotProofListIndex,
+        |index| Some(serialize_list_proof(
+            index.len(),
+            &index.get_range_proof(start, end)
+        )),
+        None
+    );
+
+    write_optional(proof, allocate)
+}
 
-    std::ptr::copy(data.as_ptr(), buffer, data.len());
+/// Closes the index. Handle can't be used after this call.
+unsafe extern "C" fn free(index: *mut RawProofListIndex) {
+    let index = &mut *index;
 
-    BinaryData {
-        data: buffer,
-        data_len: data.len() as u64,
+    if !index.handle.is_null() {
+        drop(Box::from_raw(index.handle));
+        index.handle = std::ptr::null_mut();
     }
 }
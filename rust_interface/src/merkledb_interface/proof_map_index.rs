@@ -1,50 +1,83 @@
 use std::os::raw::c_char;
 
 use exonum::crypto::Hash;
-use exonum_merkledb::{Fork, ObjectHash, ProofMapIndex, Snapshot};
+use exonum_merkledb::{Fork, IndexAccess, ObjectHash, ProofMapIndex, Snapshot};
 
-use super::binary_data::BinaryData;
-use super::common::parse_string;
-use crate::python_interface::BLOCK_SNAPSHOT;
+use super::binary_data::{unpack_items, write_bytes, write_items, write_values, BinaryData};
+use super::common::{parse_string, KeyBounds};
+use super::proofs::serialize_map_proof;
 use crate::types::RawIndexAccess;
 
 #[repr(C)]
 pub struct RawProofMapIndexMethods {
     pub get: ProofMapIndexGet,
+    pub get_many: ProofMapIndexGetMany,
+    pub iter_chunk: ProofMapIndexIterChunk,
     pub put: ProofMapIndexPut,
+    pub put_many: ProofMapIndexPutMany,
     pub remove: ProofMapIndexRemove,
+    pub remove_many: ProofMapIndexRemoveMany,
     pub clear: ProofMapIndexClear,
     pub object_hash: ProofMapIndexObjectHash,
+    pub get_multiproof: ProofMapIndexGetMultiproof,
+    pub free: ProofMapIndexFree,
 }
 
 impl Default for RawProofMapIndexMethods {
     fn default() -> Self {
         Self {
             get,
+            get_many,
+            iter_chunk,
             put,
+            put_many,
             remove,
+            remove_many,
             clear,
             object_hash,
+            get_multiproof,
+            free,
         }
     }
 }
 
+/// Index opened for the lifetime of the database access.
+pub enum ProofMapIndexHandle<'a> {
+    Fork(ProofMapIndex<&'a Fork, Vec<u8>, Vec<u8>>),
+    Snapshot(ProofMapIndex<&'a dyn Snapshot, Vec<u8>, Vec<u8>>),
+    SnapshotToken(String),
+}
+
+type SnapshotProofMapIndex<'a> = ProofMapIndex<&'a dyn Snapshot, Vec<u8>, Vec<u8>>;
+
 #[repr(C)]
 pub struct RawProofMapIndex<'a> {
-    pub access: *const RawIndexAccess<'a>,
-    pub index_name: *const c_char,
+    pub handle: *mut ProofMapIndexHandle<'a>,
 
     pub methods: RawProofMapIndexMethods,
 }
 
+/// Opens the index. Handle must be released via the `free` method before the access
+/// is destroyed.
 #[no_mangle]
-pub unsafe fn merkledb_proof_map_index(
-    access: *const RawIndexAccess,
+pub unsafe fn merkledb_proof_map_index<'a>(
+    access: *const RawIndexAccess<'a>,
     index_name: *const c_char,
-) -> RawProofMapIndex {
+) -> RawProofMapIndex<'a> {
+    let index_name = parse_string(index_name);
+
+    let handle = match *access {
+        RawIndexAccess::Fork(fork) => {
+            ProofMapIndexHandle::Fork(ProofMapIndex::new(index_name, fork))
+        }
+        RawIndexAccess::Snapshot(snapshot) => {
+            ProofMapIndexHandle::Snapshot(ProofMapIndex::new(index_name, snapshot))
+        }
+        RawIndexAccess::SnapshotToken => ProofMapIndexHandle::SnapshotToken(index_name),
+    };
+
     RawProofMapIndex {
-        access,
-        index_name,
+        handle: Box::into_raw(Box::new(handle)),
         methods: RawProofMapIndexMethods::default(),
     }
 }
@@ -56,57 +89,57 @@ type ProofMapIndexGet = unsafe extern "C" fn(
     key: BinaryData,
     allocate: Allocate,
 ) -> BinaryData;
+type ProofMapIndexGetMany = unsafe extern "C" fn(
+    index: *const RawProofMapIndex,
+    keys: BinaryData,
+    offsets: *mut u64,
+    found: *mut u8,
+    allocate: Allocate,
+) -> BinaryData;
+type ProofMapIndexIterChunk = unsafe extern "C" fn(
+    index: *const RawProofMapIndex,
+    from_key: BinaryData,
+    start: BinaryData,
+    end: BinaryData,
+    prefix: BinaryData,
+    limit: u64,
+    with_values: u8,
+    allocate: Allocate,
+) -> BinaryData;
 type ProofMapIndexPut =
     unsafe extern "C" fn(index: *const RawProofMapIndex, key: BinaryData, value: BinaryData);
 type ProofMapIndexRemove = unsafe extern "C" fn(index: *const RawProofMapIndex, key: BinaryData);
+type ProofMapIndexPutMany =
+    unsafe extern "C" fn(index: *const RawProofMapIndex, entries: BinaryData);
+type ProofMapIndexRemoveMany =
+    unsafe extern "C" fn(index: *const RawProofMapIndex, keys: BinaryData);
 type ProofMapIndexClear = unsafe extern "C" fn(index: *const RawProofMapIndex);
 type ProofMapIndexObjectHash =
     unsafe extern "C" fn(index: *const RawProofMapIndex, allocate: Allocate) -> BinaryData;
+type ProofMapIndexGetMultiproof = unsafe extern "C" fn(
+    index: *const RawProofMapIndex,
+    keys: BinaryData,
+    allocate: Allocate,
+) -> BinaryData;
+type ProofMapIndexFree = unsafe extern "C" fn(index: *mut RawProofMapIndex);
 
 unsafe extern "C" fn get(
     index: *const RawProofMapIndex,
     key: BinaryData,
     allocate: Allocate,
 ) -> BinaryData {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-
     let key = key.to_vec();
 
-    let value = match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let index: ProofMapIndex<&Fork, Vec<u8>, Vec<u8>> =
-                ProofMapIndex::new(index_name, fork);
-            index.get(&key)
-        }
-        RawIndexAccess::Snapshot(snapshot) => {
-            let index: ProofMapIndex<&dyn Snapshot, Vec<u8>, Vec<u8>> =
-                ProofMapIndex::new(index_name, snapshot);
-            index.get(&key)
-        }
-        RawIndexAccess::SnapshotToken => {
-            match BLOCK_SNAPSHOT.read().expect("Block snapshot read").as_ref() {
-                Some(ref snapshot) => {
-                    let index: ProofMapIndex<&dyn Snapshot, Vec<u8>, Vec<u8>> =
-                        ProofMapIndex::new(index_name, snapshot.as_ref());
-                    index.get(&key)
-                }
-                None => None,
-            }
-        }
-    };
+    let value = with_index!(
+        index,
+        ProofMapIndexHandle,
+        SnapshotProofMapIndex,
+        |index| index.get(&key),
+        None
+    );
 
     match value {
-        Some(data) => {
-            let buffer: *mut u8 = allocate(data.len() as u64);
-
-            std::ptr::copy(data.as_ptr(), buffer, data.len());
-
-            BinaryData {
-                data: buffer,
-                data_len: data.len() as u64,
-            }
-        }
+        Some(data) => write_bytes(&data, allocate),
         None => BinaryData {
             data: std::ptr::null::<u8>(),
             data_len: 0,
@@ -114,94 +147,178 @@ unsafe extern "C" fn get(
     }
 }
 
-unsafe extern "C" fn put(index: *const RawProofMapIndex, key: BinaryData, value: BinaryData) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
-    let key: Vec<u8> = key.to_vec();
-    let value: Vec<u8> = value.to_vec();
+unsafe extern "C" fn get_many(
+    index: *const RawProofMapIndex,
+    keys: BinaryData,
+    offsets: *mut u64,
+    found: *mut u8,
+    allocate: Allocate,
+) -> BinaryData {
+    let keys = unpack_items(keys.as_slice());
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: ProofMapIndex<&Fork, Vec<u8>, Vec<u8>> =
-                ProofMapIndex::new(index_name, fork);
+    let values: Vec<Option<Vec<u8>>> = with_index!(
+        index,
+        ProofMapIndexHandle,
+        SnapshotProofMapIndex,
+        |index| keys.iter().map(|key| index.get(key)).collect(),
+        keys.iter().map(|_| None).collect()
+    );
 
-            index.put(&key, value);
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
+    write_values(&values, offsets, found, allocate)
+}
+
+/// Reads up to `limit` entries of the map starting right after `from_key`
+/// (or from the beginning of the map if `from_key` is null).
+///
+/// Result is packed as length-prefixed items: only keys if `with_values` is 0,
+/// and keys interleaved with values otherwise.
+unsafe extern "C" fn iter_chunk(
+    index: *const RawProofMapIndex,
+    from_key: BinaryData,
+    start: BinaryData,
+    end: BinaryData,
+    prefix: BinaryData,
+    limit: u64,
+    with_values: u8,
+    allocate: Allocate,
+) -> BinaryData {
+    let from_key = from_key.to_option_vec();
+    let bounds = KeyBounds::new(start, end, prefix);
+    let limit = limit as usize;
+    let with_values = with_values != 0;
+
+    let items = with_index!(
+        index,
+        ProofMapIndexHandle,
+        SnapshotProofMapIndex,
+        |index| read_chunk(index, from_key.as_ref(), &bounds, limit, with_values),
+        Vec::new()
+    );
+
+    write_items(&items, allocate)
+}
+
+fn read_chunk<T: IndexAccess>(
+    index: &ProofMapIndex<T, Vec<u8>, Vec<u8>>,
+    from_key: Option<&Vec<u8>>,
+    bounds: &KeyBounds,
+    limit: usize,
+    with_values: bool,
+) -> Vec<Vec<u8>> {
+    // Entries of the proof map are ordered by the hash of the key, so the bounds
+    // can't narrow the scan: entries are filtered instead.
+    let mut items = Vec::new();
+
+    if with_values {
+        let entries: Box<dyn Iterator<Item = (Vec<u8>, Vec<u8>)> + '_> = match from_key {
+            Some(from_key) => Box::new(index.iter_from(from_key)),
+            None => Box::new(index.iter()),
+        };
+        let entries = entries
+            .skip_while(|(key, _)| Some(key) == from_key)
+            .filter(|(key, _)| bounds.contains(key));
+
+        for (key, value) in entries.take(limit) {
+            items.push(key);
+            items.push(value);
         }
+    } else {
+        let keys: Box<dyn Iterator<Item = Vec<u8>> + '_> = match from_key {
+            Some(from_key) => Box::new(index.keys_from(from_key)),
+            None => Box::new(index.keys()),
+        };
+        let keys = keys
+            .skip_while(|key| Some(key) == from_key)
+            .filter(|key| bounds.contains(key));
+
+        items.extend(keys.take(limit));
     }
+
+    items
+}
+
+unsafe extern "C" fn put(index: *const RawProofMapIndex, key: BinaryData, value: BinaryData) {
+    let key: Vec<u8> = key.to_vec();
+    let value: Vec<u8> = value.to_vec();
+
+    with_index_mut!(index, ProofMapIndexHandle, |index| index.put(&key, value));
 }
 
 unsafe extern "C" fn remove(index: *const RawProofMapIndex, key: BinaryData) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
     let key: Vec<u8> = key.to_vec();
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: ProofMapIndex<&Fork, Vec<u8>, Vec<u8>> =
-                ProofMapIndex::new(index_name, fork);
+    with_index_mut!(index, ProofMapIndexHandle, |index| index.remove(&key));
+}
 
-            index.remove(&key);
+/// Puts entries packed as `key_0, value_0, key_1, value_1, ...` into the index.
+unsafe extern "C" fn put_many(index: *const RawProofMapIndex, entries: BinaryData) {
+    let mut entries = unpack_items(entries.as_slice()).into_iter();
+
+    with_index_mut!(index, ProofMapIndexHandle, |index| {
+        while let (Some(key), Some(value)) = (entries.next(), entries.next()) {
+            index.put(&key, value);
         }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
+    });
+}
+
+unsafe extern "C" fn remove_many(index: *const RawProofMapIndex, keys: BinaryData) {
+    let keys = unpack_items(keys.as_slice());
+
+    with_index_mut!(index, ProofMapIndexHandle, |index| {
+        for key in keys {
+            index.remove(&key);
         }
-    }
+    });
 }
 
 unsafe extern "C" fn clear(index: *const RawProofMapIndex) {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
+    with_index_mut!(index, ProofMapIndexHandle, |index| index.clear());
+}
 
-    match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let mut index: ProofMapIndex<&Fork, Vec<u8>, Vec<u8>> =
-                ProofMapIndex::new(index_name, fork);
+unsafe extern "C" fn object_hash(index: *const RawProofMapIndex, allocate: Allocate) -> BinaryData {
+    let value = with_index!(
+        index,
+        ProofMapIndexHandle,
+        SnapshotProofMapIndex,
+        |index| index.object_hash(),
+        Hash::zero()
+    );
 
-            index.clear();
-        }
-        _ => {
-            panic!("Attempt to call mutable method with a snapshot");
-        }
-    }
+    write_bytes(value.as_ref(), allocate)
 }
 
-unsafe extern "C" fn object_hash(index: *const RawProofMapIndex, allocate: Allocate) -> BinaryData {
-    let index = &*index;
-    let index_name = parse_string(index.index_name);
+/// Builds a proof for the provided keys (packed as length-prefixed items)
+/// and returns it serialized as described in the `proofs` module.
+unsafe extern "C" fn get_multiproof(
+    index: *const RawProofMapIndex,
+    keys: BinaryData,
+    allocate: Allocate,
+) -> BinaryData {
+    let keys = unpack_items(keys.as_slice());
 
-    let value = match *index.access {
-        RawIndexAccess::Fork(fork) => {
-            let index: ProofMapIndex<&Fork, Vec<u8>, Vec<u8>> =
-                ProofMapIndex::new(index_name, fork);
-            index.object_hash()
-        }
-        RawIndexAccess::Snapshot(snapshot) => {
-            let index: ProofMapIndex<&dyn Snapshot, Vec<u8>, Vec<u8>> =
-                ProofMapIndex::new(index_name, snapshot);
-            index.object_hash()
-        }
-        RawIndexAccess::SnapshotToken => {
-            match BLOCK_SNAPSHOT.read().expect("Block snapshot read").as_ref() {
-                Some(ref snapshot) => {
-                    let index: ProofMapIndex<&dyn Snapshot, Vec<u8>, Vec<u8>> =
-                        ProofMapIndex::new(index_name, snapshot.as_ref());
-                    index.object_hash()
-                }
-                None => Hash::zero(),
-            }
-        }
-    };
-    let data: &[u8] = value.as_ref();
+    let proof = with_index!(
+        index,
+        ProofMapIndexHandle,
+        SnapshotProofMapIndex,
+        |index| Some(serialize_map_proof(&index.get_multiproof(keys))),
+        None
+    );
 
-    let buffer: *mut u8 = allocate(data.len() as u64);
+    match proof {
+        Some(proof) => write_bytes(&proof, allocate),
+        None => BinaryData {
+            data: std::ptr::null::<u8>(),
+            data_len: 0,
+        },
+    }
+}
 
-    std::ptr::copy(data.as_ptr(), buffer, data.len());
+/// Closes the index. Handle can't be used after this call.
+unsafe extern "C" fn free(index: *mut RawProofMapIndex) {
+    let index = &mut *index;
 
-    BinaryData {
-        data: buffer,
-        data_len: data.len() as u64,
+    if !index.handle.is_null() {
+        drop(Box::from_raw(index.handle));
+        index.handle = std::ptr::null_mut();
     }
 }
@@ -0,0 +1,123 @@
+//! Compact binary encoding of the MerkleDB proofs passed to the Python side.
+//!
+//! All the integers are encoded as `u64` LE, byte sequences are prefixed with their length.
+//!
+//! Map proof:
+//!
+//! ```text
+//! entries_count
+//! entries_count * (found: u8, key, [value if found])
+//! proof_count
+//! proof_count * (path: [u8; 34], hash: [u8; 32])
+//! ```
+//!
+//! List proof: the length of the list followed by the proof tree in preorder.
+//! Every node starts with a tag byte:
+//!
+//! ```text
+//! 0: Full(left, right)
+//! 1: Left(left, right_hash)
+//! 2: Left(left) (there is no right child)
+//! 3: Right(left_hash, right)
+//! 4: Leaf(value)
+//! 5: Absent(merkle_root)
+//! ```
+
+use exonum::crypto::Hash;
+use exonum_merkledb::{BinaryKey, ListProof, MapProof};
+
+const LIST_PROOF_FULL: u8 = 0;
+const LIST_PROOF_LEFT: u8 = 1;
+const LIST_PROOF_LEFT_SINGLE: u8 = 2;
+const LIST_PROOF_RIGHT: u8 = 3;
+const LIST_PROOF_LEAF: u8 = 4;
+const LIST_PROOF_ABSENT: u8 = 5;
+
+/// Size of the serialized `ProofPath`.
+const PROOF_PATH_SIZE: usize = 34;
+
+fn write_u64(buffer: &mut Vec<u8>, value: u64) {
+    buffer.extend_from_slice(&value.to_le_bytes());
+}
+
+fn write_item(buffer: &mut Vec<u8>, item: &[u8]) {
+    write_u64(buffer, item.len() as u64);
+    buffer.extend_from_slice(item);
+}
+
+fn write_hash(buffer: &mut Vec<u8>, hash: &Hash) {
+    buffer.extend_from_slice(hash.as_ref());
+}
+
+pub fn serialize_map_proof(proof: &MapProof<Vec<u8>, Vec<u8>>) -> Vec<u8> {
+    let mut buffer = Vec::new();
+
+    let entries: Vec<_> = proof.all_entries_unchecked().collect();
+    write_u64(&mut buffer, entries.len() as u64);
+    for (key, value) in entries {
+        match value {
+            Some(value) => {
+                buffer.push(1);
+                write_item(&mut buffer, key);
+                write_item(&mut buffer, value);
+            }
+            None => {
+                buffer.push(0);
+                write_item(&mut buffer, key);
+            }
+        }
+    }
+
+    let proof_entries = proof.proof_unchecked();
+    write_u64(&mut buffer, proof_entries.len() as u64);
+    for (path, hash) in proof_entries {
+        let mut path_bytes = [0_u8; PROOF_PATH_SIZE];
+        path.write(&mut path_bytes);
+
+        buffer.extend_from_slice(&path_bytes);
+        write_hash(&mut buffer, &hash);
+    }
+
+    buffer
+}
+
+pub fn serialize_list_proof(list_len: u64, proof: &ListProof<Vec<u8>>) -> Vec<u8> {
+    let mut buffer = Vec::new();
+
+    write_u64(&mut buffer, list_len);
+    write_list_proof_node(&mut buffer, proof);
+
+    buffer
+}
+
+fn write_list_proof_node(buffer: &mut Vec<u8>, proof: &ListProof<Vec<u8>>) {
+    match proof {
+        ListProof::Full(left, right) => {
+            buffer.push(LIST_PROOF_FULL);
+            write_list_proof_node(buffer, left);
+            write_list_proof_node(buffer, right);
+        }
+        ListProof::Left(left, Some(right_hash)) => {
+            buffer.push(LIST_PROOF_LEFT);
+            write_list_proof_node(buffer, left);
+            write_hash(buffer, right_hash);
+        }
+        ListProof::Left(left, None) => {
+            buffer.push(LIST_PROOF_LEFT_SINGLE);
+            write_list_proof_node(buffer, left);
+        }
+        ListProof::Right(left_hash, right) => {
+            buffer.push(LIST_PROOF_RIGHT);
+            write_hash(buffer, left_hash);
+            write_list_proof_node(buffer, right);
+        }
+        ListProof::Leaf(value) => {
+            buffer.push(LIST_PROOF_LEAF);
+            write_item(buffer, value);
+        }
+        ListProof::Absent(absence) => {
+            buffer.push(LIST_PROOF_ABSENT);
+            write_hash(buffer, &absence.merkle_root());
+        }
+    }
+}
@@ -293,7 +293,7 @@ impl Runtime for PythonRuntime {
         unsafe {
             let access = RawIndexAccess::Snapshot(snapshot);
 
-            (python_interface.methods.before_commit)(&access as *const RawIndexAccess);
+            (python_interface.methods.after_commit)(&access as *const RawIndexAccess);
         }
     }
 
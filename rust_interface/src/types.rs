@@ -1,7 +1,7 @@
 use std::ffi::{CStr, CString};
 use std::os::raw::c_char;
 
-use exonum::crypto::Hash;
+use exonum::crypto::{Hash, HASH_SIZE};
 use exonum::runtime::{
     ArtifactId, ArtifactProtobufSpec, CallInfo, Caller, ExecutionContext, InstanceId, InstanceSpec,
     ProtoSourceFile, StateHashAggregator,
@@ -171,25 +171,17 @@ impl From<RawCallInfo> for CallInfo {
     }
 }
 
-#[repr(C)]
-#[derive(Clone, Copy)]
-pub struct RawHash {
-    pub data: *const u8,
-}
-
-impl From<RawHash> for Hash {
-    fn from(raw_hash: RawHash) -> Hash {
-        let slice = unsafe { std::slice::from_raw_parts(raw_hash.data, 32) };
-
-        Hash::from_slice(slice).expect("Incorrect hash recieved from Python")
-    }
-}
-
+/// State hashes packed into contiguous buffers.
+///
+/// `hashes` contains all the hashes (`HASH_SIZE` bytes each) one after another.
+/// Hashes of the group `i` (group 0 is the runtime hashes, the others belong
+/// to `instance_ids[i - 1]`) are in the `[offsets[i], offsets[i + 1])` range,
+/// so there are `length + 1` offsets and `length - 1` instance ids.
 #[repr(C)]
 #[derive(Clone, Copy)]
 pub struct RawStateHashAggregator {
-    pub hashes: *const (*const RawHash),
-    pub hashes_length: *const u32,
+    pub hashes: *const u8,
+    pub offsets: *const u32,
     pub instance_ids: *const u32,
     pub length: u32,
 }
@@ -199,34 +191,30 @@ impl From<RawStateHashAggregator> for StateHashAggregator {
         let overall_length: usize = raw_aggregator.length as usize;
         let instances_length: usize = overall_length - 1;
 
-        let hashes = unsafe { std::slice::from_raw_parts(raw_aggregator.hashes, overall_length) };
-        let hashes_lengths =
-            unsafe { std::slice::from_raw_parts(raw_aggregator.hashes_length, overall_length) };
+        let offsets =
+            unsafe { std::slice::from_raw_parts(raw_aggregator.offsets, overall_length + 1) };
+        let hashes_amount = offsets[overall_length] as usize;
+        let hashes =
+            unsafe { std::slice::from_raw_parts(raw_aggregator.hashes, hashes_amount * HASH_SIZE) };
         let instance_ids =
             unsafe { std::slice::from_raw_parts(raw_aggregator.instance_ids, instances_length) };
 
-        let runtime_hashes = unsafe {
-            std::slice::from_raw_parts(hashes[0], hashes_lengths[0] as usize)
-                .iter()
-                .map(|h| Hash::from(*h))
+        let group_hashes = |group: usize| -> Vec<Hash> {
+            let start = offsets[group] as usize * HASH_SIZE;
+            let end = offsets[group + 1] as usize * HASH_SIZE;
+
+            hashes[start..end]
+                .chunks(HASH_SIZE)
+                .map(|data| Hash::from_slice(data).expect("Incorrect hash recieved from Python"))
                 .collect()
         };
 
         let instances_hashes: Vec<(InstanceId, Vec<Hash>)> = (0..instances_length)
-            .map(|i| {
-                let instance_hashes = unsafe {
-                    std::slice::from_raw_parts(hashes[i + 1], hashes_lengths[i + 1] as usize)
-                        .iter()
-                        .map(|h| Hash::from(*h))
-                        .collect()
-                };
-                let instance_id = instance_ids[i] as InstanceId;
-                (instance_id, instance_hashes)
-            })
+            .map(|i| (instance_ids[i] as InstanceId, group_hashes(i + 1)))
             .collect();
 
         StateHashAggregator {
-            runtime: runtime_hashes,
+            runtime: group_hashes(0),
             instances: instances_hashes,
         }
     }